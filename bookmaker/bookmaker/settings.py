@@ -208,6 +208,21 @@ Q_CLUSTER = {
     'orm': 'default',  # Use Django ORM (SQLite) as broker
 }
 
+# Shared Chromium started by `manage.py run_browser_host` (e.g. http://127.0.0.1:9222).
+# When unset every scraper launches its own browser.
+SCRAPER_BROWSER_HOST_URL = os.getenv('SCRAPER_BROWSER_HOST_URL')
+
+# (min, max) seconds between two polls of the persistent list monitors. Each
+# monitor moves within its bounds: faster while odds change or matches are
+# close to kickoff, slower while the page is idle.
+SCRAPER_POLL_BOUNDS = {
+    'main': (float(os.getenv('SCRAPER_MAIN_POLL_MIN', 2)), float(os.getenv('SCRAPER_MAIN_POLL_MAX', 30))),
+    'live': (float(os.getenv('SCRAPER_LIVE_POLL_MIN', 2)), float(os.getenv('SCRAPER_LIVE_POLL_MAX', 20))),
+}
+
+# Detail pages (full market lists) the crawl queue may visit per minute
+SCRAPER_DETAIL_PAGES_PER_MINUTE = float(os.getenv('SCRAPER_DETAIL_PAGES_PER_MINUTE', 20))
+
 # Card payment settings
 CARD_MIN_DEPOSIT_AMOUNT = Decimal('10.00')
 CARD_MAX_DEPOSIT_AMOUNT = Decimal('10000.00')
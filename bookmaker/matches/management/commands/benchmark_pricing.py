@@ -0,0 +1,116 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from matches.models import Bookmaker, Market, Match, Odds, Outcome, Team
+from matches.services.pricing import reprice_matches
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _StatementCounter:
+    """execute_wrapper counting statements; the query log keeps only the last 9000."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _odd(rng, low=1.2, high=9.0):
+    return Decimal(f"{rng.uniform(low, high):.2f}")
+
+
+class Command(BaseCommand):
+    help = ('Benchmark derived-odds pricing: Match.calculate_derived_odds() per match vs the batch '
+            'engine in matches.services.pricing, and the batch engine again on unchanged inputs. '
+            'Runs against the configured database and rolls everything back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                            help='Matches per run (default: 1000 10000)')
+        parser.add_argument('--with-markets', type=float, default=0.3,
+                            help='Share of matches with scraped Total / BTTS markets (default: 0.3)')
+
+    def make_matches(self, n, market_share):
+        """n fresh matches with one Odds row each, a share of them with scraped markets."""
+        rng = random.Random(11)
+        bookmaker = Bookmaker.objects.create(name='benchmark')
+        teams = Team.objects.bulk_create([Team(name=f"Benchmark Team {i}") for i in range(2 * n)])
+        kickoff = timezone.now()
+        matches = Match.objects.bulk_create([
+            Match(home_team=teams[2 * i], away_team=teams[2 * i + 1], match_date=kickoff, league='Benchmark')
+            for i in range(n)
+        ])
+        Odds.objects.bulk_create([
+            Odds(match=match, bookmaker=bookmaker, home_odds=_odd(rng), draw_odds=_odd(rng, 2.5, 5.0),
+                 away_odds=_odd(rng))
+            for match in matches
+        ])
+        with_markets = [match for match in matches if rng.random() < market_share]
+        markets = Market.objects.bulk_create(
+            [Market(match=match, name=name) for match in with_markets for name in ('Total Goals', 'Both To Score')])
+        outcomes = []
+        for market in markets:
+            names = ('Over 2.5', 'Under 2.5') if market.name == 'Total Goals' else ('Yes', 'No')
+            outcomes += [Outcome(market=market, name=name, odds=_odd(rng, 1.4, 3.0)) for name in names]
+        Outcome.objects.bulk_create(outcomes)
+        return [match.pk for match in matches]
+
+    def run_variant(self, variant, n, market_share):
+        """(statements, seconds, {position: priced columns}) for one size, rolled back."""
+        odds_fields = ['home_odds', 'draw_odds', 'away_odds'] + [
+            field.name for field in Match._meta.concrete_fields if field.name.startswith('odds_')]
+        try:
+            with transaction.atomic():
+                match_ids = self.make_matches(n, market_share)
+                if variant == 'unchanged':
+                    # Priced once already: the timed run only finds fingerprints that still match
+                    reprice_matches(list(Match.objects.filter(pk__in=match_ids)))
+                matches = list(Match.objects.filter(pk__in=match_ids).order_by('pk'))
+
+                statements = _StatementCounter()
+                with connection.execute_wrapper(statements):
+                    started = time.perf_counter()
+                    if variant in ('batch', 'unchanged'):
+                        reprice_matches(matches)
+                    else:
+                        for match in matches:
+                            match.calculate_derived_odds()
+                    elapsed = time.perf_counter() - started
+
+                stored = Match.objects.filter(pk__in=match_ids).order_by('pk').values_list(*odds_fields)
+                grids = Odds.objects.filter(match_id__in=match_ids).order_by('match_id').values_list(
+                    'correct_score_grid', flat=True)
+                results = {i: (row, grid) for i, (row, grid) in enumerate(zip(stored, grids))}
+                raise _Rollback
+        except _Rollback:
+            pass
+        return statements.count, elapsed, results
+
+    def handle(self, *args, **options):
+        share = options['with_markets']
+        for n in options['sizes']:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\n📊 {n} matches, {share:.0%} with scraped markets, rolled back afterwards"))
+            old_q, old_s, old_rows = self.run_variant('per-match', n, share)
+            new_q, new_s, new_rows = self.run_variant('batch', n, share)
+            same_q, same_s, _ = self.run_variant('unchanged', n, share)
+
+            for name, statements, seconds in (('per-match', old_q, old_s), ('batch', new_q, new_s),
+                                              ('unchanged', same_q, same_s)):
+                self.stdout.write(f"  {name:<9} {statements:7d} statements | {seconds * 1000:9.1f} ms "
+                                  f"| {seconds * 1e6 / n:7.1f} µs/match")
+            mismatches = sum(old_rows[i] != new_rows.get(i) for i in old_rows)
+            style = self.style.SUCCESS if not mismatches else self.style.WARNING
+            self.stdout.write(style(
+                f"  → {old_q / max(new_q, 1):.0f}x fewer statements, {old_s / max(new_s, 1e-9):.1f}x faster, "
+                f"{mismatches} match(es) priced differently"))
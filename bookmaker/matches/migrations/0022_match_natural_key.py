@@ -0,0 +1,70 @@
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _external_id(match_url, home_name, away_name):
+    # Frozen copy of scraper_module.identity.external_match_id for stored rows
+    if match_url:
+        path = urlsplit(match_url).path.rstrip('/')
+        segment = path.rsplit('/', 1)[-1]
+        if re.fullmatch(r'\d+', segment):
+            return segment
+        return path or match_url
+    normalize = lambda name: ' '.join((name or '').split()).casefold()
+    return f"{normalize(home_name)}|{normalize(away_name)}"
+
+
+def backfill_natural_key(apps, schema_editor):
+    Match = apps.get_model('matches', 'Match')
+    seen = set()
+    batch = []
+    rows = Match.objects.order_by('id').values_list(
+        'id', 'match_url', 'match_date', 'home_team__name', 'away_team__name')
+    for pk, match_url, match_date, home_name, away_name in rows.iterator():
+        day = timezone.localdate(match_date) if timezone.is_aware(match_date) else match_date.date()
+        external_id = _external_id(match_url, home_name, away_name)
+        # Existing duplicates keep a NULL external_id (NULLs never conflict); the oldest row owns the key
+        if (external_id, day) in seen:
+            external_id = None
+        else:
+            seen.add((external_id, day))
+        batch.append(Match(id=pk, external_id=external_id, kickoff_date=day))
+        if len(batch) >= 500:
+            Match.objects.bulk_update(batch, ['external_id', 'kickoff_date'])
+            batch = []
+    if batch:
+        Match.objects.bulk_update(batch, ['external_id', 'kickoff_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0021_remove_match_league_priority_match_league_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='source',
+            field=models.CharField(default='gstake', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='kickoff_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_natural_key, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('source', 'external_id', 'kickoff_date'),
+                                               name='match_natural_key'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0022_match_natural_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='scrape_generation',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='status',
+            field=models.CharField(choices=[('upcoming', 'Upcoming'), ('live', 'Live'), ('finished', 'Finished'), ('canceled', 'Canceled'), ('stale', 'Stale (gone from the site)')], default='upcoming', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'scrape_generation'], name='match_status_generation'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0023_match_scrape_generation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['updated_at'], name='match_updated_at'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0024_match_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='details_crawled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
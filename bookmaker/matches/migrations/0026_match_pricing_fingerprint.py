@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0025_match_details_crawled_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='markets_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='pricing_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -8,14 +8,20 @@ import datetime
 import math
 from decimal import Decimal, InvalidOperation
 
+from matches.services.lines import PUSH, WIN, bet_line_result
+
 # Add this utility function at the top of the file (after imports, before classes)
 def check_bet_result(match, bet_type):
     """
     Determine if a bet on the given match with the given bet type would win.
     match: a Match instance (must be finished with scores)
     bet_type: string from Bet.BET_TYPE_CHOICES
-    Returns boolean.
+    Returns boolean; a pushed line (see bet_is_refunded) is not a win.
     """
+    line = bet_line_result(match, bet_type)
+    if line is not None:
+        return line == WIN
+
     home_score = match.home_score or 0
     away_score = match.away_score or 0
     total_goals = home_score + away_score
@@ -47,18 +53,6 @@ def check_bet_result(match, bet_type):
         '12': ft_result in ['home', 'away'],
         'x2': ft_result in ['draw', 'away'],
 
-        # Total Goals
-        'over_1_5': total_goals > 1.5,
-        'under_1_5': total_goals < 1.5,
-        'over_2_5': total_goals > 2.5,
-        'under_2_5': total_goals < 2.5,
-        'over_3_5': total_goals > 3.5,
-        'under_3_5': total_goals < 3.5,
-
-        # Handicap
-        'handicap_home': (home_score - away_score) > 1.5,
-        'handicap_away': (away_score - home_score) > 1.5,
-
         # BTTS
         'btts_yes': home_score > 0 and away_score > 0,
         'btts_no': home_score == 0 or away_score == 0,
@@ -125,6 +119,16 @@ def check_bet_result(match, bet_type):
     return bet_checks.get(bet_type, False)
 
 
+def bet_is_refunded(match, bet_type):
+    """
+    True when the stake goes back instead of winning or losing: a Draw No Bet
+    on a draw, or a total / handicap line the score lands on exactly.
+    """
+    if bet_type in ('dnb_home', 'dnb_away'):
+        return (match.home_score or 0) == (match.away_score or 0)
+    return bet_line_result(match, bet_type) == PUSH
+
+
 
 class Bookmaker(models.Model):
     """
@@ -163,12 +167,14 @@ class Match(models.Model):
     STATUS_LIVE = 'live'
     STATUS_FINISHED = 'finished'
     STATUS_CANCELED = 'canceled'
+    STATUS_STALE = 'stale'
 
     STATUS_CHOICES = [
         (STATUS_UPCOMING, 'Upcoming'),
         (STATUS_LIVE, 'Live'),
         (STATUS_FINISHED, 'Finished'),
         (STATUS_CANCELED, 'Canceled'),
+        (STATUS_STALE, 'Stale (gone from the site)'),
     ]
 
     # Basic match information
@@ -183,6 +189,16 @@ class Match(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_UPCOMING)
     match_url = models.URLField(blank=True, null=True)
 
+    # Natural key the scrapers upsert on: where the match comes from, the site's
+    # event id (see scraper_module.identity.external_match_id) and the local kickoff date
+    SOURCE_GSTAKE = 'gstake'
+    source = models.CharField(max_length=20, default=SOURCE_GSTAKE)
+    external_id = models.CharField(max_length=255, null=True, blank=True)
+    kickoff_date = models.DateField(null=True, blank=True)
+    # Stamped by every main-list cycle that still lists the match; an upcoming match
+    # left on an older generation is swept to STATUS_STALE (see scraper.sweep_main_list)
+    scrape_generation = models.BigIntegerField(default=0)
+
     live_minute = models.CharField(max_length=10, blank=True, null=True,
                                    help_text="Current minute for live matches (e.g., '45', 'HT')")
 
@@ -192,6 +208,12 @@ class Match(models.Model):
     # Timestamps
     scraped_at = models.DateTimeField(default=get_default_scraped_at, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+    # Last visit of the match's detail page (see scraper_module.crawl_queue)
+    details_crawled_at = models.DateTimeField(null=True, blank=True)
+    # Bumped whenever a detail crawl changes the match's stored markets
+    markets_version = models.PositiveIntegerField(default=0)
+    # Inputs of the last derived-odds pricing (matches.services.pricing.pricing_fingerprint)
+    pricing_fingerprint = models.CharField(max_length=16, blank=True, default='')
 
 
     # Match results
@@ -293,26 +315,35 @@ class Match(models.Model):
     odds_away_over_15 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
     odds_away_under_15 = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id', 'kickoff_date'], name='match_natural_key'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'scrape_generation'], name='match_status_generation'),
+            # KickoffScheduler.sync() reads only the rows changed since its last pass
+            models.Index(fields=['updated_at'], name='match_updated_at'),
+        ]
+
     def __str__(self):
         return f"{self.home_team} vs {self.away_team}"
 
     def settle_bets(self):
+        """Settle the pending single and express bets of a finished match. Returns how many were settled."""
         from django.db import transaction
         from accounts.models import Profile
 
         if self.status != 'finished':
-            return
+            return 0
+        settled = 0
 
         with transaction.atomic():
             # --- Settle single bets ---
             for bet in self.bets.filter(status='pending').select_for_update():
                 profile = Profile.objects.select_for_update().get(user=bet.user)
 
-                # Check for "Draw No Bet" Refund Scenario
-                is_draw = (self.home_score == self.away_score)
-                is_dnb_bet = bet.bet_type in [bet.BET_TYPE_DNB_HOME, bet.BET_TYPE_DNB_AWAY]
-
-                if is_dnb_bet and is_draw:
+                # Draw No Bet on a draw, or a line landing exactly: refund
+                if bet_is_refunded(self, bet.bet_type):
                     bet.status = 'refunded'
                     profile.balance += bet.amount  # Return the original stake only
                 elif bet.check_result():
@@ -323,6 +354,7 @@ class Match(models.Model):
 
                 bet.save()
                 profile.save()
+                settled += 1
 
             # --- Settle express selections ---
             selections = ExpressBetSelection.objects.filter(
@@ -331,11 +363,8 @@ class Match(models.Model):
 
             express_bets_to_check = set()
             for sel in selections:
-                # Check for Draw No Bet refund inside an express bet
-                is_dnb_bet = sel.bet_type in [Bet.BET_TYPE_DNB_HOME, Bet.BET_TYPE_DNB_AWAY]
-                is_draw = (self.home_score == self.away_score)
-
-                if is_dnb_bet and is_draw:
+                # A refunded leg inside an express bet
+                if bet_is_refunded(self, sel.bet_type):
                     sel.status = 'refunded'  # A refunded selection usually means odds become 1.0 for this leg
                 elif sel.check_result():
                     sel.status = 'won'
@@ -372,22 +401,40 @@ class Match(models.Model):
 
                 eb.save()
                 profile.save()
+                settled += 1
+        return settled
 
     def save(self, *args, **kwargs):
         # Update total goals if scores are available
         if self.home_score is not None and self.away_score is not None:
             self.total_goals = self.home_score + self.away_score
+        if self.kickoff_date is None and self.match_date:
+            self.kickoff_date = (timezone.localdate(self.match_date) if timezone.is_aware(self.match_date)
+                                 else self.match_date.date())
         super().save(*args, **kwargs)
 
-    def calculate_derived_odds(self):
+    def calculate_derived_odds(self, main_odds=None, commit=True, market_index=None):
         """
         Calculate/update derived odds for all bet types.
         Uses base 1X2 odds as foundation and scraped markets when available.
+
+        Batch callers pass the already loaded main_odds and commit=False; the
+        match fields and main_odds.correct_score_grid are then only set in
+        memory for a later batched write. market_index is the match's
+        MarketIndex (matches.services.markets); with both passed in, the
+        calculation runs no query. Returns True when odds were calculated.
         """
+        from matches.services.goal_model import match_goal_expectations
+        from matches.services.markets import MarketIndex
+        from matches.services.pricing import pricing_fingerprint
+
         # Get the primary odds from first Odds object
-        main_odds = self.odds.first()
+        if main_odds is None:
+            main_odds = self.odds.first()
         if not main_odds:
-            return
+            return False
+        if market_index is None:
+            market_index = MarketIndex.for_match(self)
 
         try:
             # Extract base probabilities from 1X2 odds
@@ -396,6 +443,8 @@ class Match(models.Model):
             o2 = float(main_odds.away_odds)
 
             margin_factor = 0.95  # House edge factor
+            # (lambda_home, lambda_away) fitted to the 1X2 price; every goal market uses this pair
+            goals = match_goal_expectations(o1, ox, o2)
 
             # Store base odds if not already set
             if not self.home_odds:
@@ -405,25 +454,28 @@ class Match(models.Model):
 
             # Calculate all derived odds
             self.calculate_double_chance_odds(o1, ox, o2, margin_factor)
-            self.calculate_correct_score_odds(o1, ox, o2, margin_factor, main_odds)
-            self.calculate_total_goals_odds(o1, ox, o2, margin_factor)
-            self.calculate_handicap_odds(o1, ox, o2, margin_factor)
-            self.calculate_btts_odds(o1, ox, o2, margin_factor)
-            self.calculate_htft_odds(o1, ox, o2, margin_factor)
-            self.calculate_asian_handicap_odds(o1, ox, o2, margin_factor)
-            self.calculate_halftime_odds(o1, ox, o2, margin_factor)
-            self.calculate_odd_even_odds(o1, ox, o2, margin_factor)
-            self.calculate_dnb_odds(o1, ox, o2, margin_factor)
-            self.calculate_win_to_nil_odds(o1, ox, o2, margin_factor)
+            self.calculate_correct_score_odds(o1, ox, o2, margin_factor, main_odds, goals, commit=commit)
+            self.calculate_total_goals_odds(o1, ox, o2, margin_factor, market_index, goals)
+            self.calculate_handicap_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_btts_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_htft_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_asian_handicap_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_halftime_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_odd_even_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_dnb_odds(o1, ox, o2, margin_factor, market_index)
+            self.calculate_win_to_nil_odds(o1, ox, o2, margin_factor, market_index)
             self.calculate_ht_double_chance_odds(o1, ox, o2, margin_factor)
             self.calculate_btts_win_odds(o1, ox, o2, margin_factor)
-            self.calculate_team_goals_odds(o1, ox, o2, margin_factor)
-
-            self.save()
+            self.calculate_team_goals_odds(o1, ox, o2, margin_factor, goals)
+            self.pricing_fingerprint = pricing_fingerprint(main_odds, self.markets_version)
 
+            if commit:
+                self.save()
+            return True
 
         except (ValueError, ZeroDivisionError, TypeError, InvalidOperation) as e:
             print(f"Error calculating odds for match {self.id}: {e}")
+            return False
 
     def calculate_double_chance_odds(self, o1, ox, o2, margin_factor):
         """Calculate Double Chance odds"""
@@ -436,37 +488,27 @@ class Match(models.Model):
         prob_x2 = (1 / ox) + (1 / o2)
         self.odds_x2 = round(Decimal(1 / prob_x2 * margin_factor), 2)
 
-    def calculate_total_goals_odds(self, o1, ox, o2, margin_factor):
+    def calculate_total_goals_odds(self, o1, ox, o2, margin_factor, markets, goals):
         """Calculate Over/Under odds for multiple thresholds"""
         # Try to find from scraped markets first
-        total_market = self.markets.filter(name__icontains="Total").first()
-        if total_market:
-            for outcome in total_market.outcomes.all():
-                if "Over 1.5" in outcome.name:
-                    self.odds_over_1_5 = outcome.odds
-                elif "Under 1.5" in outcome.name:
-                    self.odds_under_1_5 = outcome.odds
-                elif "Over 2.5" in outcome.name:
-                    self.odds_over_2_5 = outcome.odds
-                elif "Under 2.5" in outcome.name:
-                    self.odds_under_2_5 = outcome.odds
-                elif "Over 3.5" in outcome.name:
-                    self.odds_over_3_5 = outcome.odds
-                elif "Under 3.5" in outcome.name:
-                    self.odds_under_3_5 = outcome.odds
+        for outcome_name, odds in markets.outcomes("Total"):
+            if "Over 1.5" in outcome_name:
+                self.odds_over_1_5 = odds
+            elif "Under 1.5" in outcome_name:
+                self.odds_under_1_5 = odds
+            elif "Over 2.5" in outcome_name:
+                self.odds_over_2_5 = odds
+            elif "Under 2.5" in outcome_name:
+                self.odds_under_2_5 = odds
+            elif "Over 3.5" in outcome_name:
+                self.odds_over_3_5 = odds
+            elif "Under 3.5" in outcome_name:
+                self.odds_under_3_5 = odds
 
         # Fallback calculations based on Poisson distribution
         if not self.odds_over_2_5:
-            # Estimate goal expectation based on odds
-            goal_expectation = 2.5  # Base
-
-            if o1 < 1.5 or o2 < 1.5:  # Strong favorite
-                goal_expectation = 3.0
-            elif ox < 3.0:  # Likely draw/tight game
-                goal_expectation = 2.0
-
-            # Poisson probabilities
-            lam = goal_expectation
+            # Total goals are Poisson with the sum of both teams' expectations
+            lam = goals[0] + goals[1]
             p_0 = math.exp(-lam)
             p_1 = lam * math.exp(-lam)
             p_2 = (lam ** 2 * math.exp(-lam)) / 2
@@ -480,23 +522,21 @@ class Match(models.Model):
             prob_over_35 = 1 - (p_0 + p_1 + p_2 + p_3)
             prob_under_35 = p_0 + p_1 + p_2 + p_3
 
-            # Set odds with margin
-            self.odds_over_1_5 = round(Decimal(1 / prob_over_15 * margin_factor), 2)
-            self.odds_under_1_5 = round(Decimal(1 / prob_under_15 * margin_factor), 2)
-            self.odds_over_2_5 = round(Decimal(1 / prob_over_25 * margin_factor), 2)
-            self.odds_under_2_5 = round(Decimal(1 / prob_under_25 * margin_factor), 2)
-            self.odds_over_3_5 = round(Decimal(1 / prob_over_35 * margin_factor), 2)
-            self.odds_under_3_5 = round(Decimal(1 / prob_under_35 * margin_factor), 2)
+            # Set odds with margin, capped like the correct score grid
+            self.odds_over_1_5 = round(Decimal(min(1 / prob_over_15 * margin_factor, 100.0)), 2)
+            self.odds_under_1_5 = round(Decimal(min(1 / prob_under_15 * margin_factor, 100.0)), 2)
+            self.odds_over_2_5 = round(Decimal(min(1 / prob_over_25 * margin_factor, 100.0)), 2)
+            self.odds_under_2_5 = round(Decimal(min(1 / prob_under_25 * margin_factor, 100.0)), 2)
+            self.odds_over_3_5 = round(Decimal(min(1 / prob_over_35 * margin_factor, 100.0)), 2)
+            self.odds_under_3_5 = round(Decimal(min(1 / prob_under_35 * margin_factor, 100.0)), 2)
 
-    def calculate_handicap_odds(self, o1, ox, o2, margin_factor):
+    def calculate_handicap_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate handicap odds"""
-        handicap_market = self.markets.filter(name__icontains="Handicap").first()
-        if handicap_market:
-            for outcome in handicap_market.outcomes.all():
-                if f"{self.home_team.name} (-1.5)" in outcome.name or "(-1.5)" in outcome.name:
-                    self.odds_handicap_home = outcome.odds
-                elif f"{self.away_team.name} (+1.5)" in outcome.name or "(+1.5)" in outcome.name:
-                    self.odds_handicap_away = outcome.odds
+        for outcome_name, odds in markets.outcomes("Handicap"):
+            if f"{markets.home} (-1.5)" in outcome_name or "(-1.5)" in outcome_name:
+                self.odds_handicap_home = odds
+            elif f"{markets.away} (+1.5)" in outcome_name or "(+1.5)" in outcome_name:
+                self.odds_handicap_away = odds
 
         if not self.odds_handicap_home:
             # Estimate based on win probability
@@ -510,15 +550,13 @@ class Match(models.Model):
             self.odds_handicap_home = round(Decimal(1 / prob_home_handicap * margin_factor), 2)
             self.odds_handicap_away = round(Decimal(1 / prob_away_handicap * margin_factor), 2)
 
-    def calculate_btts_odds(self, o1, ox, o2, margin_factor):
+    def calculate_btts_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Both Teams To Score odds"""
-        btts_market = self.markets.filter(name__icontains="Both To Score").first()
-        if btts_market:
-            for outcome in btts_market.outcomes.all():
-                if "Yes" in outcome.name:
-                    self.odds_btts_yes = outcome.odds
-                elif "No" in outcome.name:
-                    self.odds_btts_no = outcome.odds
+        for outcome_name, odds in markets.outcomes("Both To Score"):
+            if "Yes" in outcome_name:
+                self.odds_btts_yes = odds
+            elif "No" in outcome_name:
+                self.odds_btts_no = odds
 
         if not self.odds_btts_yes:
             # Estimate based on match dynamics
@@ -534,29 +572,27 @@ class Match(models.Model):
             self.odds_btts_yes = round(Decimal(1 / prob_btts_yes * margin_factor), 2)
             self.odds_btts_no = round(Decimal(1 / prob_btts_no * margin_factor), 2)
 
-    def calculate_htft_odds(self, o1, ox, o2, margin_factor):
+    def calculate_htft_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Half Time/Full Time odds"""
-        htft_market = self.markets.filter(name__icontains="Half Time/Full Time").first()
-        if htft_market:
-            for outcome in htft_market.outcomes.all():
-                if "Home/Home" in outcome.name:
-                    self.odds_htft_hh = outcome.odds
-                elif "Home/Draw" in outcome.name:
-                    self.odds_htft_hd = outcome.odds
-                elif "Home/Away" in outcome.name:
-                    self.odds_htft_ha = outcome.odds
-                elif "Draw/Home" in outcome.name:
-                    self.odds_htft_dh = outcome.odds
-                elif "Draw/Draw" in outcome.name:
-                    self.odds_htft_dd = outcome.odds
-                elif "Draw/Away" in outcome.name:
-                    self.odds_htft_da = outcome.odds
-                elif "Away/Home" in outcome.name:
-                    self.odds_htft_ah = outcome.odds
-                elif "Away/Draw" in outcome.name:
-                    self.odds_htft_ad = outcome.odds
-                elif "Away/Away" in outcome.name:
-                    self.odds_htft_aa = outcome.odds
+        for outcome_name, odds in markets.outcomes("Half Time/Full Time"):
+            if "Home/Home" in outcome_name:
+                self.odds_htft_hh = odds
+            elif "Home/Draw" in outcome_name:
+                self.odds_htft_hd = odds
+            elif "Home/Away" in outcome_name:
+                self.odds_htft_ha = odds
+            elif "Draw/Home" in outcome_name:
+                self.odds_htft_dh = odds
+            elif "Draw/Draw" in outcome_name:
+                self.odds_htft_dd = odds
+            elif "Draw/Away" in outcome_name:
+                self.odds_htft_da = odds
+            elif "Away/Home" in outcome_name:
+                self.odds_htft_ah = odds
+            elif "Away/Draw" in outcome_name:
+                self.odds_htft_ad = odds
+            elif "Away/Away" in outcome_name:
+                self.odds_htft_aa = odds
 
         if not self.odds_htft_hh:
             # Simplified estimation
@@ -575,19 +611,17 @@ class Match(models.Model):
             self.odds_htft_ah = round(Decimal((1 / (prob_away_win * 0.05)) * margin_factor), 2)
             self.odds_htft_ad = round(Decimal((1 / (prob_away_win * 0.2)) * margin_factor), 2)
 
-    def calculate_asian_handicap_odds(self, o1, ox, o2, margin_factor):
+    def calculate_asian_handicap_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Asian Handicap odds"""
-        ah_market = self.markets.filter(name__icontains="Asian Handicap").first()
-        if ah_market:
-            for outcome in ah_market.outcomes.all():
-                if "-0.5" in outcome.name and self.home_team.name in outcome.name:
-                    self.odds_ah_home_minus_05 = outcome.odds
-                elif "+0.5" in outcome.name and self.away_team.name in outcome.name:
-                    self.odds_ah_away_plus_05 = outcome.odds
-                elif "-1" in outcome.name and self.home_team.name in outcome.name:
-                    self.odds_ah_home_minus_1 = outcome.odds
-                elif "+1" in outcome.name and self.away_team.name in outcome.name:
-                    self.odds_ah_away_plus_1 = outcome.odds
+        for outcome_name, odds in markets.outcomes("Asian Handicap"):
+            if "-0.5" in outcome_name and markets.home in outcome_name:
+                self.odds_ah_home_minus_05 = odds
+            elif "+0.5" in outcome_name and markets.away in outcome_name:
+                self.odds_ah_away_plus_05 = odds
+            elif "-1" in outcome_name and markets.home in outcome_name:
+                self.odds_ah_home_minus_1 = odds
+            elif "+1" in outcome_name and markets.away in outcome_name:
+                self.odds_ah_away_plus_1 = odds
 
         if not self.odds_ah_home_minus_05:
             prob_home = 1 / o1
@@ -604,18 +638,12 @@ class Match(models.Model):
             self.odds_ah_home_minus_1 = round(Decimal(1 / prob_ah_home_minus_1 * margin_factor), 2)
             self.odds_ah_away_plus_1 = round(Decimal(1 / (1 - prob_ah_home_minus_1) * margin_factor), 2)
 
-    def calculate_correct_score_odds(self, o1, ox, o2, margin_factor, odds_obj):
+    def calculate_correct_score_odds(self, o1, ox, o2, margin_factor, odds_obj, goals, commit=True):
         """
         Calculates the 0:0 through 8:8 grid and saves to the Odds JSONField.
         """
         import math
-        avg_match_goals = 2.8
-        prob_home_win = 1 / o1
-        prob_away_win = 1 / o2
-        strength_ratio = prob_home_win / (prob_home_win + prob_away_win)
-
-        lam_home = avg_match_goals * strength_ratio
-        lam_away = avg_match_goals * (1 - strength_ratio)
+        lam_home, lam_away = goals
 
         def poisson_prob(k, lam):
             return (math.pow(lam, k) * math.exp(-lam)) / math.factorial(k)
@@ -634,23 +662,24 @@ class Match(models.Model):
 
         # Save specifically to the Odds object
         odds_obj.correct_score_grid = grid_data
-        odds_obj.save()
+        if commit:
+            odds_obj.save()
 
         # Optional: Also update your legacy Match model fields if you still use them
         self.odds_cs_0_0 = Decimal(str(grid_data.get("0:0", 100.0)))
         # self.save() is called in calculate_derived_odds, so no need here.
 
-    def calculate_halftime_odds(self, o1, ox, o2, margin_factor):
+    def calculate_halftime_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Half Time result odds"""
-        ht_market = self.markets.filter(name__icontains="Half Time").first()
-        if ht_market and "Result" in ht_market.name:
-            for outcome in ht_market.outcomes.all():
-                if "Home" in outcome.name and not "Draw" in outcome.name:
-                    self.odds_ht_home = outcome.odds
-                elif "Draw" in outcome.name:
-                    self.odds_ht_draw = outcome.odds
-                elif "Away" in outcome.name and not "Draw" in outcome.name:
-                    self.odds_ht_away = outcome.odds
+        ht_market = markets.find("Half Time")
+        if ht_market and "Result" in ht_market[0]:
+            for outcome_name, odds in ht_market[1]:
+                if "Home" in outcome_name and not "Draw" in outcome_name:
+                    self.odds_ht_home = odds
+                elif "Draw" in outcome_name:
+                    self.odds_ht_draw = odds
+                elif "Away" in outcome_name and not "Draw" in outcome_name:
+                    self.odds_ht_away = odds
 
         if not self.odds_ht_home:
             # HT odds are typically higher than FT odds
@@ -658,30 +687,26 @@ class Match(models.Model):
             self.odds_ht_draw = round(Decimal(ox * 0.8), 2)  # More draws at HT
             self.odds_ht_away = round(Decimal(o2 * 1.4), 2)
 
-    def calculate_odd_even_odds(self, o1, ox, o2, margin_factor):
+    def calculate_odd_even_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Odd/Even total goals odds"""
-        oe_market = self.markets.filter(name__icontains="Odd/Even").first()
-        if oe_market:
-            for outcome in oe_market.outcomes.all():
-                if "Odd" in outcome.name:
-                    self.odds_odd = outcome.odds
-                elif "Even" in outcome.name:
-                    self.odds_even = outcome.odds
+        for outcome_name, odds in markets.outcomes("Odd/Even"):
+            if "Odd" in outcome_name:
+                self.odds_odd = odds
+            elif "Even" in outcome_name:
+                self.odds_even = odds
 
         if not self.odds_odd:
             # Slightly favor even (0, 2, 4 goals are even)
             self.odds_odd = Decimal('1.90')
             self.odds_even = Decimal('1.90')
 
-    def calculate_dnb_odds(self, o1, ox, o2, margin_factor):
+    def calculate_dnb_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Draw No Bet odds"""
-        dnb_market = self.markets.filter(name__icontains="Draw No Bet").first()
-        if dnb_market:
-            for outcome in dnb_market.outcomes.all():
-                if self.home_team.name in outcome.name:
-                    self.odds_dnb_home = outcome.odds
-                elif self.away_team.name in outcome.name:
-                    self.odds_dnb_away = outcome.odds
+        for outcome_name, odds in markets.outcomes("Draw No Bet"):
+            if markets.home in outcome_name:
+                self.odds_dnb_home = odds
+            elif markets.away in outcome_name:
+                self.odds_dnb_away = odds
 
         if not self.odds_dnb_home:
             prob_home = 1 / o1
@@ -694,15 +719,13 @@ class Match(models.Model):
             self.odds_dnb_home = round(Decimal(1 / prob_dnb_home * margin_factor), 2)
             self.odds_dnb_away = round(Decimal(1 / prob_dnb_away * margin_factor), 2)
 
-    def calculate_win_to_nil_odds(self, o1, ox, o2, margin_factor):
+    def calculate_win_to_nil_odds(self, o1, ox, o2, margin_factor, markets):
         """Calculate Win to Nil odds"""
-        wtn_market = self.markets.filter(name__icontains="Win to Nil").first()
-        if wtn_market:
-            for outcome in wtn_market.outcomes.all():
-                if self.home_team.name in outcome.name:
-                    self.odds_win_to_nil_home = outcome.odds
-                elif self.away_team.name in outcome.name:
-                    self.odds_win_to_nil_away = outcome.odds
+        for outcome_name, odds in markets.outcomes("Win to Nil"):
+            if markets.home in outcome_name:
+                self.odds_win_to_nil_home = odds
+            elif markets.away in outcome_name:
+                self.odds_win_to_nil_away = odds
 
         if not self.odds_win_to_nil_home:
             prob_home_win = 1 / o1
@@ -751,24 +774,18 @@ class Match(models.Model):
             self.odds_btts_win_home = round(Decimal(1 / prob_btts_win_home * margin_factor), 2)
             self.odds_btts_win_away = round(Decimal(1 / prob_btts_win_away * margin_factor), 2)
 
-    def calculate_team_goals_odds(self, o1, ox, o2, margin_factor):
+    def calculate_team_goals_odds(self, o1, ox, o2, margin_factor, goals):
         """Calculate Total Team Goals odds"""
         if not self.odds_home_over_15:
-            # Estimate based on team strength
-            if o1 < 1.8:  # Strong home favorite
-                prob_home_over_15 = 0.65
-                prob_away_over_15 = 0.35
-            elif o2 < 1.8:  # Strong away favorite
-                prob_home_over_15 = 0.35
-                prob_away_over_15 = 0.65
-            else:  # Balanced
-                prob_home_over_15 = 0.5
-                prob_away_over_15 = 0.4
-
-            self.odds_home_over_15 = round(Decimal(1 / prob_home_over_15 * margin_factor), 2)
-            self.odds_home_under_15 = round(Decimal(1 / (1 - prob_home_over_15) * margin_factor), 2)
-            self.odds_away_over_15 = round(Decimal(1 / prob_away_over_15 * margin_factor), 2)
-            self.odds_away_under_15 = round(Decimal(1 / (1 - prob_away_over_15) * margin_factor), 2)
+            # P(2+ goals) for each team's Poisson expectation
+            lam_home, lam_away = goals
+            prob_home_over_15 = 1 - math.exp(-lam_home) * (1 + lam_home)
+            prob_away_over_15 = 1 - math.exp(-lam_away) * (1 + lam_away)
+
+            self.odds_home_over_15 = round(Decimal(min(1 / prob_home_over_15 * margin_factor, 100.0)), 2)
+            self.odds_home_under_15 = round(Decimal(min(1 / (1 - prob_home_over_15) * margin_factor, 100.0)), 2)
+            self.odds_away_over_15 = round(Decimal(min(1 / prob_away_over_15 * margin_factor, 100.0)), 2)
+            self.odds_away_under_15 = round(Decimal(min(1 / (1 - prob_away_over_15) * margin_factor, 100.0)), 2)
 
     def get_available_bet_types(self):
         """Return list of available bet types with odds"""
@@ -1105,6 +1122,10 @@ class Bet(models.Model):
         if not self.match.status == 'finished':
             return False
 
+        line = bet_line_result(self.match, self.bet_type)
+        if line is not None:
+            return line == WIN
+
         home_score = self.match.home_score or 0
         away_score = self.match.away_score or 0
         total_goals = home_score + away_score
@@ -1137,18 +1158,6 @@ class Bet(models.Model):
             self.BET_TYPE_12: ft_result in ['home', 'away'],
             self.BET_TYPE_X2: ft_result in ['draw', 'away'],
 
-            # Total Goals
-            self.BET_TYPE_OVER_15: total_goals > 1.5,
-            self.BET_TYPE_UNDER_15: total_goals < 1.5,
-            self.BET_TYPE_OVER_25: total_goals > 2.5,
-            self.BET_TYPE_UNDER_25: total_goals < 2.5,
-            self.BET_TYPE_OVER_35: total_goals > 3.5,
-            self.BET_TYPE_UNDER_35: total_goals < 3.5,
-
-            # Handicap
-            self.BET_TYPE_HANDICAP_HOME: (home_score - away_score) > 1.5,
-            self.BET_TYPE_HANDICAP_AWAY: (away_score - home_score) > 1.5,
-
             # BTTS
             self.BET_TYPE_BTTS_YES: home_score > 0 and away_score > 0,
             self.BET_TYPE_BTTS_NO: home_score == 0 or away_score == 0,
@@ -0,0 +1,24 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def update_rows(model, objs, fields):
+    """
+    Write fields of already-loaded instances as one prepared
+    UPDATE ... WHERE pk = %s run through executemany. QuerySet.bulk_update
+    builds a CASE WHEN per field and row, which for ~70 odds columns costs more
+    Python time than the row-by-row saves it replaces.
+    """
+    if not objs:
+        return
+    meta = model._meta
+    columns = [meta.get_field(name) for name in fields]
+    # The connection itself, not the thread-local proxy: this runs once per value
+    connection = connections[DEFAULT_DB_ALIAS]
+    quote = connection.ops.quote_name
+    sql = (f"UPDATE {quote(meta.db_table)} SET "
+           + ", ".join(f"{quote(field.column)} = %s" for field in columns)
+           + f" WHERE {quote(meta.pk.column)} = %s")
+    params = [[field.get_db_prep_save(getattr(obj, field.attname), connection) for field in columns] + [obj.pk]
+              for obj in objs]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
@@ -0,0 +1,180 @@
+"""
+Goal expectations behind a 1X2 price.
+
+The goal markets used to guess their own expectation from hard-coded
+thresholds (2.0 / 2.5 / 3.0 total goals, 2.8 split by relative strength).
+goal_expectations() instead fits the home and away Poisson means so that
+the model's home / draw / away probabilities reproduce the bookmaker's
+de-margined ones, and every goal market of a match is priced from that one
+(lambda_home, lambda_away) pair.
+
+Odds move in ticks of 0.01 and the same prices recur across matches and
+cycles, so fits are kept in an LRU cache keyed on the triple in ticks. A
+cached triple costs a dictionary lookup; the misses of a batch are solved
+together with a vectorized Newton iteration.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+TICK = 0.01
+MAX_GOALS = 15  # P(a team scores more than 15) is below 1e-12 for any realistic mean
+LAMBDA_BOUNDS = (0.05, 8.0)
+CACHE_SIZE = 100_000
+
+_GOALS = np.arange(MAX_GOALS + 1, dtype=float)
+_LOG_FACTORIALS = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1, dtype=float)))])
+
+
+def tick_key(o1, ox, o2):
+    """The cache key of an odds triple: each price as a whole number of ticks."""
+    return round(o1 / TICK), round(ox / TICK), round(o2 / TICK)
+
+
+def demargin(o1, ox, o2):
+    """Implied 1X2 probabilities with the bookmaker's margin spread proportionally (they sum to 1)."""
+    implied = np.stack([1.0 / o1, 1.0 / ox, 1.0 / o2])
+    return implied / implied.sum(axis=0)
+
+
+def poisson_pmf(lam):
+    """P(k goals) for k = 0..MAX_GOALS, shape (N, MAX_GOALS + 1), for N means."""
+    lam = np.asarray(lam, dtype=float)[:, None]
+    return np.exp(_GOALS * np.log(lam) - lam - _LOG_FACTORIALS)
+
+
+def _outcomes_and_jacobian(lam_home, lam_away):
+    """P(home win), P(away win) and their derivatives by lambda_home / lambda_away."""
+    home, away = poisson_pmf(lam_home), poisson_pmf(lam_away)
+    # Goal counts strictly below k: F[:, k] = P(goals < k)
+    below_home = np.cumsum(home, axis=1) - home
+    below_away = np.cumsum(away, axis=1) - away
+    # d pmf(k) / d lambda = pmf(k - 1) - pmf(k)
+    shifted_home = np.pad(home[:, :-1], ((0, 0), (1, 0)))
+    shifted_away = np.pad(away[:, :-1], ((0, 0), (1, 0)))
+
+    p_home = (home * below_away).sum(axis=1)
+    p_away = (away * below_home).sum(axis=1)
+    jacobian = np.empty((len(home), 2, 2))
+    jacobian[:, 0, 0] = ((shifted_home - home) * below_away).sum(axis=1)
+    jacobian[:, 0, 1] = -(home * shifted_away).sum(axis=1)
+    jacobian[:, 1, 0] = -(away * shifted_home).sum(axis=1)
+    jacobian[:, 1, 1] = ((shifted_away - away) * below_home).sum(axis=1)
+    return p_home, p_away, jacobian
+
+
+def solve_goal_expectations(p_home, p_away, iterations=60, tolerance=1e-12):
+    """
+    (lambda_home, lambda_away) arrays whose independent Poisson scores give
+    P(home win) = p_home and P(away win) = p_away, by Newton's method on
+    both means at once (rows drop out as they converge). Steps may at most
+    halve or double a mean and the means stay within LAMBDA_BOUNDS; a price
+    no Poisson pair reproduces (a very long draw) ends at the bound.
+    """
+    p_home, p_away = np.asarray(p_home, dtype=float), np.asarray(p_away, dtype=float)
+    total = 2.7
+    lam_home = total * p_home / (p_home + p_away)
+    lam_away = total - lam_home
+    low, high = LAMBDA_BOUNDS
+    active = np.arange(len(p_home))
+    for _ in range(iterations):
+        model_home, model_away, jacobian = _outcomes_and_jacobian(lam_home[active], lam_away[active])
+        residual_home, residual_away = model_home - p_home[active], model_away - p_away[active]
+        pending = np.maximum(np.abs(residual_home), np.abs(residual_away)) >= tolerance
+        if not pending.any():
+            break
+        active, residual_home, residual_away = active[pending], residual_home[pending], residual_away[pending]
+        (a, b), (c, d) = jacobian[pending, 0].T, jacobian[pending, 1].T
+        det = a * d - b * c
+        det = np.where(np.abs(det) < 1e-15, 1e-15, det)
+        current_home, current_away = lam_home[active], lam_away[active]
+        step_home = (d * residual_home - b * residual_away) / det
+        step_away = (a * residual_away - c * residual_home) / det
+        lam_home[active] = np.clip(np.clip(current_home - step_home, current_home / 2, current_home * 2), low, high)
+        lam_away[active] = np.clip(np.clip(current_away - step_away, current_away / 2, current_away * 2), low, high)
+    return lam_home, lam_away
+
+
+class GoalExpectationCache:
+    """Bounded LRU of tick_key -> (lambda_home, lambda_away), shared by all threads."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._fits = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            fit = self._fits.get(key)
+            if fit is not None:
+                self._fits.move_to_end(key)
+                self.hits += 1
+            return fit
+
+    def put_many(self, items):
+        with self._lock:
+            for key, fit in items:
+                self._fits[key] = fit
+                self._fits.move_to_end(key)
+            self.misses += len(items)
+            while len(self._fits) > self.size:
+                self._fits.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._fits.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._fits), 'hits': self.hits, 'misses': self.misses}
+
+
+goal_cache = GoalExpectationCache()
+
+
+def goal_expectations(o1, ox, o2):
+    """
+    (lambda_home, lambda_away) float arrays for N 1X2 triples. Triples are
+    fitted at their tick-rounded prices; rows with a price that is not a
+    positive number come back as NaN.
+    """
+    o1, ox, o2 = (np.asarray(odds, dtype=float).reshape(-1) for odds in (o1, ox, o2))
+    lam_home, lam_away = np.full(len(o1), np.nan), np.full(len(o1), np.nan)
+    valid = (o1 > 0) & (ox > 0) & (o2 > 0) & np.isfinite(o1) & np.isfinite(ox) & np.isfinite(o2)
+
+    missing = {}
+    home_odds, draw_odds, away_odds = o1.tolist(), ox.tolist(), o2.tolist()
+    for i in np.flatnonzero(valid).tolist():
+        key = tick_key(home_odds[i], draw_odds[i], away_odds[i])
+        fit = goal_cache.get(key)
+        if fit is None:
+            missing.setdefault(key, []).append(i)
+        else:
+            lam_home[i], lam_away[i] = fit
+
+    if missing:
+        keys = list(missing)
+        ticks = np.array(keys, dtype=float) * TICK
+        p_home, _, p_away = demargin(ticks[:, 0], ticks[:, 1], ticks[:, 2])
+        solved_home, solved_away = solve_goal_expectations(p_home, p_away)
+        fits = list(zip(solved_home.tolist(), solved_away.tolist()))
+        goal_cache.put_many(list(zip(keys, fits)))
+        for key, fit in zip(keys, fits):
+            for i in missing[key]:
+                lam_home[i], lam_away[i] = fit
+    return lam_home, lam_away
+
+
+def match_goal_expectations(o1, ox, o2):
+    """goal_expectations() of one triple as a pair of floats; ValueError for unusable odds."""
+    if not (o1 > 0 and ox > 0 and o2 > 0):
+        raise ValueError(f"1X2 odds {o1}/{ox}/{o2} have no goal model")
+    fit = goal_cache.get(tick_key(o1, ox, o2))
+    if fit is None:
+        lam_home, lam_away = goal_expectations(o1, ox, o2)
+        fit = (float(lam_home[0]), float(lam_away[0]))
+    return fit
@@ -0,0 +1,244 @@
+"""
+Total and handicap lines priced on demand.
+
+The stored derived markets are fixed columns: totals at 1.5 / 2.5 / 3.5 and
+one handicap at the match's handicap_value. match_lines() prices any total
+or handicap line instead, Asian quarter lines included, from the same goal
+model (the Poisson means fitted to the 1X2 price) when a market is opened.
+
+Line conventions:
+
+- a half line (2.5, -1.5) wins or loses;
+- a whole line (2.0, -1.0) refunds the stake when it lands exactly (push);
+- a quarter line (2.25, -0.75) splits the stake over the two neighbouring
+  lines (2.0 and 2.5, -0.5 and -1.0), so it can half win or half lose.
+
+A handicap line is the home team's: home -0.75 is offered against away
++0.75. line_result() settles a line with the same rules the prices assume;
+bet_line_result() settles the total and handicap bet types with it, so a
+whole line landing exactly refunds the stake there too.
+
+The score distributions and every price asked for are kept per match in an
+LRU cache keyed on the 1X2 triple in ticks: new base odds drop the entry, so
+offering dozens of lines costs one fit per price change, not per line.
+"""
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+from matches.services.goal_model import MAX_GOALS, match_goal_expectations, poisson_pmf, tick_key
+from matches.services.pricing import MARGIN, MAX_GOAL_PRICE
+
+MIN_PRICE = 1.01
+MAX_TOTAL_LINE = 10
+MAX_HANDICAP_LINE = 5
+# Lines one request may ask for, per market: every quarter line of the widest range (-5 .. +5)
+MAX_LINES_PER_REQUEST = 4 * 2 * MAX_HANDICAP_LINE + 1
+CACHE_SIZE = 5_000
+
+DEFAULT_TOTAL_LINES = [Decimal(quarters) / 4 for quarters in range(2, 23)]  # 0.5 .. 5.5
+DEFAULT_HANDICAP_LINES = [Decimal(quarters) / 4 for quarters in range(-12, 13)]  # -3.0 .. +3.0
+
+WIN, HALF_WIN, PUSH, HALF_LOSS, LOSS = 'win', 'half_win', 'push', 'half_loss', 'loss'
+
+_GOAL_COUNTS = np.arange(2 * MAX_GOALS + 1)
+_GOAL_DIFFERENCES = _GOAL_COUNTS - MAX_GOALS
+
+
+def parse_line(value, limit, signed=False):
+    """A line as a Decimal multiple of 0.25 within +-limit (or 0..limit); ValueError otherwise."""
+    try:
+        line = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"{value!r} is not a line")
+    if not line.is_finite() or (line * 4) % 1 != 0:
+        raise ValueError(f"{value} is not a multiple of 0.25")
+    if abs(line) > limit or (not signed and line <= 0):
+        raise ValueError(f"{value} is outside the offered range")
+    return line.quantize(Decimal('0.01')) + 0  # + 0 turns -0 into 0
+
+
+def _split(line):
+    """The plain lines a stake on `line` goes on: two for a quarter line, else the line itself."""
+    if (line * 2) % 1 != 0:
+        return line - Decimal('0.25'), line + Decimal('0.25')
+    return (line,)
+
+
+def line_result(count, line):
+    """
+    Result of a stake that wins when count + line > 0: count is the total
+    for an over (at -line), minus the total for an under, the goal
+    difference from the backed team's side for a handicap.
+    """
+    results = [(count + part > 0) - (count + part < 0) for part in _split(Decimal(line))]
+    if len(results) == 1:
+        return {1: WIN, 0: PUSH, -1: LOSS}[results[0]]
+    return {2: WIN, 1: HALF_WIN, 0: PUSH, -1: HALF_LOSS, -2: LOSS}[sum(results)]
+
+
+def total_result(side, line, home_score, away_score):
+    """line_result() of an 'over' / 'under' stake on a total goals line."""
+    goals = home_score + away_score
+    if side == 'over':
+        return line_result(goals, -Decimal(line))
+    return line_result(-goals, line)
+
+
+def handicap_result(side, line, home_score, away_score):
+    """line_result() of a 'home' / 'away' stake; `line` is the home team's handicap."""
+    if side == 'home':
+        return line_result(home_score - away_score, line)
+    return line_result(away_score - home_score, -Decimal(line))
+
+
+# Bet types that settle as a line: (market, side, line); handicap bets take the match's handicap_value
+LINE_BET_TYPES = {
+    'over_1_5': ('total', 'over', Decimal('1.5')),
+    'under_1_5': ('total', 'under', Decimal('1.5')),
+    'over_2_5': ('total', 'over', Decimal('2.5')),
+    'under_2_5': ('total', 'under', Decimal('2.5')),
+    'over_3_5': ('total', 'over', Decimal('3.5')),
+    'under_3_5': ('total', 'under', Decimal('3.5')),
+    'handicap_home': ('handicap', 'home', None),
+    'handicap_away': ('handicap', 'away', None),
+}
+
+
+def bet_line_result(match, bet_type):
+    """
+    total_result() / handicap_result() of a line bet type on the match's
+    score (missing scores count as 0); None for any other bet type. The
+    handicap bets are the home team giving handicap_value goals, so the home
+    line is -handicap_value.
+    """
+    if bet_type not in LINE_BET_TYPES:
+        return None
+    market, side, line = LINE_BET_TYPES[bet_type]
+    home_score, away_score = match.home_score or 0, match.away_score or 0
+    if market == 'total':
+        return total_result(side, line, home_score, away_score)
+    return handicap_result(side, -Decimal(str(match.handicap_value)), home_score, away_score)
+
+
+class MatchLines:
+    """
+    Goal-model score distributions of one match and the line prices asked of
+    them so far. An entry is shared through line_cache by all threads: the
+    distributions are never written after __init__, and prices is guarded
+    like LinePriceCache.
+    """
+
+    def __init__(self, key, goals):
+        self.key = key
+        self.goals = goals
+        home, away = poisson_pmf([goals[0]])[0], poisson_pmf([goals[1]])[0]
+        # total_goals[i] = P(i goals in all), goal_difference[i] = P(home - away = i - MAX_GOALS)
+        self.total_goals = np.convolve(home, away)
+        self.goal_difference = np.convolve(home, away[::-1])
+        self.prices = {}
+        self._lock = threading.Lock()
+
+    def _price(self, pmf, counts, line):
+        """Price of a stake winning when count + line > 0, from the win / loss mass of its plain lines."""
+        win = loss = 0.0
+        for part in _split(line):
+            win += float(pmf[counts + float(part) > 0].sum())
+            loss += float(pmf[counts + float(part) < 0].sum())
+        if win <= 0:
+            return Decimal(str(MAX_GOAL_PRICE))
+        # The fair price pays 1 + loss / win: an Asian line's pushed stake is neither won nor lost
+        price = min(max((win + loss) / win * MARGIN, MIN_PRICE), MAX_GOAL_PRICE)
+        return round(Decimal(price), 2)
+
+    def _cached(self, key, price):
+        """Price of `key`, computed once; callers get a copy, so the shared entry is never mutated."""
+        with self._lock:
+            prices = self.prices.get(key)
+            if prices is None:
+                prices = self.prices[key] = price()
+            return dict(prices)
+
+    def total(self, line):
+        """{'over': price, 'under': price} of a total goals line."""
+        line = parse_line(line, MAX_TOTAL_LINE)
+        return self._cached(('total', line), lambda: {
+            'over': self._price(self.total_goals, _GOAL_COUNTS, -line),
+            'under': self._price(self.total_goals, -_GOAL_COUNTS, line),
+        })
+
+    def handicap(self, line):
+        """{'home': price, 'away': price} of the home team at `line` against the away team at -line."""
+        line = parse_line(line, MAX_HANDICAP_LINE, signed=True)
+        return self._cached(('handicap', line), lambda: {
+            'home': self._price(self.goal_difference, _GOAL_DIFFERENCES, line),
+            'away': self._price(self.goal_difference, -_GOAL_DIFFERENCES, -line),
+        })
+
+
+class LinePriceCache:
+    """Bounded LRU of match id -> MatchLines, shared by all threads."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._matches = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, match_id, key):
+        """The entry of the match if it was built from the same 1X2 ticks; a stale one is dropped."""
+        with self._lock:
+            lines = self._matches.get(match_id)
+            if lines is not None and lines.key != key:
+                del self._matches[match_id]
+                lines = None
+            if lines is None:
+                self.misses += 1
+            else:
+                self._matches.move_to_end(match_id)
+                self.hits += 1
+            return lines
+
+    def put(self, match_id, lines):
+        with self._lock:
+            self._matches[match_id] = lines
+            self._matches.move_to_end(match_id)
+            while len(self._matches) > self.size:
+                self._matches.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._matches.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._matches), 'hits': self.hits, 'misses': self.misses}
+
+
+line_cache = LinePriceCache()
+
+
+def match_lines(match, main_odds=None):
+    """
+    MatchLines of a match from its main Odds row (match.odds.first() when
+    not given, one query); None when it has no usable 1X2.
+    """
+    if main_odds is None:
+        main_odds = match.odds.first()
+    if main_odds is None:
+        return None
+    try:
+        o1, ox, o2 = (float(value) for value in (main_odds.home_odds, main_odds.draw_odds, main_odds.away_odds))
+        key = tick_key(o1, ox, o2)
+        lines = line_cache.get(match.pk, key) if match.pk else None
+        if lines is None:
+            lines = MatchLines(key, match_goal_expectations(o1, ox, o2))
+            if match.pk:
+                line_cache.put(match.pk, lines)
+    except (TypeError, ValueError):
+        return None
+    return lines
@@ -0,0 +1,77 @@
+"""
+Scraped markets of a match, loaded once.
+
+The calculate_*_odds methods used to look every market up with its own
+markets.filter(name__icontains=...).first() plus outcomes.all(), and read
+the team names through the foreign keys. A MarketIndex holds the same data
+for one match - markets in primary-key order with their outcomes and the
+teams' names - so pricing a match from it costs no query at all.
+load_market_indexes() builds them for a whole batch in one query.
+"""
+
+
+def normalize_market_name(name):
+    """Key a market name is indexed and looked up by: case and spacing do not matter."""
+    return ' '.join(name.split()).casefold()
+
+
+class MarketIndex:
+    """
+    markets: [(market name, [(outcome name, odds), ...]), ...] in primary-key
+    order, outcomes in primary-key order too. find() keeps the icontains /
+    first() semantics of the queries it replaces.
+    """
+
+    def __init__(self, home='', away='', markets=()):
+        self.home = home
+        self.away = away
+        self.markets = [(normalize_market_name(name), name, outcomes) for name, outcomes in markets]
+        self.by_key = {}
+        for key, name, outcomes in self.markets:
+            self.by_key.setdefault(key, (name, outcomes))
+        self._found = {}
+
+    def __bool__(self):
+        return bool(self.markets)
+
+    def get(self, name):
+        """(name, outcomes) of the market with exactly this (normalized) name, or None."""
+        return self.by_key.get(normalize_market_name(name))
+
+    def find(self, needle):
+        """(name, outcomes) of the first market whose name contains needle, or None."""
+        needle = normalize_market_name(needle)
+        if needle not in self._found:
+            self._found[needle] = next(
+                ((name, outcomes) for key, name, outcomes in self.markets if needle in key), None)
+        return self._found[needle]
+
+    def outcomes(self, needle):
+        """Outcomes of find(needle); empty when the match has no such market."""
+        market = self.find(needle)
+        return market[1] if market else []
+
+    @classmethod
+    def for_match(cls, match):
+        """The index of one match (one query; none when it has no pk)."""
+        if not match.pk:
+            return cls()
+        return load_market_indexes([match.pk]).get(match.pk) or cls()
+
+
+def load_market_indexes(match_ids):
+    """{match id: MarketIndex} for every match in the batch that has scraped markets - one query."""
+    from matches.models import Market
+
+    rows = Market.objects.filter(match_id__in=match_ids).order_by('id', 'outcomes__id').values_list(
+        'match_id', 'id', 'name', 'outcomes__name', 'outcomes__odds', 'match__home_team__name',
+        'match__away_team__name')
+    entries, last_market = {}, None
+    for match_id, market_id, name, outcome_name, odds, home_name, away_name in rows:
+        entry = entries.setdefault(match_id, (home_name, away_name, []))
+        if market_id != last_market:
+            entry[2].append((name, []))
+            last_market = market_id
+        if outcome_name is not None:
+            entry[2][-1][1].append((outcome_name, odds))
+    return {match_id: MarketIndex(home, away, markets) for match_id, (home, away, markets) in entries.items()}
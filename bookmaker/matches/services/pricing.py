@@ -0,0 +1,370 @@
+"""
+Batch derived-odds pricing.
+
+Match.calculate_derived_odds prices one match at a time with scalar math and
+a Decimal per value. price_matches() applies the same model to a whole batch
+of (match, main_odds) pairs: every derived market is computed for all N
+matches at once on numpy arrays, then written back onto the instances
+(and the Odds rows' correct_score_grid) for one batched write.
+
+The per-instance rules are kept as they are: scraped markets win over the
+model, a market group that already has odds keeps them (the "if not
+self.odds_..." guards), and double chance / correct score are always
+recomputed.
+
+Every pricing stores a fingerprint of its inputs on the match (1X2 odds,
+markets version, model settings); the batch paths use it to skip matches
+whose inputs did not change since they were last priced.
+"""
+import hashlib
+import math
+from decimal import Decimal
+
+import numpy as np
+
+from matches.services.goal_model import LAMBDA_BOUNDS, TICK, goal_expectations
+from matches.services.markets import load_market_indexes
+
+# Bump when a formula changes, so every match is priced again once
+PRICING_VERSION = 1
+MARGIN = 0.95
+CS_MARGIN = MARGIN * 0.80
+CS_GOALS = 9
+# Goal-model prices are capped like the correct score grid; a lopsided 1X2 makes some lines near-impossible
+MAX_GOAL_PRICE = 100.0
+CS_KEYS = [f"{h}:{a}" for h in range(CS_GOALS) for a in range(CS_GOALS)]
+_FACTORIALS = np.array([math.factorial(k) for k in range(CS_GOALS)], dtype=float)
+
+# (guard field, fields) in the order calculate_derived_odds fills them; a
+# group is only priced for matches whose guard field is still empty
+GUARDED_GROUPS = [
+    ('odds_over_2_5', ['odds_over_1_5', 'odds_under_1_5', 'odds_over_2_5', 'odds_under_2_5',
+                       'odds_over_3_5', 'odds_under_3_5']),
+    ('odds_handicap_home', ['odds_handicap_home', 'odds_handicap_away']),
+    ('odds_btts_yes', ['odds_btts_yes', 'odds_btts_no']),
+    ('odds_htft_hh', ['odds_htft_hh', 'odds_htft_dd', 'odds_htft_aa', 'odds_htft_hd', 'odds_htft_ha',
+                      'odds_htft_dh', 'odds_htft_da', 'odds_htft_ah', 'odds_htft_ad']),
+    ('odds_ah_home_minus_05', ['odds_ah_home_minus_05', 'odds_ah_away_plus_05',
+                               'odds_ah_home_minus_1', 'odds_ah_away_plus_1']),
+    ('odds_ht_home', ['odds_ht_home', 'odds_ht_draw', 'odds_ht_away']),
+    ('odds_odd', ['odds_odd', 'odds_even']),
+    ('odds_dnb_home', ['odds_dnb_home', 'odds_dnb_away']),
+    ('odds_win_to_nil_home', ['odds_win_to_nil_home', 'odds_win_to_nil_away']),
+]
+# Priced from values filled above, so they run after every guarded group
+DEPENDENT_GROUPS = [
+    ('odds_ht_1x', ['odds_ht_1x', 'odds_ht_12', 'odds_ht_x2']),
+    ('odds_btts_win_home', ['odds_btts_win_home', 'odds_btts_win_away']),
+    ('odds_home_over_15', ['odds_home_over_15', 'odds_home_under_15', 'odds_away_over_15', 'odds_away_under_15']),
+]
+ALWAYS_FIELDS = ['odds_1x', 'odds_12', 'odds_x2', 'odds_cs_0_0']
+PRICED_FIELDS = ALWAYS_FIELDS + [f for _, fields in GUARDED_GROUPS + DEPENDENT_GROUPS for f in fields]
+
+_MODEL_SETTINGS = f"{PRICING_VERSION}|{MARGIN!r}|{CS_MARGIN!r}|{TICK!r}|{LAMBDA_BOUNDS!r}"
+
+_CENT_DECIMALS = {}
+_TENTH_DECIMALS = {}
+
+
+def cents_to_decimal(cents):
+    """Cached Decimal for an integer number of cents; prices repeat a lot across a batch."""
+    value = _CENT_DECIMALS.get(cents)
+    if value is None:
+        value = _CENT_DECIMALS[cents] = Decimal(cents).scaleb(-2)
+    return value
+
+
+def _tenths_to_decimal(value):
+    decimal = _TENTH_DECIMALS.get(value)
+    if decimal is None:
+        decimal = _TENTH_DECIMALS[value] = Decimal(str(value))
+    return decimal
+
+
+def pricing_fingerprint(main_odds, markets_version):
+    """16 hex digits identifying what a pricing of the match reads: 1X2 odds, scraped markets, model settings."""
+    prices = '|'.join(str(round(float(value or 0) / TICK)) for value in
+                      (main_odds.home_odds, main_odds.draw_odds, main_odds.away_odds))
+    text = f"{_MODEL_SETTINGS}|{prices}|{markets_version}"
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def changed_since_priced(pairs):
+    """
+    Split (match, main_odds) pairs by their stored fingerprint (one query):
+    returns (pairs whose pricing inputs changed, number of unchanged pairs).
+    The matches get their stored markets_version, which instances built
+    from scraped rows do not carry.
+    """
+    from matches.models import Match
+
+    stored = {pk: (version, fingerprint) for pk, version, fingerprint in Match.objects.filter(
+        pk__in=[match.pk for match, _ in pairs if match.pk]).values_list('id', 'markets_version', 'pricing_fingerprint')}
+    changed = []
+    for match, odds in pairs:
+        version, fingerprint = stored.get(match.pk, (match.markets_version, ''))
+        match.markets_version = version
+        if pricing_fingerprint(odds, version) != fingerprint:
+            changed.append((match, odds))
+    return changed, len(pairs) - len(changed)
+
+
+def _rounded(values, digits, exact):
+    """
+    values * 10**digits rounded to integers. rint() of the scaled float can
+    land on the other side of a half than rounding the exact binary value,
+    and 2-decimal odds hit such halves often, so near-ties are settled by
+    `exact` (the scalar rounding) element by element.
+    """
+    scaled = values * 10.0 ** digits
+    rounded = np.rint(scaled)
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        flat_values, flat_rounded = values.reshape(-1), rounded.reshape(-1)
+        for i in np.flatnonzero(near_tie.reshape(-1)).tolist():
+            flat_rounded[i] = exact(float(flat_values[i]))
+    return rounded
+
+
+def _cents(probability, invert=True, cap=None):
+    """1 / p * margin (or a price as is) in integer cents, the array form of round(Decimal(x), 2)."""
+    price = (1 / probability) * MARGIN if invert else probability
+    if cap is not None:
+        price = np.minimum(price, cap)
+    return _rounded(np.asarray(price, dtype=float), 2, lambda x: int(round(Decimal(x), 2).scaleb(2)))
+
+
+def price_1x2(o1, ox, o2):
+    """
+    Model prices for N matches from their 1X2 odds (float arrays). Returns
+    ({field: cents array}, correct-score grid of shape (N, 9, 9) in tenths).
+    Half-time double chance and BTTS & win are not included: they read the
+    match's current half-time / BTTS odds, see price_matches().
+    """
+    p1, px, p2 = 1.0 / o1, 1.0 / ox, 1.0 / o2
+    columns = {
+        'odds_1x': _cents(p1 + px),
+        'odds_12': _cents(p1 + p2),
+        'odds_x2': _cents(px + p2),
+    }
+
+    # Every goal market comes from the (lambda_home, lambda_away) fitted to the 1X2 price
+    lam_home, lam_away = goal_expectations(o1, ox, o2)
+
+    # Totals: Poisson with the sum of both expectations
+    lam = lam_home + lam_away
+    e = np.exp(-lam)
+    p_0, p_1, p_2, p_3 = e, lam * e, (lam ** 2 * e) / 2, (lam ** 3 * e) / 6
+    for line, under in (('1_5', p_0 + p_1), ('2_5', p_0 + p_1 + p_2), ('3_5', p_0 + p_1 + p_2 + p_3)):
+        columns[f'odds_over_{line}'] = _cents(1 - under, cap=MAX_GOAL_PRICE)
+        columns[f'odds_under_{line}'] = _cents(under, cap=MAX_GOAL_PRICE)
+
+    home_handicap = p1 * 0.4
+    columns['odds_handicap_home'] = _cents(home_handicap)
+    columns['odds_handicap_away'] = _cents(1 - home_handicap)
+
+    btts_yes = np.where(ox < 3.2, 0.55, np.where((o1 < 1.8) | (o2 < 1.8), 0.45, 0.50))
+    columns['odds_btts_yes'] = _cents(btts_yes)
+    columns['odds_btts_no'] = _cents(1 - btts_yes)
+
+    for field, probability in (('hh', p1 * 0.6), ('dd', px * 0.4), ('aa', p2 * 0.6), ('hd', p1 * 0.2),
+                               ('ha', p1 * 0.05), ('dh', px * 0.3), ('da', px * 0.3), ('ah', p2 * 0.05),
+                               ('ad', p2 * 0.2)):
+        columns[f'odds_htft_{field}'] = _cents(probability)
+
+    ah_05 = p1 + px * 0.5
+    ah_1 = p1 * 0.7
+    columns['odds_ah_home_minus_05'] = _cents(ah_05)
+    columns['odds_ah_away_plus_05'] = _cents(1 - ah_05)
+    columns['odds_ah_home_minus_1'] = _cents(ah_1)
+    columns['odds_ah_away_plus_1'] = _cents(1 - ah_1)
+
+    columns['odds_ht_home'] = _cents(o1 * 1.4, invert=False)
+    columns['odds_ht_draw'] = _cents(ox * 0.8, invert=False)
+    columns['odds_ht_away'] = _cents(o2 * 1.4, invert=False)
+
+    columns['odds_odd'] = columns['odds_even'] = np.full(o1.shape, 190.0)
+
+    no_draw = p1 + p2
+    columns['odds_dnb_home'] = _cents(p1 / no_draw)
+    columns['odds_dnb_away'] = _cents(p2 / no_draw)
+
+    strong_home = o1 < 1.8
+    columns['odds_win_to_nil_home'] = _cents(p1 * np.where(strong_home, 0.4, 0.3))
+    columns['odds_win_to_nil_away'] = _cents(p2 * np.where(strong_home, 0.15, 0.2))
+
+    # Team goals: P(2+ goals) for each side
+    for side, team_lam in (('home', lam_home), ('away', lam_away)):
+        over = 1 - np.exp(-team_lam) * (1 + team_lam)
+        columns[f'odds_{side}_over_15'] = _cents(over, cap=MAX_GOAL_PRICE)
+        columns[f'odds_{side}_under_15'] = _cents(1 - over, cap=MAX_GOAL_PRICE)
+
+    # Correct score: independent Poisson goals, draws nudged up
+    goals = np.arange(CS_GOALS, dtype=float)
+    pmf_home = (np.power(lam_home[:, None], goals) * np.exp(-lam_home[:, None])) / _FACTORIALS
+    pmf_away = (np.power(lam_away[:, None], goals) * np.exp(-lam_away[:, None])) / _FACTORIALS
+    grid = pmf_home[:, :, None] * pmf_away[:, None, :]
+    grid[:, np.arange(CS_GOALS), np.arange(CS_GOALS)] *= 1.1
+    grid = _rounded(np.minimum((1 / grid) * CS_MARGIN, 100.0), 1, lambda x: round(round(x, 1) * 10)) / 10
+    return columns, grid
+
+
+def _current(matches, field):
+    """Float array of a field's current values; NaN where empty (None or 0, like `not value`)."""
+    return np.array([float(v) if (v := getattr(m, field)) else np.nan for m in matches], dtype=float)
+
+
+def _fill(matches, rows, columns, fields):
+    rows = rows.tolist() if isinstance(rows, np.ndarray) else rows
+    for field in fields:
+        column = columns[field].tolist()
+        for i in rows:
+            setattr(matches[i], field, cents_to_decimal(int(column[i])))
+
+
+def apply_market_overrides(match, markets):
+    """Set the odds a match's scraped markets (its MarketIndex) provide, by the rules of the calculate_*_odds methods."""
+    home, away, first = markets.home, markets.away, markets.outcomes
+
+    def assign(outcomes, rules):
+        for outcome_name, odds in outcomes:
+            for test, field in rules:
+                if test(outcome_name):
+                    setattr(match, field, odds)
+                    break
+
+    has = lambda *parts: (lambda name: all(part in name for part in parts))
+    assign(first("Total"), [(has(f"{side} {line}"), f"odds_{side.lower()}_{line.replace('.', '_')}")
+                            for line in ('1.5', '2.5', '3.5') for side in ('Over', 'Under')])
+    assign(first("Handicap"), [(lambda n: f"{home} (-1.5)" in n or "(-1.5)" in n, 'odds_handicap_home'),
+                               (lambda n: f"{away} (+1.5)" in n or "(+1.5)" in n, 'odds_handicap_away')])
+    assign(first("Both To Score"), [(has("Yes"), 'odds_btts_yes'), (has("No"), 'odds_btts_no')])
+    assign(first("Half Time/Full Time"), [
+        (has(f"{a}/{b}"), f"odds_htft_{a[0].lower()}{b[0].lower()}")
+        for a in ('Home', 'Draw', 'Away') for b in ('Home', 'Draw', 'Away')])
+    assign(first("Asian Handicap"), [(has("-0.5", home), 'odds_ah_home_minus_05'),
+                                     (has("+0.5", away), 'odds_ah_away_plus_05'),
+                                     (has("-1", home), 'odds_ah_home_minus_1'),
+                                     (has("+1", away), 'odds_ah_away_plus_1')])
+    ht_market = markets.find("Half Time")
+    if ht_market and "Result" in ht_market[0]:
+        assign(ht_market[1], [(lambda n: "Home" in n and "Draw" not in n, 'odds_ht_home'),
+                              (has("Draw"), 'odds_ht_draw'),
+                              (lambda n: "Away" in n and "Draw" not in n, 'odds_ht_away')])
+    assign(first("Odd/Even"), [(has("Odd"), 'odds_odd'), (has("Even"), 'odds_even')])
+    assign(first("Draw No Bet"), [(has(home), 'odds_dnb_home'), (has(away), 'odds_dnb_away')])
+    assign(first("Win to Nil"), [(has(home), 'odds_win_to_nil_home'), (has(away), 'odds_win_to_nil_away')])
+
+
+def price_matches(pairs, markets=None):
+    """
+    Price (match, main_odds) pairs in one pass. Matches get their derived odds
+    set in memory and each Odds row its correct_score_grid, exactly what
+    calculate_derived_odds(main_odds, commit=False) does one at a time.
+    markets is load_market_indexes() of the batch; None loads it (one query).
+    Returns the matches that were priced (bad 1X2 odds are skipped).
+    """
+    if not pairs:
+        return []
+    prices = np.array([[float(odds.home_odds or 0), float(odds.draw_odds or 0), float(odds.away_odds or 0)]
+                       for _, odds in pairs], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns, grid = price_1x2(prices[:, 0], prices[:, 1], prices[:, 2])
+    # Where the scalar path would divide by zero, it prices nothing
+    valid = np.all(prices > 0, axis=1) & np.all(np.isfinite(np.column_stack(list(columns.values()))), axis=1)
+    if not valid.all():
+        for match, odds in (pair for pair, ok in zip(pairs, valid) if not ok):
+            print(f"Error calculating odds for match {match.id}: "
+                  f"1X2 {odds.home_odds}/{odds.draw_odds}/{odds.away_odds} cannot be priced")
+        pairs = [pair for pair, ok in zip(pairs, valid) if ok]
+        prices, grid = prices[valid], grid[valid]
+        columns = {field: column[valid] for field, column in columns.items()}
+        if not pairs:
+            return []
+
+    matches = [match for match, _ in pairs]
+    o1, ox, o2 = prices[:, 0], prices[:, 1], prices[:, 2]
+    every_row = range(len(matches))
+
+    if markets is None:
+        markets = load_market_indexes([match.pk for match in matches])
+    for i, match in enumerate(matches):
+        if not match.home_odds:
+            match.home_odds, match.draw_odds, match.away_odds = Decimal(o1[i]), Decimal(ox[i]), Decimal(o2[i])
+        if match.pk in markets:
+            apply_market_overrides(match, markets[match.pk])
+
+    _fill(matches, every_row, columns, ['odds_1x', 'odds_12', 'odds_x2'])
+    grid_rows = grid.reshape(len(matches), -1).tolist()
+    for (match, odds), row in zip(pairs, grid_rows):
+        odds.correct_score_grid = dict(zip(CS_KEYS, row))
+        match.odds_cs_0_0 = _tenths_to_decimal(row[0])
+        match.pricing_fingerprint = pricing_fingerprint(odds, match.markets_version)
+
+    for guard, fields in GUARDED_GROUPS:
+        empty = np.flatnonzero(np.isnan(_current(matches, guard)))
+        _fill(matches, empty, columns, fields)
+
+    # Half-time double chance from the (possibly scraped) half-time odds
+    empty = np.flatnonzero(np.isnan(_current(matches, 'odds_ht_1x')))
+    if len(empty):
+        ht_home = np.where(np.isnan(h := _current(matches, 'odds_ht_home')), o1 * 1.4, h)
+        ht_draw = np.where(np.isnan(d := _current(matches, 'odds_ht_draw')), ox * 0.8, d)
+        ht_away = np.where(np.isnan(a := _current(matches, 'odds_ht_away')), o2 * 1.4, a)
+        _fill(matches, empty, {
+            'odds_ht_1x': _cents(1 / ht_home + 1 / ht_draw),
+            'odds_ht_12': _cents(1 / ht_home + 1 / ht_away),
+            'odds_ht_x2': _cents(1 / ht_draw + 1 / ht_away),
+        }, ['odds_ht_1x', 'odds_ht_12', 'odds_ht_x2'])
+
+    # BTTS & win from the (possibly scraped) BTTS price
+    empty = np.flatnonzero(np.isnan(_current(matches, 'odds_btts_win_home')))
+    if len(empty):
+        btts = _current(matches, 'odds_btts_yes')
+        btts_yes = np.where(np.isnan(btts), 0.5, 1 / btts)
+        _fill(matches, empty, {
+            'odds_btts_win_home': _cents(btts_yes * (1 / o1) * 0.7),
+            'odds_btts_win_away': _cents(btts_yes * (1 / o2) * 0.7),
+        }, ['odds_btts_win_home', 'odds_btts_win_away'])
+
+    empty = np.flatnonzero(np.isnan(_current(matches, 'odds_home_over_15')))
+    if len(empty):
+        _fill(matches, empty, columns, DEPENDENT_GROUPS[2][1])
+
+    return matches
+
+
+def reprice_matches(matches, force=False):
+    """
+    Batch counterpart of calling match.calculate_derived_odds() on every
+    match: first Odds row per match and the scraped markets in one query
+    each, one pass of price_matches(), then one batched UPDATE for the match
+    columns and one for the correct score grids. Matches whose fingerprint
+    still matches their inputs are skipped unless force is set. Returns the
+    priced matches.
+    """
+    from django.db import transaction
+    from django.db.models import Min
+    from matches.models import Match, Odds
+    from matches.services.bulk import update_rows
+
+    matches = [match for match in matches if match.pk]
+    if not matches:
+        return []
+    by_id = {match.pk: match for match in matches}
+    first_ids = Odds.objects.filter(match_id__in=by_id).values('match_id').annotate(first=Min('id')).values('first')
+    pairs = [(by_id[odds.match_id], odds) for odds in Odds.objects.filter(id__in=first_ids).order_by('match_id')]
+    if not force:
+        total = len(pairs)
+        pairs = [(match, odds) for match, odds in pairs
+                 if pricing_fingerprint(odds, match.markets_version) != match.pricing_fingerprint]
+        if total > len(pairs):
+            print(f"🧮 Derived odds: {len(pairs)} to price, {total - len(pairs)} unchanged (skipped)")
+
+    priced = price_matches(pairs)
+    odds_fields = [field.name for field in Match._meta.concrete_fields if field.name.startswith('odds_')]
+    priced_ids = {match.pk for match in priced}
+    with transaction.atomic():
+        update_rows(Match, priced, ['home_odds', 'draw_odds', 'away_odds', 'pricing_fingerprint'] + odds_fields)
+        update_rows(Odds, [odds for match, odds in pairs if match.pk in priced_ids], ['correct_score_grid'])
+    return priced
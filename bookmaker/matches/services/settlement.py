@@ -1,6 +1,7 @@
 import logging
 from django.db import transaction
-from matches.models import Match, Bet
+from matches.models import Match, Bet, bet_is_refunded
+from matches.services.lines import LINE_BET_TYPES, WIN, bet_line_result
 from accounts.models import Profile
 
 logger = logging.getLogger(__name__)
@@ -60,24 +61,9 @@ def settle_bets_for_match(match):
                     if match.away_score >= match.home_score: # Away win or Draw
                         is_winner = True
 
-                # --- Total Goals (Over/Under 2.5) ---
-                elif bet.bet_type == Bet.BET_TYPE_OVER_25:
-                    if (match.home_score + match.away_score) > 2.5:
-                        is_winner = True
-                elif bet.bet_type == Bet.BET_TYPE_UNDER_25:
-                    if (match.home_score + match.away_score) < 2.5:
-                        is_winner = True
-
-                # --- Handicap (Home -1.5 / Away +1.5) ---
-                # Assuming standard handicap value of 1.5 for now as per model default
-                elif bet.bet_type == Bet.BET_TYPE_HANDICAP_HOME:
-                    # Home team starts with -1.5 goals
-                    if (match.home_score - 1.5) > match.away_score:
-                        is_winner = True
-                elif bet.bet_type == Bet.BET_TYPE_HANDICAP_AWAY:
-                    # Away team starts with +1.5 goals
-                    if (match.away_score + 1.5) > match.home_score:
-                        is_winner = True
+                # --- Total Goals / Handicap: a line landing exactly refunds (below) ---
+                elif bet.bet_type in LINE_BET_TYPES:
+                    is_winner = bet_line_result(match, bet.bet_type) == WIN
 
                 # --- Both Teams To Score (BTTS) ---
                 elif bet.bet_type == Bet.BET_TYPE_BTTS_YES:
@@ -88,7 +74,14 @@ def settle_bets_for_match(match):
                         is_winner = True
 
                 # --- Settlement ---
-                if is_winner:
+                if bet_is_refunded(match, bet.bet_type):
+                    bet.status = Bet.STATUS_REFUNDED
+                    # Return the stake only
+                    profile = Profile.objects.select_for_update().get(user=bet.user)
+                    profile.balance += bet.amount
+                    profile.save()
+                    logger.info(f"Bet #{bet.id} REFUNDED. User {bet.user} credited {bet.amount}")
+                elif is_winner:
                     bet.status = Bet.STATUS_WON
                     # Credit User
                     profile = Profile.objects.select_for_update().get(user=bet.user)
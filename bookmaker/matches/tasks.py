@@ -5,6 +5,10 @@ from django.utils import timezone
 from .models import Match
 from .services.settlement import settle_bets_for_match
 from scraper_module.scraper import XStakeScraper
+from scraper_module.crawl_queue import DetailCrawlQueue, crawl_budget
+from scraper_module.daemon import submit_job
+from scraper_module.kickoff_scheduler import KickoffScheduler
+from scraper_module.models import ScraperJob
 from asgiref.sync import async_to_sync
 
 logger = logging.getLogger(__name__)
@@ -46,8 +50,15 @@ def scrape_leagues_task():
     print(f"🔄 [{timezone.now().strftime('%H:%M:%S')}] Task 1: Scraping Leagues & Matches")
     print("="*60)
     
-    scraper = XStakeScraper()
     try:
+        # Prefer the warm browser of run_scraper_daemon; fall back to a cold in-process run
+        result = submit_job(ScraperJob.KIND_MAIN_LIST)
+        if result is not None:
+            print(f"✅ League scraping completed by daemon: {result}")
+            return
+
+        print("   ⚠️ No scraper daemon available, scraping in-process.")
+        scraper = XStakeScraper(context_label='main-list')
         # Run only the main list scraping
         asyncio.run(scraper.scrape_main_list_only())
         print("✅ League scraping completed.")
@@ -56,26 +67,31 @@ def scrape_leagues_task():
 
 def scrape_match_details_task():
     """
-    Task 2: Iterates through existing matches in DB and updates them.
-    Prioritizes Live and Upcoming matches.
+    Task 2: Crawls match detail pages for fresh markets.
+    Takes this cycle's share of the pages-per-minute budget and spends it on
+    the most urgent matches (kickoff proximity, open stake, time since the
+    last crawl); the rest waits for a later cycle.
     """
     print("\n" + "="*60)
     print(f"🔄 [{timezone.now().strftime('%H:%M:%S')}] Task 2: Updating Match Details")
     print("="*60)
-    
-    # Get matches that need updating: Live matches + Upcoming in next 24h
-    matches_to_update = Match.objects.filter(
-        status__in=[Match.STATUS_LIVE, Match.STATUS_UPCOMING],
-        match_date__lte=timezone.now() + timezone.timedelta(hours=24),
-        match_url__isnull=False
-    ).order_by('match_date')
-    
-    print(f"🎯 Found {matches_to_update.count()} matches to update.")
-    
-    if matches_to_update.exists():
-        scraper = XStakeScraper()
+
+    budget = crawl_budget.take(crawl_budget.capacity)
+    match_ids = DetailCrawlQueue().plan(budget)
+    crawl_budget.give_back(budget - len(match_ids))
+
+    print(f"🎯 {len(match_ids)} detail page(s) planned (budget {budget}, {crawl_budget.rate:g} pages/min).")
+
+    if match_ids:
         try:
-            asyncio.run(scraper.update_specific_matches(matches_to_update))
+            result = submit_job(ScraperJob.KIND_DETAIL_PAGES, {'match_ids': match_ids})
+            if result is not None:
+                print(f"✅ Detail crawl completed by daemon: {result}")
+                return
+
+            print("   ⚠️ No scraper daemon available, crawling in-process.")
+            scraper = XStakeScraper(context_label='detail')
+            asyncio.run(scraper.crawl_match_details(match_ids))
             print("✅ Match details update completed.")
         except Exception as e:
             print(f"❌ Match details update failed: {e}")
@@ -85,28 +101,49 @@ def scrape_match_details_task():
 def monitor_live_matches_task():
     """
     Task 4: Checks live matches for score updates and finished status.
+    Which matches to visit comes from the kickoff scheduler the scraper
+    daemon keeps: upcoming matches enter tracking just before kickoff and
+    leave it once finished, so the task never scans the whole match table.
+    Without a daemon the same set is read from the DB.
     """
     print("\n" + "="*60)
     print(f"🔴 [{timezone.now().strftime('%H:%M:%S')}] Task 4: Monitoring Live Matches")
     print("="*60)
-    
-    # Find matches that are currently live or should be live (started recently)
-    live_matches = Match.objects.filter(
-        match_date__lte=timezone.now(),
-        status__in=[Match.STATUS_UPCOMING, Match.STATUS_LIVE],
-        match_url__isnull=False
-    )
-    
-    if live_matches.exists():
-        print(f"🎯 Found {live_matches.count()} potential live matches.")
-        scraper = XStakeScraper()
+
+    try:
+        result = submit_job(ScraperJob.KIND_LIVE_MATCHES)
+        if result is not None:
+            print(f"🗓️ {result.get('synced', 0)} changed row(s) synced, {result.get('kicking_off', 0)} kicking off | "
+                  f"{result.get('tracked', 0)} tracked, {result.get('upcoming', 0)} upcoming "
+                  f"(next: {result.get('next_kickoff')})")
+            print(f"✅ Live monitoring completed by daemon: {result}")
+            return
+
+        print("   ⚠️ No scraper daemon available, checking in-process.")
+        match_ids = KickoffScheduler().current_ids()
+        if not match_ids:
+            print("   No live matches to monitor.")
+            return
+        print(f"🎯 Found {len(match_ids)} potential live matches.")
+        scraper = XStakeScraper(context_label='live-check')
+        live_matches = Match.objects.filter(id__in=match_ids).select_related('home_team', 'away_team')
+        asyncio.run(scraper.update_live_matches(live_matches))
+        print("✅ Live monitoring completed.")
+    except Exception as e:
+        print(f"❌ Live monitoring failed: {e}")
+
+def settle_matches_task(match_ids):
+    """
+    Settles single and express bets of the given finished matches.
+    Queued by the live scraper when matches drop off the live page.
+    """
+    settled = 0
+    for match in Match.objects.filter(id__in=match_ids, status=Match.STATUS_FINISHED):
         try:
-            asyncio.run(scraper.update_live_matches(live_matches))
-            print("✅ Live monitoring completed.")
+            settled += match.settle_bets()
         except Exception as e:
-            print(f"❌ Live monitoring failed: {e}")
-    else:
-        print("   No live matches to monitor.")
+            print(f"⚠️ Error settling bets for match {match.id}: {e}")
+    print(f"💰 Settled {settled} bet(s) on {len(match_ids)} finished match(es).")
 
 def settle_finished_matches_task():
     """
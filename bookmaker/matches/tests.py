@@ -1,3 +1,346 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (Bet, Bookmaker, ExpressBet, ExpressBetSelection, Market, Match, Odds, Outcome, Team,
+                     bet_is_refunded, check_bet_result)
+from .services.goal_model import (LAMBDA_BOUNDS, GoalExpectationCache, _outcomes_and_jacobian, demargin,
+                                  goal_cache, goal_expectations, match_goal_expectations)
+from .services.lines import (HALF_LOSS, HALF_WIN, LOSS, MAX_LINES_PER_REQUEST, PUSH, WIN, bet_line_result,
+                             handicap_result, total_result)
+from .services.pricing import (GUARDED_GROUPS, PRICED_FIELDS, _cents, price_1x2, changed_since_priced, price_matches,
+                               reprice_matches)
+from .services.settlement import settle_bets_for_match
+
+
+class FinalScore:
+    """The fields settlement reads off a Match."""
+
+    def __init__(self, home_score, away_score, handicap_value=Decimal('1.5')):
+        self.home_score = home_score
+        self.away_score = away_score
+        self.handicap_value = handicap_value
+        self.half_time_home_score = self.half_time_away_score = None
+
+
+class LineResultTests(SimpleTestCase):
+    def test_half_line_total(self):
+        self.assertEqual(total_result('over', '2.5', 2, 1), WIN)
+        self.assertEqual(total_result('under', '2.5', 2, 1), LOSS)
+        self.assertEqual(total_result('over', '2.5', 1, 1), LOSS)
+        self.assertEqual(total_result('under', '2.5', 1, 1), WIN)
+
+    def test_whole_line_total_pushes(self):
+        self.assertEqual(total_result('over', '3', 2, 1), PUSH)
+        self.assertEqual(total_result('under', '3', 2, 1), PUSH)
+        self.assertEqual(total_result('over', '3', 3, 1), WIN)
+        self.assertEqual(total_result('under', '3', 3, 1), LOSS)
+
+    def test_quarter_lines_split(self):
+        self.assertEqual(total_result('over', '2.25', 1, 1), HALF_LOSS)
+        self.assertEqual(handicap_result('home', '-0.75', 1, 0), HALF_WIN)
+        self.assertEqual(handicap_result('away', '-0.75', 1, 0), HALF_LOSS)
+
+    def test_half_line_handicap(self):
+        # Home -1.5 against away +1.5
+        self.assertEqual(handicap_result('home', '-1.5', 2, 0), WIN)
+        self.assertEqual(handicap_result('away', '-1.5', 2, 0), LOSS)
+        self.assertEqual(handicap_result('home', '-1.5', 1, 0), LOSS)
+        self.assertEqual(handicap_result('away', '-1.5', 1, 0), WIN)
+
+    def test_whole_line_handicap_pushes(self):
+        self.assertEqual(handicap_result('home', '-1', 1, 0), PUSH)
+        self.assertEqual(handicap_result('away', '-1', 1, 0), PUSH)
+        self.assertEqual(handicap_result('home', '-1', 2, 0), WIN)
+        self.assertEqual(handicap_result('away', '-1', 0, 0), WIN)
+
+
+class BetLineResultTests(SimpleTestCase):
+    def test_handicap_bets_use_handicap_value(self):
+        half, whole = Decimal('1.5'), Decimal('1.0')
+        self.assertEqual(bet_line_result(FinalScore(3, 1, half), 'handicap_home'), WIN)
+        self.assertEqual(bet_line_result(FinalScore(3, 1, half), 'handicap_away'), LOSS)
+        self.assertEqual(bet_line_result(FinalScore(1, 0, half), 'handicap_home'), LOSS)
+        self.assertEqual(bet_line_result(FinalScore(1, 0, half), 'handicap_away'), WIN)
+        self.assertEqual(bet_line_result(FinalScore(1, 0, whole), 'handicap_home'), PUSH)
+        self.assertEqual(bet_line_result(FinalScore(1, 0, whole), 'handicap_away'), PUSH)
+
+    def test_push_is_refunded_not_lost(self):
+        score = FinalScore(2, 1, Decimal('1.0'))
+        for bet_type in ('handicap_home', 'handicap_away'):
+            self.assertFalse(check_bet_result(score, bet_type))
+            self.assertTrue(bet_is_refunded(score, bet_type))
+        self.assertTrue(check_bet_result(score, 'over_2_5'))
+        self.assertFalse(bet_is_refunded(score, 'over_2_5'))
+
+    def test_other_bet_types_are_not_lines(self):
+        self.assertIsNone(bet_line_result(FinalScore(1, 1), 'home'))
+        self.assertTrue(bet_is_refunded(FinalScore(1, 1), 'dnb_home'))
+        self.assertFalse(bet_is_refunded(FinalScore(1, 1), 'btts_yes'))
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('punter', password='x')
+        self.user.profile.balance = Decimal('0')
+        self.user.profile.save()
+        self.match = Match.objects.create(
+            home_team=Team.objects.create(name='Home'), away_team=Team.objects.create(name='Away'),
+            match_date=timezone.now(), league='Test League', status=Match.STATUS_FINISHED,
+            home_score=2, away_score=1, handicap_value=Decimal('1.0'))
+
+    def bet(self, bet_type):
+        return Bet.objects.create(user=self.user, match=self.match, bet_type=bet_type, odds=Decimal('2.00'),
+                                  amount=Decimal('10.00'))
+
+    def settled(self, *bets):
+        self.user.profile.refresh_from_db()
+        return [Bet.objects.get(pk=bet.pk).status for bet in bets], self.user.profile.balance
+
+    def test_service_refunds_whole_line_handicap(self):
+        bets = self.bet('handicap_home'), self.bet('handicap_away')
+
+        settle_bets_for_match(self.match)
+
+        self.assertEqual(self.settled(*bets), ([Bet.STATUS_REFUNDED] * 2, Decimal('20.00')))
+
+    def test_service_settles_half_line_handicap_and_totals(self):
+        self.match.handicap_value = Decimal('0.5')
+        self.match.save()
+        bets = (self.bet('handicap_home'), self.bet('handicap_away'), self.bet('over_2_5'),
+                self.bet('under_2_5'), self.bet('over_3_5'), self.bet('under_1_5'))
+
+        settle_bets_for_match(self.match)
+
+        self.assertEqual(self.settled(*bets), ([Bet.STATUS_WON, Bet.STATUS_LOST, Bet.STATUS_WON,
+                                                Bet.STATUS_LOST, Bet.STATUS_LOST, Bet.STATUS_LOST],
+                                               Decimal('40.00')))
+
+    def test_match_settle_bets_refunds_whole_line_handicap(self):
+        bets = self.bet('handicap_home'), self.bet('handicap_away'), self.bet('over_2_5')
+
+        self.assertEqual(self.match.settle_bets(), 3)
+        self.assertEqual(self.match.settle_bets(), 0)
+
+        self.assertEqual(self.settled(*bets), ([Bet.STATUS_REFUNDED, Bet.STATUS_REFUNDED, Bet.STATUS_WON],
+                                               Decimal('40.00')))
+
+    def test_express_leg_on_a_pushed_line_is_refunded(self):
+        express = ExpressBet.objects.create(user=self.user, amount=Decimal('10.00'), total_odds=Decimal('4.00'),
+                                            potential_payout=Decimal('40.00'))
+        ExpressBetSelection.objects.create(express_bet=express, match=self.match, bet_type='handicap_away',
+                                           odds=Decimal('2.00'))
+        ExpressBetSelection.objects.create(express_bet=express, match=self.match, bet_type='over_2_5',
+                                           odds=Decimal('2.00'))
+
+        self.assertEqual(self.match.settle_bets(), 1)
+
+        express.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertEqual(express.status, 'won')
+        self.assertEqual(self.user.profile.balance, Decimal('20.00'))
+
+
+class PricingParityTests(TestCase):
+    """price_matches() must price a batch exactly like calculate_derived_odds() prices each match."""
+
+    FIXTURES = [
+        ('2.10', '3.40', '3.60'),
+        ('1.25', '6.00', '11.00'),
+        ('1.07', '13.00', '41.00'),  # lopsided: much of the correct score grid is capped
+        ('2.90', '3.05', '2.55'),
+        ('1.75', '3.80', '4.75'),
+    ]
+
+    def setUp(self):
+        self.bookmaker = Bookmaker.objects.create(name='Book')
+        self.teams = Team.objects.create(name='Home'), Team.objects.create(name='Away')
+
+    def match(self, prices, **fields):
+        match = Match.objects.create(home_team=self.teams[0], away_team=self.teams[1], match_date=timezone.now(),
+                                     league='Test League', **fields)
+        home, draw, away = map(Decimal, prices)
+        Odds.objects.create(match=match, bookmaker=self.bookmaker, home_odds=home, draw_odds=draw, away_odds=away)
+        return match
+
+    def assertParity(self, matches):
+        scalar = {}
+        for match in matches:
+            copy = Match.objects.get(pk=match.pk)
+            odds = copy.odds.first()
+            self.assertTrue(copy.calculate_derived_odds(odds, commit=False))
+            scalar[match.pk] = ({field: getattr(copy, field) for field in PRICED_FIELDS}, odds.correct_score_grid)
+
+        batch = [Match.objects.get(pk=match.pk) for match in matches]
+        pairs = [(match, match.odds.first()) for match in batch]
+        self.assertEqual(len(price_matches(pairs)), len(pairs))
+        for match, odds in pairs:
+            fields, grid = scalar[match.pk]
+            self.assertEqual({field: getattr(match, field) for field in PRICED_FIELDS}, fields)
+            self.assertEqual(odds.correct_score_grid, grid)
+
+    def test_model_prices_match(self):
+        self.assertParity([self.match(prices) for prices in self.FIXTURES])
+
+    def test_preset_groups_are_kept(self):
+        guards = [guard for guard, _ in GUARDED_GROUPS]
+        matches = [self.match(prices, **{guards[i % len(guards)]: Decimal('1.23')})
+                   for i, prices in enumerate(self.FIXTURES * 2)]
+        self.assertParity(matches)
+
+    def test_scraped_markets_win(self):
+        match = self.match(self.FIXTURES[0])
+        for name, outcomes in (('Total Goals', [('Over 2.5', '1.95'), ('Under 2.5', '1.85')]),
+                               ('Both To Score', [('Yes', '1.70'), ('No', '2.05')]),
+                               ('Half Time Result', [('Home', '2.80'), ('Draw', '2.10'), ('Away', '4.10')])):
+            market = Market.objects.create(match=match, name=name)
+            for outcome, odds in outcomes:
+                Outcome.objects.create(market=market, name=outcome, odds=Decimal(odds))
+        self.assertParity([match, self.match(self.FIXTURES[1])])
+
+
+class RepriceSkipTests(TestCase):
+    def setUp(self):
+        bookmaker = Bookmaker.objects.create(name='Book')
+        home, away = Team.objects.create(name='Home'), Team.objects.create(name='Away')
+        self.matches = []
+        for prices in PricingParityTests.FIXTURES[:3]:
+            match = Match.objects.create(home_team=home, away_team=away, match_date=timezone.now(),
+                                         league='Test League')
+            Odds.objects.create(match=match, bookmaker=bookmaker, home_odds=Decimal(prices[0]),
+                                draw_odds=Decimal(prices[1]), away_odds=Decimal(prices[2]))
+            self.matches.append(match)
+        self.assertEqual(len(reprice_matches(self.fresh())), 3)
+
+    def fresh(self):
+        return list(Match.objects.filter(pk__in=[match.pk for match in self.matches]).order_by('pk'))
+
+    def test_unchanged_inputs_are_skipped(self):
+        matches = self.fresh()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reprice_matches(matches), [])
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertEqual(len(reprice_matches(self.fresh(), force=True)), 3)
+
+    def test_changed_odds_or_markets_are_repriced(self):
+        first, second, third = self.matches
+        Odds.objects.filter(match=first).update(home_odds=Decimal('1.95'))
+        Match.objects.filter(pk=second.pk).update(markets_version=1)
+
+        priced = reprice_matches(self.fresh())
+
+        self.assertEqual([match.pk for match in priced], [first.pk, second.pk])
+        stored = Match.objects.get(pk=first.pk)
+        self.assertEqual(stored.pricing_fingerprint, priced[0].pricing_fingerprint)
+        self.assertEqual(stored.odds_1x, priced[0].odds_1x)
+        self.assertEqual(reprice_matches(self.fresh()), [])
+
+    def test_changed_since_priced_reads_stored_fingerprints(self):
+        pairs = [(Match(pk=match.pk), match.odds.first()) for match in self.fresh()]
+        pairs[2][1].away_odds = Decimal('9.00')
+
+        changed, unchanged = changed_since_priced(pairs)
+
+        self.assertEqual(([match.pk for match, _ in changed], unchanged), ([self.matches[2].pk], 2))
+
+
+class CentsRoundingTests(SimpleTestCase):
+    def test_near_ties_round_like_decimal(self):
+        # 1.055 is stored just below the half: Decimal rounds it to 1.05, rint() of 105.5000...1 to 106
+        self.assertEqual(np.rint(1.055 * 100), 106)
+        self.assertEqual(_cents(np.array([1.055, 1.075, 1.295, 2.5]), invert=False).tolist(),
+                         [105.0, 107.0, 129.0, 250.0])
+
+
+class GoalModelTests(SimpleTestCase):
+    PRICES = np.array([[2.10, 3.40, 3.60], [1.25, 6.00, 11.00], [1.01, 26.00, 101.00], [2.90, 3.05, 2.55]])
+
+    def setUp(self):
+        goal_cache.clear()
+
+    def assertRoundTrip(self, prices, places=9):
+        lam_home, lam_away = goal_expectations(prices[:, 0], prices[:, 1], prices[:, 2])
+        p_home, _, p_away = demargin(prices[:, 0], prices[:, 1], prices[:, 2])
+        model_home, model_away, _ = _outcomes_and_jacobian(lam_home, lam_away)
+        np.testing.assert_allclose(model_home, p_home, atol=10 ** -places)
+        np.testing.assert_allclose(model_away, p_away, atol=10 ** -places)
+        return lam_home, lam_away
+
+    def test_fit_reproduces_the_demargined_1x2(self):
+        lam_home, lam_away = self.assertRoundTrip(self.PRICES)
+        self.assertGreater(lam_home[1], lam_away[1])
+        self.assertLess(lam_home[3], lam_away[3])
+
+    def test_margin_heavy_and_degenerate_prices_converge(self):
+        # 25% margin, equal sides, a near-certain draw
+        lam_home, lam_away = self.assertRoundTrip(np.array([[1.50, 3.00, 4.00], [1.20, 2.50, 2.50],
+                                                            [6.00, 1.15, 6.00]]))
+        self.assertGreater(lam_home[0], lam_away[0])
+        self.assertAlmostEqual(lam_home[2], lam_away[2])
+        self.assertTrue((lam_home[2] >= LAMBDA_BOUNDS[0]) and (lam_home[2] < 0.5))
+
+    def test_unreachable_and_invalid_prices(self):
+        # No Poisson pair prices a draw at 50: the fit stays finite and within bounds
+        lam_home, lam_away = goal_expectations([1.50, 0, np.nan, -2.0], [50.0, 3.0, 3.0, 3.0], [3.00] * 4)
+        self.assertTrue(LAMBDA_BOUNDS[0] <= lam_home[0] <= LAMBDA_BOUNDS[1])
+        self.assertTrue(LAMBDA_BOUNDS[0] <= lam_away[0] <= LAMBDA_BOUNDS[1])
+        self.assertTrue(np.isnan(lam_home[1:]).all() and np.isnan(lam_away[1:]).all())
+        with self.assertRaises(ValueError):
+            match_goal_expectations(0, 3.0, 3.0)
+
+    def test_goal_prices_are_capped_at_100(self):
+        columns, _ = price_1x2(np.array([6.00]), np.array([1.15]), np.array([6.00]))
+        self.assertEqual(columns['odds_over_2_5'][0], 10000)
+        self.assertEqual(columns['odds_over_3_5'][0], 10000)
+
+        match = Match()
+        self.assertTrue(match.calculate_derived_odds(Odds(home_odds=Decimal('6.00'), draw_odds=Decimal('1.15'),
+                                                          away_odds=Decimal('6.00')), commit=False))
+        self.assertEqual((match.odds_over_2_5, match.odds_over_3_5), (Decimal('100.00'), Decimal('100.00')))
+
+    def test_fits_are_cached_by_tick(self):
+        first = match_goal_expectations(2.10, 3.40, 3.60)
+        self.assertEqual(goal_cache.stats(), {'size': 1, 'hits': 0, 'misses': 1})
+        # Within the same 0.01 tick: a hit, and the same fit
+        self.assertEqual(match_goal_expectations(2.1004, 3.3996, 3.60), first)
+        goal_expectations([2.10, 2.11], [3.40, 3.40], [3.60, 3.60])
+        self.assertEqual(goal_cache.stats(), {'size': 2, 'hits': 2, 'misses': 2})
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = GoalExpectationCache(size=2)
+        cache.put_many([('a', (1.0, 1.0)), ('b', (2.0, 2.0))])
+        cache.get('a')
+        cache.put_many([('c', (3.0, 3.0))])
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), ((1.0, 1.0), None, (3.0, 3.0)))
+        self.assertEqual(cache.stats(), {'size': 2, 'hits': 3, 'misses': 3})
+
+
+class MatchLinesViewTests(TestCase):
+    def setUp(self):
+        self.match = Match.objects.create(home_team=Team.objects.create(name='Home'),
+                                          away_team=Team.objects.create(name='Away'),
+                                          match_date=timezone.now(), league='Test League')
+        Odds.objects.create(match=self.match, bookmaker=Bookmaker.objects.create(name='Book'),
+                            home_odds=Decimal('2.10'), draw_odds=Decimal('3.40'), away_odds=Decimal('3.60'))
+        self.url = reverse('match_lines', args=[self.match.pk])
+
+    def test_requested_lines_are_priced(self):
+        response = self.client.get(self.url, {'totals': '2.25,2.5', 'handicaps': '-0.75'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line['line'] for line in response.json()['totals']], [2.25, 2.5])
+        self.assertEqual(len(response.json()['handicaps']), 1)
+
+    def test_line_count_is_capped(self):
+        ladder = ','.join(str(quarters / 4) for quarters in range(-20, 21))
+        self.assertEqual(self.client.get(self.url, {'handicaps': ladder}).status_code, 200)
+        self.assertEqual(len(ladder.split(',')), MAX_LINES_PER_REQUEST)
+
+        response = self.client.get(self.url, {'totals': ','.join(['2.5'] * (MAX_LINES_PER_REQUEST + 1))})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_LINES_PER_REQUEST), response.json()['error'])
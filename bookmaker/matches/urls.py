@@ -12,4 +12,5 @@ urlpatterns = [
     # API endpoints
     path('api/search/', views.search_matches, name='search_matches'),
     path('api/leagues/', views.get_leagues, name='get_leagues'),
+    path('api/<int:match_id>/lines/', views.match_lines, name='match_lines'),
 ]
\ No newline at end of file
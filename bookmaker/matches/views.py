@@ -7,6 +7,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .serializers import MatchSerializer
+from .services.lines import (
+    DEFAULT_HANDICAP_LINES, DEFAULT_TOTAL_LINES, MAX_HANDICAP_LINE, MAX_LINES_PER_REQUEST, MAX_TOTAL_LINE,
+    match_lines as match_lines_for, parse_line,
+)
 from accounts.services.telegram_notifier import notify_site_visit
 
 
@@ -168,6 +172,44 @@ def match_detail(request, match_id):
     return render(request, 'match_detail.html', context)
 
 
+@api_view(['GET'])
+def match_lines(request, match_id):
+    """
+    API endpoint pricing total and handicap lines of a match on demand.
+    ?totals=2.25,2.5&handicaps=-0.75,0 picks the lines (comma separated,
+    quarter lines allowed, handicaps are the home team's, at most
+    MAX_LINES_PER_REQUEST of each); without them the default ladders are
+    priced.
+    """
+    match = get_object_or_404(Match, id=match_id)
+    lines = match_lines_for(match)
+    if lines is None:
+        return JsonResponse({'error': 'No odds available for this match.'}, status=404)
+
+    def requested(name, defaults, limit, signed=False):
+        value = request.GET.get(name)
+        if not value:
+            return defaults
+        values = [line for line in value.split(',', MAX_LINES_PER_REQUEST) if line.strip()]
+        if len(values) > MAX_LINES_PER_REQUEST:
+            raise ValueError(f"at most {MAX_LINES_PER_REQUEST} {name} lines per request")
+        return [parse_line(line, limit, signed) for line in values]
+
+    try:
+        totals = requested('totals', DEFAULT_TOTAL_LINES, MAX_TOTAL_LINE)
+        handicaps = requested('handicaps', DEFAULT_HANDICAP_LINES, MAX_HANDICAP_LINE, signed=True)
+    except ValueError as e:
+        return JsonResponse({'error': f'Invalid line: {e}'}, status=400)
+
+    return JsonResponse({
+        'match_id': match.id,
+        'totals': [{'line': float(line), **{side: float(price) for side, price in lines.total(line).items()}}
+                   for line in totals],
+        'handicaps': [{'line': float(line), **{side: float(price) for side, price in lines.handicap(line).items()}}
+                      for line in handicaps],
+    })
+
+
 def teams_list(request):
     """View to display all teams with logos"""
     teams = Team.objects.all().order_by('name')
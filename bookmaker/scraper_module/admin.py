@@ -4,7 +4,7 @@ from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.utils.html import format_html
 from django.contrib import messages
-from .models import ScraperStatus, CombinedScraperStatus, LiveScraperStatus
+from .models import ScraperStatus, CombinedScraperStatus, LiveScraperStatus, ScraperJob
 from django_q.tasks import async_task
 
 @admin.register(ScraperStatus)
@@ -179,3 +179,10 @@ class CombinedScraperStatusAdmin(admin.ModelAdmin):
             'upcoming_matches_log': status.upcoming_matches_log,
             'is_running': status.is_running
         })
+
+
+@admin.register(ScraperJob)
+class ScraperJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'worker', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
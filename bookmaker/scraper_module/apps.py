@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ScraperModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scraper_module'
+
+    def ready(self):
+        import scraper_module.signals
@@ -0,0 +1,123 @@
+# scraper_module/browser_host.py
+import asyncio
+from collections import Counter
+
+from django.conf import settings
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+]
+
+# Performance.getMetrics keys summed per context.
+USAGE_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'TaskDuration', 'ScriptDuration', 'LayoutDuration')
+
+
+def browser_host_url():
+    """CDP endpoint of the shared browser host, or None to launch a private Chromium."""
+    return getattr(settings, 'SCRAPER_BROWSER_HOST_URL', None)
+
+
+async def launch_browser(playwright):
+    """
+    Return (browser, shared). With SCRAPER_BROWSER_HOST_URL set, connect to the
+    run_browser_host process over CDP; each monitor then only owns its own
+    BrowserContext. If the host is unreachable, fall back to launching a
+    private Chromium like before.
+    """
+    host_url = browser_host_url()
+    if host_url:
+        try:
+            browser = await playwright.chromium.connect_over_cdp(host_url, timeout=10000)
+            return browser, True
+        except Exception as e:
+            print(f"⚠️ Browser host {host_url} unreachable ({e}), launching a private Chromium")
+    browser = await playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+    return browser, False
+
+
+async def context_usage(context):
+    """
+    Approximate memory / CPU of one BrowserContext by summing CDP
+    Performance.getMetrics over its pages (JS heap in MB, task time in s).
+    """
+    totals = Counter()
+    for page in context.pages:
+        if page.is_closed():
+            continue
+        try:
+            session = await context.new_cdp_session(page)
+            await session.send('Performance.enable')
+            result = await session.send('Performance.getMetrics')
+            await session.detach()
+        except Exception:
+            continue
+        for metric in result.get('metrics', []):
+            if metric['name'] in USAGE_METRICS:
+                totals[metric['name']] += metric['value']
+    return {
+        'pages': len(context.pages),
+        'js_heap_mb': round(totals['JSHeapUsedSize'] / 1_048_576, 1),
+        'dom_nodes': int(totals['Nodes']),
+        'cpu_seconds': round(totals['TaskDuration'], 2),
+        'script_seconds': round(totals['ScriptDuration'], 2),
+        'layout_seconds': round(totals['LayoutDuration'], 2),
+    }
+
+
+def format_usage(label, usage):
+    return (f"🧮 [{label}] {usage['pages']} page(s) | heap {usage['js_heap_mb']} MB | "
+            f"{usage['dom_nodes']} nodes | cpu {usage['cpu_seconds']}s "
+            f"(script {usage['script_seconds']}s, layout {usage['layout_seconds']}s)")
+
+
+async def host_usage(browser):
+    """Browser-wide view for the host: contexts/pages per context and per-process CPU time."""
+    session = await browser.new_browser_cdp_session()
+    try:
+        targets = (await session.send('Target.getTargets'))['targetInfos']
+        try:
+            processes = (await session.send('SystemInfo.getProcessInfo'))['processInfo']
+        except Exception:
+            processes = []
+    finally:
+        await session.detach()
+
+    pages_per_context = Counter(t.get('browserContextId') for t in targets if t['type'] == 'page')
+    cpu_by_type = Counter()
+    for process in processes:
+        cpu_by_type[process['type']] += process.get('cpuTime', 0)
+    return {
+        'contexts': len(pages_per_context),
+        'pages': sum(pages_per_context.values()),
+        'pages_per_context': dict(pages_per_context),
+        'cpu_seconds_by_process_type': {k: round(v, 1) for k, v in cpu_by_type.items()},
+    }
+
+
+async def run_browser_host(port=9222, report_interval=60, log=print):
+    """Launch the shared Chromium with a local CDP endpoint and keep it alive."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(
+            headless=True,
+            args=CHROMIUM_ARGS + [f"--remote-debugging-port={port}", "--remote-debugging-address=127.0.0.1"],
+        )
+        log(f"🟢 Browser host listening on http://127.0.0.1:{port} (Chromium {browser.version})")
+        log(f"   Set SCRAPER_BROWSER_HOST_URL=http://127.0.0.1:{port} for the monitors to share it.")
+        try:
+            while browser.is_connected():
+                await asyncio.sleep(report_interval)
+                try:
+                    usage = await host_usage(browser)
+                    log(f"🧮 Host: {usage['contexts']} context(s), {usage['pages']} page(s) | "
+                        f"cpu by process {usage['cpu_seconds_by_process_type']}")
+                except Exception as e:
+                    log(f"⚠️ Usage report failed: {e}")
+            log("❌ Chromium exited.")
+        finally:
+            if browser.is_connected():
+                await browser.close()
@@ -0,0 +1,131 @@
+# scraper_module/crawl_queue.py
+import heapq
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def pages_per_minute():
+    return float(getattr(settings, 'SCRAPER_DETAIL_PAGES_PER_MINUTE', 20))
+
+
+class TokenBucket:
+    """
+    Crawl budget: `rate` pages per minute, refilled continuously, at most
+    `capacity` pages banked (one scheduled cycle's worth by default). take()
+    grants what is available right now and never blocks.
+
+    The tokens live in the ScraperCounter row `name` (value = tokens,
+    updated_at = last refill), so every django-q worker, recycled ones
+    included, draws from the same budget. Each call is a compare-and-swap
+    on that row; when it keeps losing to other workers, take() grants
+    nothing rather than overspend.
+    """
+
+    def __init__(self, name='crawl_budget', rate=None, capacity=None, retries=5):
+        self.name = name
+        self.rate = float(rate if rate is not None else pages_per_minute())
+        self.capacity = float(capacity if capacity is not None else self.rate * 2)
+        self.retries = retries
+
+    def _update(self, change, default):
+        """Refill the stored bucket, apply change(tokens) -> (tokens, result) and store it; result."""
+        from scraper_module.models import ScraperCounter
+
+        for _ in range(self.retries):
+            bucket = ScraperCounter.get_instance(self.name, default=self.capacity)
+            now = timezone.now()
+            elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+            tokens, result = change(min(self.capacity, bucket.value + elapsed * self.rate / 60.0))
+            if bucket.swap(tokens, now):
+                return result
+        return default
+
+    def take(self, wanted):
+        """Grant up to `wanted` whole tokens; returns how many were granted."""
+        def take(tokens):
+            granted = min(int(wanted), int(tokens))
+            return tokens - granted, granted
+
+        return self._update(take, 0)
+
+    def give_back(self, count):
+        """Return tokens of pages that were planned but not crawled."""
+        if count > 0:
+            self._update(lambda tokens: (min(self.capacity, tokens + count), None), None)
+
+
+class DetailCrawlQueue:
+    """
+    Orders detail-page visits so the budget goes where fresh markets matter:
+
+        priority = minutes since last crawl * (1 + proximity_weight * proximity + stake_weight * stake)
+
+    - proximity is 1 for live matches and 1 / (1 + hours to kickoff) for
+      upcoming ones;
+    - stake is log10(1 + open stake), pending singles plus pending express
+      bets that include the match;
+    - a never-crawled match counts as `max_age` minutes old.
+
+    Age is a factor, so every candidate is crawled eventually, while a live
+    match with money on it comes round many times more often than a quiet
+    fixture tomorrow. Matches crawled less than `min_age` ago are skipped.
+    """
+
+    def __init__(self, horizon=timedelta(hours=24), min_age=timedelta(minutes=2), max_age=timedelta(hours=1),
+                 proximity_weight=4.0, stake_weight=1.0):
+        self.horizon = horizon
+        self.min_age = min_age
+        self.max_age = max_age
+        self.proximity_weight = proximity_weight
+        self.stake_weight = stake_weight
+
+    def candidates(self, now):
+        """Live / upcoming matches within the horizon, annotated with their open stake (one query)."""
+        from matches.models import Bet, ExpressBet, ExpressBetSelection, Match
+
+        money = DecimalField(max_digits=14, decimal_places=2)
+        singles = Bet.objects.filter(match=OuterRef('pk'), status=Bet.STATUS_PENDING).values('match').annotate(
+            total=Sum('amount')).values('total')
+        express = ExpressBetSelection.objects.filter(
+            match=OuterRef('pk'), express_bet__status=ExpressBet.STATUS_PENDING).values('match').annotate(
+            total=Sum('express_bet__amount')).values('total')
+
+        return Match.objects.filter(
+            status__in=[Match.STATUS_LIVE, Match.STATUS_UPCOMING],
+            match_url__isnull=False,
+            match_date__lte=now + self.horizon,
+        ).exclude(details_crawled_at__gt=now - self.min_age).annotate(
+            open_stake=Coalesce(Subquery(singles, output_field=money), Value(0, output_field=money))
+            + Coalesce(Subquery(express, output_field=money), Value(0, output_field=money)),
+        ).values_list('id', 'status', 'match_date', 'details_crawled_at', 'open_stake')
+
+    def priority(self, status, kickoff, crawled_at, open_stake, now):
+        from matches.models import Match
+
+        age = (now - crawled_at) if crawled_at else self.max_age
+        age_minutes = min(age, self.max_age).total_seconds() / 60.0
+        if status == Match.STATUS_LIVE:
+            proximity = 1.0
+        else:
+            proximity = 1.0 / (1.0 + max(0.0, (kickoff - now).total_seconds()) / 3600.0)
+        stake = math.log10(1.0 + float(open_stake or 0))
+        return age_minutes * (1.0 + self.proximity_weight * proximity + self.stake_weight * stake)
+
+    def plan(self, budget, now=None):
+        """Ids of the `budget` most urgent matches, most urgent first."""
+        now = now or timezone.now()
+        if budget <= 0:
+            return []
+        ranked = heapq.nlargest(budget, (
+            (self.priority(status, kickoff, crawled_at, stake, now), pk)
+            for pk, status, kickoff, crawled_at, stake in self.candidates(now)
+        ))
+        return [pk for _, pk in ranked]
+
+
+crawl_budget = TokenBucket()
@@ -0,0 +1,222 @@
+# scraper_module/daemon.py
+import asyncio
+import os
+import socket
+import time
+import traceback
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.utils import timezone
+
+from scraper_module.kickoff_scheduler import KickoffScheduler
+from scraper_module.models import ScraperJob
+
+
+# ==========================================
+# CLIENT SIDE (django-q tasks)
+# ==========================================
+
+def submit_job(kind, payload=None, claim_timeout=5.0, result_timeout=300.0, poll_interval=0.2):
+    """
+    Queue a job for the scraper daemon and block until it finishes.
+
+    Returns the job's result dict, or None when no daemon claimed the job
+    within claim_timeout (the job is then expired so a late daemon will not
+    run it twice) - callers fall back to scraping in-process.
+    Raises RuntimeError if the daemon ran the job and it failed or timed out.
+    """
+    job = ScraperJob.objects.create(kind=kind, payload=payload or {})
+    submitted = time.monotonic()
+
+    while True:
+        time.sleep(poll_interval)
+        job.refresh_from_db(fields=['status', 'result', 'error'])
+        elapsed = time.monotonic() - submitted
+
+        if job.status == ScraperJob.STATUS_DONE:
+            return job.result or {}
+        if job.status == ScraperJob.STATUS_FAILED:
+            raise RuntimeError(f"Scraper daemon job #{job.pk} failed: {job.error}")
+
+        if job.status == ScraperJob.STATUS_PENDING and elapsed >= claim_timeout:
+            expired = ScraperJob.objects.filter(pk=job.pk, status=ScraperJob.STATUS_PENDING).update(
+                status=ScraperJob.STATUS_EXPIRED, finished_at=timezone.now())
+            if expired:
+                return None
+            continue  # claimed in the meantime
+
+        if elapsed >= result_timeout:
+            raise RuntimeError(f"Scraper daemon job #{job.pk} still {job.status} after {result_timeout:.0f}s")
+
+
+# ==========================================
+# DAEMON SIDE (run_scraper_daemon)
+# ==========================================
+
+class ScraperDaemon:
+    """
+    Keeps one XStakeScraper (browser, main-list page) and one PagePool warm and
+    executes ScraperJob rows as they arrive, so a scheduled task only pays for
+    the extraction itself instead of launching Chromium and loading cold pages.
+
+    It also owns the KickoffScheduler: a live-matches job without match_ids
+    is planned here, so there is one heap for all django-q workers and the
+    matches a check saw finish are retired where the next job is planned.
+    """
+
+    def __init__(self, scraper, pages=3, poll_interval=0.2, recycle_after=500, log_callback=None):
+        self.scraper = scraper
+        self.pages = pages
+        self.poll_interval = poll_interval
+        self.recycle_after = recycle_after
+        self.log_callback = log_callback
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.pool = None
+        self.jobs_done = 0
+        self.kickoffs = KickoffScheduler()
+        self.handlers = {
+            ScraperJob.KIND_MAIN_LIST: self.run_main_list,
+            ScraperJob.KIND_LIVE_MATCHES: self.run_live_matches,
+            ScraperJob.KIND_DETAIL_PAGES: self.run_detail_pages,
+        }
+
+    async def log(self, msg):
+        if self.log_callback:
+            await self.log_callback(msg)
+        else:
+            print(msg)
+
+    # --- job table ---
+
+    @staticmethod
+    @sync_to_async
+    def _reset_orphaned_jobs():
+        """Jobs left 'running' by a crashed daemon can never finish."""
+        return ScraperJob.objects.filter(status=ScraperJob.STATUS_RUNNING).update(
+            status=ScraperJob.STATUS_FAILED, error="Daemon restarted while job was running",
+            finished_at=timezone.now())
+
+    @sync_to_async
+    def _claim_next(self):
+        close_old_connections()
+        for job_id in ScraperJob.objects.filter(status=ScraperJob.STATUS_PENDING).values_list('id', flat=True)[:5]:
+            claimed = ScraperJob.objects.filter(id=job_id, status=ScraperJob.STATUS_PENDING).update(
+                status=ScraperJob.STATUS_RUNNING, worker=self.worker, started_at=timezone.now())
+            if claimed:
+                return ScraperJob.objects.get(id=job_id)
+        return None
+
+    @staticmethod
+    @sync_to_async
+    def _finish(job, status, result=None, error=""):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+
+    # --- browser lifecycle ---
+
+    async def start_browser(self):
+        from scraper_module.page_pool import PagePool
+
+        if not await self.scraper.setup_driver():
+            return False
+        await self.scraper.page.goto(self.scraper.base_url, wait_until="domcontentloaded", timeout=60000)
+        self.pool = await PagePool(self.scraper.browser, size=self.pages,
+                                   blocker=self.scraper.resource_blocker).start()
+        return True
+
+    async def stop_browser(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+        await self.scraper.cleanup()
+
+    # --- handlers ---
+
+    async def run_main_list(self, payload):
+        if not await self.scraper.scrape_main_list_only(reuse_driver=True):
+            raise RuntimeError("Main list scrape failed")
+        return dict(self.scraper.last_run_stats)
+
+    def plan_live_checks(self):
+        """Sync and advance the kickoff scheduler; the matches to check and what the plan saw."""
+        changed = self.kickoffs.sync()
+        due = self.kickoffs.advance()
+        next_kickoff = self.kickoffs.next_kickoff()
+        return self.kickoffs.tracked_ids(), {
+            'synced': changed,
+            'kicking_off': len(due),
+            **self.kickoffs.stats(),
+            'next_kickoff': next_kickoff.isoformat() if next_kickoff else None,
+        }
+
+    async def run_live_matches(self, payload):
+        from matches.models import Match
+
+        match_ids, plan = payload.get('match_ids'), None
+        if match_ids is None:
+            match_ids, plan = await sync_to_async(self.plan_live_checks)()
+
+        queryset = Match.objects.filter(id__in=match_ids).select_related('home_team', 'away_team')
+        if not await self.scraper.update_live_matches(queryset, pool=self.pool):
+            raise RuntimeError("Live match update failed")
+        result = dict(self.scraper.last_run_stats)
+        if plan is not None:
+            self.kickoffs.retire(result.get('finished', []))
+            result.update(plan)
+        return result
+
+    async def run_detail_pages(self, payload):
+        if not await self.scraper.crawl_match_details(payload.get('match_ids', []), pool=self.pool):
+            raise RuntimeError("Detail crawl failed")
+        return dict(self.scraper.last_run_stats)
+
+    # --- main loop ---
+
+    async def run(self, status_check_callback=None):
+        orphaned = await self._reset_orphaned_jobs()
+        if orphaned:
+            await self.log(f"⚠️ Marked {orphaned} orphaned running job(s) as failed")
+
+        if not await self.start_browser():
+            await self.log("❌ Failed to start browser. Exiting daemon.")
+            return
+        await self.log(f"🟢 Scraper daemon ready ({self.worker}, {self.pages} pooled page(s))")
+
+        try:
+            while True:
+                if status_check_callback and not await status_check_callback():
+                    await self.log("🛑 Stop signal received. Exiting scraper daemon.")
+                    break
+
+                job = await self._claim_next()
+                if not job:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                handler = self.handlers.get(job.kind)
+                started = time.perf_counter()
+                try:
+                    if not handler:
+                        raise ValueError(f"Unknown job kind '{job.kind}'")
+                    result = await handler(job.payload or {})
+                    result['seconds'] = round(time.perf_counter() - started, 3)
+                    await self._finish(job, ScraperJob.STATUS_DONE, result=result)
+                    await self.log(f"✅ Job #{job.pk} {job.kind} done in {result['seconds']:.2f}s: {result}")
+                except Exception as e:
+                    await self._finish(job, ScraperJob.STATUS_FAILED, error=f"{e}\n{traceback.format_exc()}")
+                    await self.log(f"❌ Job #{job.pk} {job.kind} failed: {e}")
+
+                self.jobs_done += 1
+                if self.jobs_done % self.recycle_after == 0:
+                    # Long-lived Chromium slowly leaks; restart it between jobs
+                    await self.log(f"♻️ Recycling browser after {self.jobs_done} jobs")
+                    await self.stop_browser()
+                    if not await self.start_browser():
+                        await self.log("❌ Failed to restart browser. Exiting daemon.")
+                        break
+        finally:
+            await self.stop_browser()
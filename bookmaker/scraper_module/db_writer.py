@@ -0,0 +1,152 @@
+# scraper_module/db_writer.py
+import asyncio
+import queue
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from django.db import close_old_connections
+
+
+class StageTimings:
+    """Rolling per-stage timings of a monitor's cycles (extract / normalize / persist)."""
+
+    def __init__(self, window=30):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def averages(self):
+        with self._lock:
+            return {stage: sum(s) / len(s) for stage, s in self._samples.items() if s}
+
+    def format(self):
+        parts = [f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in self.averages().items()]
+        return "⏱️ Avg per cycle: " + (" | ".join(parts) if parts else "no samples yet")
+
+
+class DBWriter:
+    """
+    One dedicated thread that owns the scraper's writes. Monitors hand it a
+    cycle's batch and go on extracting the next cycle while it persists:
+
+        future = await writer.submit(save_live_matches_batched, rows)
+        ...                     # extract cycle N+1 meanwhile
+        saved = await future    # or future.add_done_callback(...)
+
+    The queue is bounded: when writes fall behind, submit() waits for a free
+    slot, so at most maxsize cycles are in flight and the scraper slows to the
+    speed of the database instead of piling up batches. Jobs run in order, so
+    a sweep submitted after a save sees that save.
+    """
+
+    def __init__(self, maxsize=2, timings=None, name='scraper-db-writer'):
+        self.maxsize = maxsize
+        self.timings = timings or StageTimings()
+        self.name = name
+        self._queue = queue.Queue()
+        self._slots = None
+        self._thread = None
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.backpressure_seconds = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._slots = asyncio.Semaphore(self.maxsize)
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            func, args, loop, future, stage = job
+            close_old_connections()
+            started = time.perf_counter()
+            try:
+                result = func(*args)
+            except Exception as e:
+                print(f"❌ DB writer: {getattr(func, '__name__', func)} failed: {e}")
+                traceback.print_exc()
+                self.failed += 1
+                loop.call_soon_threadsafe(self._settle, future, None, e)
+            else:
+                self.completed += 1
+                loop.call_soon_threadsafe(self._settle, future, result, None)
+            finally:
+                self.timings.record(stage, time.perf_counter() - started)
+        close_old_connections()
+
+    def _settle(self, future, result, error):
+        self.in_flight -= 1
+        self._slots.release()
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def submit(self, func, *args, stage='persist'):
+        """
+        Queue func(*args) on the writer thread and return an asyncio.Future for
+        its result. Only waits when maxsize jobs are already in flight.
+        A @sync_to_async wrapper is unwrapped; the writer is the thread it runs on.
+        """
+        self.start()
+        func = getattr(func, 'func', func)
+        waited = time.perf_counter()
+        await self._slots.acquire()
+        self.backpressure_seconds += time.perf_counter() - waited
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight += 1
+        self._queue.put((func, args, loop, future, stage))
+        return future
+
+    async def write(self, func, *args, stage='persist'):
+        """submit() and wait for the result."""
+        return await (await self.submit(func, *args, stage=stage))
+
+    async def drain(self):
+        """Wait until every queued write finished."""
+        if not self.running:
+            return
+        for _ in range(self.maxsize):
+            await self._slots.acquire()
+        for _ in range(self.maxsize):
+            self._slots.release()
+
+    async def stop(self):
+        if not self.running:
+            return
+        await self.drain()
+        self._queue.put(None)
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def summary(self):
+        return (f"🗄️ DB writer: {self.completed} written, {self.failed} failed, {self.in_flight} in flight | "
+                f"waited {self.backpressure_seconds:.1f}s on backpressure")
@@ -0,0 +1,220 @@
+# scraper_module/identity.py
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.utils import timezone
+
+
+ACTIVE_STATUSES = ('live', 'halftime', 'upcoming')
+
+_NUMERIC_SEGMENT = re.compile(r'\d+')
+
+
+def normalize_team_name(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def external_match_id(m):
+    """
+    The site's id for a scraped row, as stored in Match.external_id: the
+    structured feed's event id, else match_url's last path segment when it is
+    numeric (the event id), else the url path, else the normalized team pair.
+    """
+    if m.get('match_id'):
+        return str(m['match_id'])
+    match_url = m.get('match_url')
+    if match_url:
+        path = urlsplit(match_url).path.rstrip('/')
+        segment = path.rsplit('/', 1)[-1]
+        if _NUMERIC_SEGMENT.fullmatch(segment):
+            return segment
+        return path or match_url
+    return f"{normalize_team_name(m['home_team'])}|{normalize_team_name(m['away_team'])}"
+
+
+def kickoff_date(value):
+    if value is None:
+        value = timezone.now()
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def natural_key(m):
+    """(external_id, kickoff_date) of a scraped row; Match.source is implied by the scraper."""
+    return external_match_id(m), kickoff_date(m.get('match_datetime'))
+
+
+class IdentityIndex:
+    """
+    Process-local map from what the scraper sees to primary keys:
+
+    - normalized team name      -> (team pk, logo_url)
+    - site team id (opp_1_id)   -> team pk
+    - match_url                 -> match pk
+    - (home pk, away pk)        -> match pk
+    - match pk                  -> (status, match_date)
+
+    Warmed with one query per model, then kept current by record_* calls from
+    the save paths and by post_save / post_delete signals, so a steady-state
+    cycle resolves every identity without a read (see scraper_module.signals).
+    Other processes (admin, settlement) also change rows, so the whole index
+    is rebuilt every ttl seconds as a safety net.
+
+    record_team / record_match apply once the surrounding transaction commits
+    (at once outside one): a rolled-back save must not leave pks of rows that
+    never existed.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self.warmed_at = None
+        self.hits = 0
+        self.misses = 0
+        self._clear()
+
+    def _clear(self):
+        self.teams = {}
+        self.team_names = {}
+        self.site_teams = {}
+        self.match_by_url = {}
+        self.match_by_pair = {}
+        self.match_state = {}
+
+    # --- warm-up ---
+
+    def warm(self):
+        from matches.models import Match, Team
+
+        with self._lock:
+            self._clear()
+            for pk, name, logo_url in Team.objects.values_list('id', 'name', 'logo_url'):
+                self._put_team(pk, name, logo_url)
+            active = Match.objects.filter(status__in=ACTIVE_STATUSES).values_list(
+                'id', 'home_team_id', 'away_team_id', 'match_url', 'status', 'match_date')
+            for pk, home_id, away_id, match_url, status, match_date in active:
+                self._put_match(pk, home_id, away_id, match_url, status, match_date)
+            self.warmed_at = time.monotonic()
+            print(f"🗂️ Identity index warmed: {len(self.teams)} teams, {len(self.match_state)} active matches")
+
+    def ensure_warm(self):
+        if self.warmed_at is None or time.monotonic() - self.warmed_at >= self.ttl:
+            self.warm()
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+            self.warmed_at = None
+
+    @contextmanager
+    def dropped_on_rollback(self):
+        """
+        Wrap a save path's transaction: entries read into the index inside it
+        (record_match(..., on_commit=False)) may describe a state the rollback
+        discarded, so a block that raises drops the index for the next
+        ensure_warm() to rebuild.
+        """
+        try:
+            yield
+        except BaseException:
+            self.invalidate()
+            raise
+
+    # --- teams ---
+
+    def _put_team(self, pk, name, logo_url):
+        key = normalize_team_name(name)
+        # Team.name is unique but case/whitespace variants may exist; keep the first seen
+        if key not in self.teams or self.teams[key][0] == pk:
+            self.teams[key] = (pk, logo_url)
+        self.team_names[pk] = key
+
+    def record_team(self, pk, name, logo_url=None, site_id=None):
+        transaction.on_commit(lambda: self._record_team(pk, name, logo_url, site_id))
+
+    def _record_team(self, pk, name, logo_url, site_id):
+        with self._lock:
+            self._put_team(pk, name, logo_url)
+            if site_id:
+                self.site_teams[str(site_id)] = pk
+
+    def team(self, name, site_id=None):
+        """(team pk, logo_url) or None."""
+        with self._lock:
+            if site_id:
+                pk = self.site_teams.get(str(site_id))
+                if pk is not None and pk in self.team_names:
+                    self.hits += 1
+                    return self.teams.get(self.team_names[pk], (pk, None))
+            entry = self.teams.get(normalize_team_name(name))
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if site_id:
+                    self.site_teams[str(site_id)] = entry[0]
+            return entry
+
+    def forget_team(self, pk):
+        with self._lock:
+            key = self.team_names.pop(pk, None)
+            if key and self.teams.get(key, (None,))[0] == pk:
+                del self.teams[key]
+            for site_id in [s for s, team_pk in self.site_teams.items() if team_pk == pk]:
+                del self.site_teams[site_id]
+
+    # --- matches ---
+
+    def _put_match(self, pk, home_id, away_id, match_url, status, match_date):
+        self.match_state[pk] = (status, match_date, home_id, away_id, match_url)
+        self.match_by_pair[(home_id, away_id)] = pk
+        if match_url:
+            self.match_by_url[match_url] = pk
+
+    def record_match(self, pk, home_id, away_id, match_url, status, match_date, on_commit=True):
+        """on_commit=False is for rows just read from the database, which the caller looks up right away."""
+        if on_commit:
+            transaction.on_commit(
+                lambda: self.record_match(pk, home_id, away_id, match_url, status, match_date, on_commit=False))
+            return
+        with self._lock:
+            self.forget_match(pk)
+            if status in ACTIVE_STATUSES:
+                self._put_match(pk, home_id, away_id, match_url, status, match_date)
+
+    def forget_match(self, pk):
+        with self._lock:
+            state = self.match_state.pop(pk, None)
+            if state is None:
+                return
+            _, _, home_id, away_id, match_url = state
+            if self.match_by_pair.get((home_id, away_id)) == pk:
+                del self.match_by_pair[(home_id, away_id)]
+            if match_url and self.match_by_url.get(match_url) == pk:
+                del self.match_by_url[match_url]
+
+    def match(self, home_id=None, away_id=None, match_url=None, statuses=ACTIVE_STATUSES):
+        """Match pk among the given statuses, by match_url first and then by team pair."""
+        with self._lock:
+            pk = self.match_by_url.get(match_url) if match_url else self.match_by_pair.get((home_id, away_id))
+            state = self.match_state.get(pk) if pk is not None else None
+            if state is None or state[0] not in statuses:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return pk
+
+    def match_date(self, pk):
+        state = self.match_state.get(pk)
+        return state[1] if state else None
+
+    def take_stats(self):
+        stats = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return stats
+
+
+identity_index = IdentityIndex()
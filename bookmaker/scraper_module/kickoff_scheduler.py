@@ -0,0 +1,150 @@
+# scraper_module/kickoff_scheduler.py
+import heapq
+import threading
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+class KickoffScheduler:
+    """
+    Which matches the live checker has to visit, kept without scanning the
+    match table every minute:
+
+    - upcoming matches sit in a min-heap keyed by kickoff time; advance()
+      pops the ones due within `lead` and moves them to the tracked set;
+    - tracked matches are checked every cycle until retire() drops them
+      (the check saw them finish) or the DB says they are no longer live.
+
+    sync() reads only rows whose updated_at moved since the last sync (an
+    indexed range query), so a cycle costs the number of matches that
+    changed, not the number of matches stored. Rescheduled kickoffs push a
+    new heap entry; the old one is skipped when popped. The whole state is
+    reloaded every resync_interval seconds as a safety net, like the
+    identity index.
+
+    The state is per process: one instance lives in the scraper daemon,
+    which plans every live-matches job. Without a daemon, current_ids()
+    reads the same set straight from the DB instead.
+    """
+
+    def __init__(self, lead=timedelta(minutes=1), resync_interval=600, overlap=timedelta(seconds=30)):
+        self.lead = lead
+        self.resync_interval = resync_interval
+        # Rows committed late by another process may carry an older updated_at
+        self.overlap = overlap
+        self._lock = threading.RLock()
+        self.loaded_at = None
+        self._clear()
+
+    def _clear(self):
+        self.heap = []
+        self.kickoffs = {}
+        self.tracked = set()
+        self.watermark = None
+
+    # --- DB ---
+
+    def load(self):
+        from matches.models import Match
+
+        with self._lock:
+            self._clear()
+            self.watermark = timezone.now()
+            rows = Match.objects.filter(
+                status__in=[Match.STATUS_UPCOMING, Match.STATUS_LIVE], match_url__isnull=False
+            ).values_list('id', 'status', 'match_date')
+            for pk, status, kickoff in rows:
+                self._apply(pk, status, kickoff, self.watermark)
+            self.loaded_at = time.monotonic()
+            print(f"🗓️ Kickoff scheduler loaded: {len(self.kickoffs)} upcoming, {len(self.tracked)} tracked")
+
+    def sync(self):
+        """Apply rows changed since the last sync; returns how many were read."""
+        from matches.models import Match
+
+        with self._lock:
+            if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.resync_interval:
+                self.load()
+                return 0
+            now = timezone.now()
+            rows = Match.objects.filter(updated_at__gte=self.watermark - self.overlap).values_list(
+                'id', 'status', 'match_date', 'match_url')
+            count = 0
+            for pk, status, kickoff, match_url in rows:
+                self._apply(pk, status if match_url else None, kickoff, now)
+                count += 1
+            self.watermark = now
+            return count
+
+    def _apply(self, pk, status, kickoff, now):
+        from matches.models import Match
+
+        if status == Match.STATUS_LIVE:
+            self.kickoffs.pop(pk, None)
+            self.tracked.add(pk)
+        elif status == Match.STATUS_UPCOMING:
+            if kickoff <= now + self.lead:
+                # Due (or overdue): the checker decides when it really started
+                self.kickoffs.pop(pk, None)
+                self.tracked.add(pk)
+            elif self.kickoffs.get(pk) != kickoff:
+                # New or rescheduled; a postponed match also leaves the tracked set
+                self.tracked.discard(pk)
+                self.kickoffs[pk] = kickoff
+                heapq.heappush(self.heap, (kickoff, pk))
+        else:
+            self.kickoffs.pop(pk, None)
+            self.tracked.discard(pk)
+
+    # --- scheduling ---
+
+    def advance(self, now=None):
+        """Move every upcoming match due within `lead` to the tracked set; returns their ids."""
+        now = now or timezone.now()
+        due = []
+        with self._lock:
+            horizon = now + self.lead
+            while self.heap and self.heap[0][0] <= horizon:
+                kickoff, pk = heapq.heappop(self.heap)
+                if self.kickoffs.get(pk) != kickoff:
+                    continue  # superseded by a reschedule, or no longer upcoming
+                del self.kickoffs[pk]
+                self.tracked.add(pk)
+                due.append(pk)
+        return due
+
+    def retire(self, match_ids):
+        with self._lock:
+            self.tracked.difference_update(match_ids)
+
+    def tracked_ids(self):
+        with self._lock:
+            return sorted(self.tracked)
+
+    def current_ids(self, now=None):
+        """
+        Ids tracked_ids() would hold after sync() and advance(), from one
+        indexed query instead of this instance's state (which a process
+        other than the daemon does not keep current).
+        """
+        from django.db.models import Q
+        from matches.models import Match
+
+        now = now or timezone.now()
+        return list(Match.objects.filter(
+            Q(status=Match.STATUS_LIVE) | Q(status=Match.STATUS_UPCOMING, match_date__lte=now + self.lead),
+            match_url__isnull=False,
+        ).order_by('id').values_list('id', flat=True))
+
+    def next_kickoff(self):
+        with self._lock:
+            while self.heap and self.kickoffs.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+            return self.heap[0][0] if self.heap else None
+
+    def stats(self):
+        with self._lock:
+            return {'upcoming': len(self.kickoffs), 'tracked': len(self.tracked), 'heap': len(self.heap)}
+
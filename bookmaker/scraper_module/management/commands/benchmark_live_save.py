@@ -0,0 +1,81 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from scraper_module.identity import identity_index
+from scraper_module.management.commands.benchmark_normalizer import make_live_rows, _odd
+from scraper_module.records import BatchNormalizer
+from scraper_module.scraper import save_live_matches_batched, save_live_matches_per_row
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Benchmark one live-list save cycle: per-row transactions vs the batched bulk path. '
+            'Runs against the configured database and rolls everything back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--matches', type=int, default=150, help='Live matches per cycle (default: 150)')
+        parser.add_argument('--cycles', type=int, default=5, help='Update cycles after the first one (default: 5)')
+
+    def run_variant(self, save, n, cycles):
+        """(statements, market lookups, seconds) for the creating cycle and the average update cycle."""
+        rng = random.Random(7)
+        template = make_live_rows(n, rng)
+        normalizer = BatchNormalizer()
+        results = []
+
+        identity_index.invalidate()
+        try:
+            with transaction.atomic():
+                identity_index.warm()
+                for cycle in range(cycles + 1):
+                    for row in template:
+                        row['home_odds'], row['draw_odds'], row['away_odds'] = _odd(rng), _odd(rng), _odd(rng)
+                        if rng.random() < 0.1:
+                            row['home_score'] += 1
+                    rows = normalizer.live_rows([dict(row) for row in template])
+
+                    connection.queries_log.clear()
+                    # The index is fed on commit; run the cycle's hooks as if it had committed
+                    with CaptureQueriesContext(connection) as queries, \
+                            TestCase.captureOnCommitCallbacks(execute=True):
+                        started = time.perf_counter()
+                        saved = save(rows)
+                        elapsed = time.perf_counter() - started
+                    if saved != n:
+                        self.stderr.write(f"  ⚠️ cycle {cycle} saved {saved}/{n} rows")
+                    market_lookups = sum('"matches_market"' in q['sql'] for q in queries.captured_queries)
+                    results.append((len(queries), market_lookups, elapsed))
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            # The index now points at rolled-back rows
+            identity_index.invalidate()
+
+        updates = results[1:] or results
+        return results[0], tuple(sum(column) / len(updates) for column in zip(*updates))
+
+    def handle(self, *args, **options):
+        n, cycles = options['matches'], options['cycles']
+        self.stdout.write(f"📊 {n} live matches, 1 creating cycle + {cycles} update cycle(s), rolled back afterwards")
+
+        variants = (('per-row', save_live_matches_per_row), ('batched', save_live_matches_batched))
+        measured = {name: self.run_variant(save, n, cycles) for name, save in variants}
+
+        for label, index in (('First cycle (creates)', 0), ('Update cycle (avg)', 1)):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+            for name, _ in variants:
+                statements, market_lookups, seconds = measured[name][index]
+                self.stdout.write(f"  {name:<8} {statements:7.0f} statements "
+                                  f"({market_lookups:.0f} derived-odds market lookups) | {seconds * 1000:8.1f} ms/cycle")
+            (old_q, _, old_s), (new_q, _, new_s) = measured['per-row'][index], measured['batched'][index]
+            self.stdout.write(self.style.SUCCESS(
+                f"  → {old_q / max(new_q, 1):.1f}x fewer statements, {old_s / max(new_s, 1e-9):.1f}x faster"))
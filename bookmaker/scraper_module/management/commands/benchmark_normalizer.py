@@ -0,0 +1,163 @@
+import copy
+import random
+import re
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from scraper_module.records import BatchNormalizer
+
+
+# --- Baseline: the per-row dict normalization the monitors used before records.py ---
+
+def legacy_parse_odds(odds_text):
+    try:
+        if odds_text is None:
+            return None
+        cleaned = re.sub(r'[^\d.,-]', '', str(odds_text))
+        cleaned = cleaned.replace(',', '.')
+        return float(cleaned)
+    except (ValueError, TypeError):
+        return None
+
+
+def legacy_parse_match_datetime(date_string, time_string):
+    try:
+        day, month = date_string.split('.')
+        current_year = datetime.now().year
+        hours, minutes = time_string.split(':')
+        return timezone.make_aware(datetime(current_year, int(month), int(day), int(hours), int(minutes)))
+    except Exception:
+        return timezone.now()
+
+
+def legacy_main_rows(rows):
+    for m in rows:
+        m['home_odds'] = legacy_parse_odds(m.get('home_odds'))
+        m['draw_odds'] = legacy_parse_odds(m.get('draw_odds'))
+        m['away_odds'] = legacy_parse_odds(m.get('away_odds'))
+        m['match_datetime'] = legacy_parse_match_datetime(m.get('raw_date') or '', m.get('raw_time') or '')
+        markets = []
+        for market in m.get('markets') or []:
+            outcomes = []
+            for outcome in market.get('outcomes', []):
+                odd_value = legacy_parse_odds(outcome.get('odds'))
+                if odd_value:
+                    outcomes.append({'name': outcome['name'], 'odds': odd_value})
+            if outcomes:
+                markets.append({'name': market['name'], 'outcomes': outcomes})
+        m['markets'] = markets
+    return rows
+
+
+def legacy_live_rows(rows):
+    for m in rows:
+        for key in ['home_odds', 'draw_odds', 'away_odds']:
+            raw_val = m.get(key)
+            if raw_val:
+                try:
+                    m[key] = Decimal(f"{float(str(raw_val).replace(',', '.')):.2f}")
+                except (ValueError, TypeError, InvalidOperation):
+                    m[key] = None
+            else:
+                m[key] = None
+        m['scraped_at'] = timezone.now()
+    return rows
+
+
+# --- Synthetic cycles shaped like MAIN_LIST_EXTRACT_JS / LIVE_LIST_EXTRACT_JS output ---
+
+def _odd(rng):
+    return f"{rng.choice([1, 1, 2, 2, 3, 4, 6])}.{rng.randrange(0, 100):02d}"
+
+
+def make_main_rows(n, rng):
+    dates = [f"{d:02d}.{rng.randrange(1, 13):02d}" for d in range(1, 8)]
+    times = [f"{h:02d}:{m:02d}" for h in range(12, 23) for m in (0, 30)]
+    rows = []
+    for i in range(n):
+        rows.append({
+            'league_name': f"League {i % 40}", 'league_logo': f"https://cdn.example/l{i % 40}.png",
+            'match_url': f"https://gh7.bet/line/201/{i}", 'raw_date': rng.choice(dates), 'raw_time': rng.choice(times),
+            'home_team': f"Home {i}", 'away_team': f"Away {i}",
+            'home_odds': _odd(rng), 'draw_odds': _odd(rng), 'away_odds': _odd(rng),
+            'home_logo': f"https://cdn.example/t{i}.png", 'away_logo': f"https://cdn.example/t{i + n}.png",
+            'markets': [
+                {'name': 'Total', 'outcomes': [{'name': 'Over 2.5', 'odds': _odd(rng)}, {'name': 'Under 2.5', 'odds': _odd(rng)}]},
+                {'name': 'Both teams to score', 'outcomes': [{'name': 'Yes', 'odds': _odd(rng)}, {'name': 'No', 'odds': _odd(rng)}]},
+            ],
+        })
+    return rows
+
+
+def make_live_rows(n, rng):
+    rows = []
+    for i in range(n):
+        rows.append({
+            'league_name': f"League {i % 40}", 'league_order': i % 40 + 1,
+            'home_team': f"Home {i}", 'away_team': f"Away {i}",
+            'home_logo': f"https://cdn.example/t{i}.png", 'away_logo': f"https://cdn.example/t{i + n}.png",
+            'home_score': rng.randrange(0, 4), 'away_score': rng.randrange(0, 4),
+            'match_period': '2nd half', 'match_minute': f"{rng.randrange(1, 90)}'", 'match_status': 'live',
+            'match_url': f"https://gh7.bet/live/201/{i}",
+            'home_odds': _odd(rng), 'draw_odds': _odd(rng), 'away_odds': _odd(rng),
+        })
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark: per-row dict normalization vs BatchNormalizer + ScrapedMatch records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per synthetic cycle (default: 2000)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed cycles per variant (default: 20)')
+
+    def measure(self, func, make_rows, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            rows = make_rows()
+            started = time.perf_counter()
+            func(rows)
+            best = min(best, time.perf_counter() - started)
+
+        # Trace from the raw rows onwards (what page.evaluate hands us) to what a
+        # cycle keeps alive once the raw rows are dropped.
+        tracemalloc.start()
+        rows = make_rows()
+        result = func(rows)
+        del rows
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(result)
+        del result
+        return best, retained / count, peak / count
+
+    def report(self, label, legacy, batch):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+        for name, (seconds, retained, peak) in (('dict / per-row', legacy), ('records / batch', batch)):
+            self.stdout.write(f"  {name:<16} {seconds * 1000:8.2f} ms/cycle | "
+                              f"{retained:8.0f} B retained/row | {peak:8.0f} B peak/row")
+        self.stdout.write(self.style.SUCCESS(
+            f"  → {legacy[0] / batch[0]:.1f}x faster, {legacy[1] / batch[1]:.2f}x less retained memory per row"))
+
+    def handle(self, *args, **options):
+        n, repeat = options['rows'], options['repeat']
+        main_template = make_main_rows(n, random.Random(1))
+        live_template = make_live_rows(n, random.Random(2))
+        normalizer = BatchNormalizer()
+
+        self.stdout.write(f"⏱️ {n} rows/cycle, best of {repeat} cycles")
+        self.report(
+            "Main list",
+            self.measure(legacy_main_rows, lambda: copy.deepcopy(main_template), repeat),
+            self.measure(normalizer.main_rows, lambda: copy.deepcopy(main_template), repeat),
+        )
+        self.report(
+            "Live list",
+            self.measure(legacy_live_rows, lambda: copy.deepcopy(live_template), repeat),
+            self.measure(normalizer.live_rows, lambda: copy.deepcopy(live_template), repeat),
+        )
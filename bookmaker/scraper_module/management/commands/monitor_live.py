@@ -4,16 +4,27 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from matches.models import Match
 from scraper_module.scraper import XStakeScraper
+from scraper_module.page_pool import PagePool
 from asgiref.sync import sync_to_async
 
 class Command(BaseCommand):
     help = 'Monitors live matches, visits their detail pages, and prints all available odds concurrently.'
 
-    async def process_match(self, scraper, match, semaphore):
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3, help='Number of browser pages scraping in parallel (default: 3)')
+        parser.add_argument(
+            '--resource-profile',
+            choices=['off', 'default', 'strict'],
+            default='default',
+            help="Which requests to abort: 'default' drops images/fonts/media and trackers, "
+                 "'strict' also drops third-party hosts (default: default)"
+        )
+
+    async def process_match(self, scraper, match, pool):
         """
-        Process a single match with concurrency control and staggered start.
+        Process a single match on its own pooled page, with a staggered start.
         """
-        async with semaphore:
+        async with pool.page() as page:
             # Staggered start: wait 1-2 seconds before starting the actual scrape
             delay = random.uniform(1.0, 2.0)
             await asyncio.sleep(delay)
@@ -24,14 +35,14 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING(f"  Skipping {match.home_team.name} vs {match.away_team.name}: No match URL."))
                 return
 
-            detailed_odds = await scraper.scrape_match_detail_page(match.match_url)
+            detailed_odds = await scraper.scrape_match_detail_page(match.match_url, page=page)
 
             if detailed_odds:
                 self.stdout.write(self.style.SUCCESS(f"  ✅ Odds found for {match.home_team.name} vs {match.away_team.name}:"))
                 for market_name, outcomes in detailed_odds.items():
                     self.stdout.write(self.style.NOTICE(f"    Market: {market_name}"))
                     for outcome in outcomes:
-                        self.stdout.write(f"      - {outcome}")
+                        self.stdout.write(f"      - {outcome['name']}: {outcome['odds']}")
             else:
                 self.stdout.write(self.style.WARNING(f"  ⚠️ No detailed odds found for {match.home_team.name} vs {match.away_team.name}."))
 
@@ -55,18 +66,24 @@ class Command(BaseCommand):
         self.stdout.write(self.style.MIGRATE_HEADING(f"\n📋 Found {len(live_matches)} matches to monitor:"))
         for i, match in enumerate(live_matches, 1):
             self.stdout.write(f"  {i}. {match.home_team.name} vs {match.away_team.name} ({match.league})")
-        self.stdout.write("\nStarting concurrent processing (3 at a time)...\n")
+        self.stdout.write(f"\nStarting concurrent processing ({options['pages']} pages)...\n")
 
-        # 3. Process concurrently
-        semaphore = asyncio.Semaphore(3)  # Limit to 3 concurrent tasks
-        
-        async with XStakeScraper() as scraper:
-            if not await scraper.setup_driver():
+        # 3. Process concurrently, one pooled page per in-flight match
+        async with XStakeScraper(context_label='detail') as scraper:
+            if not await scraper.setup_driver(resource_profile=options['resource_profile']):
                 self.stdout.write(self.style.ERROR("Failed to set up Playwright driver. Exiting."))
                 return
 
-            tasks = [self.process_match(scraper, match, semaphore) for match in live_matches]
-            await asyncio.gather(*tasks)
+            async with PagePool(scraper.browser, size=options['pages'], blocker=scraper.resource_blocker) as pool:
+                tasks = [self.process_match(scraper, match, pool) for match in live_matches]
+                # A failed navigation raises (its page is recycled); the other matches carry on
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                for match, error in zip(live_matches, results):
+                    if isinstance(error, Exception):
+                        self.stdout.write(self.style.ERROR(
+                            f"  ❌ {match.home_team.name} vs {match.away_team.name}: {error}"))
+                self.stdout.write(self.style.SUCCESS(pool.summary()))
+                self.stdout.write(scraper.resource_blocker.format_cycle())
 
         self.stdout.write(self.style.SUCCESS("\n✅ Live match odds monitoring complete."))
 
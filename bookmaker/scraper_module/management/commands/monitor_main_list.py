@@ -7,6 +7,30 @@ from asgiref.sync import sync_to_async
 class Command(BaseCommand):
     help = 'Persistently monitors the main match list (gh7.bet/line/201) and saves updates to the DB without closing the browser.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['dom', 'feed', 'push'],
+            default='dom',
+            help="'dom' re-reads the rendered page; 'feed' decodes the site's XHR/JSON event payloads; "
+                 "'push' saves rows pushed by an in-page MutationObserver (default: dom)"
+        )
+        parser.add_argument(
+            '--resource-profile',
+            choices=['off', 'default', 'strict'],
+            default='default',
+            help="Which requests to abort: 'default' drops images/fonts/media and trackers, "
+                 "'strict' also drops third-party hosts (default: default)"
+        )
+        parser.add_argument(
+            '--poll-bounds',
+            type=float,
+            nargs=2,
+            metavar=('MIN', 'MAX'),
+            help="Seconds between DOM polls adapt within MIN..MAX "
+                 "(default: settings.SCRAPER_POLL_BOUNDS['main'])"
+        )
+
     async def handle_async(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("🚀 Starting persistent main list monitoring..."))
         
@@ -36,16 +60,31 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"Log error: {e}"))
 
         try:
-            async with XStakeScraper() as scraper:
-                if not await scraper.setup_driver():
+            async with XStakeScraper(context_label='main-list') as scraper:
+                if not await scraper.setup_driver(resource_profile=options['resource_profile']):
                     self.stdout.write(self.style.ERROR("Failed to set up Playwright driver. Exiting."))
                     return
                 
                 # This method contains the infinite loop logic for persistent monitoring
-                await scraper.monitor_main_list_persistent(
-                    status_check_callback=check_status,
-                    log_callback=log_callback
-                )
+                if options['source'] == 'feed':
+                    await scraper.monitor_feed_persistent(
+                        "https://gh7.bet/line/201",
+                        event_type_filter=None,
+                        status_check_callback=check_status,
+                        log_callback=log_callback
+                    )
+                elif options['source'] == 'push':
+                    await scraper.monitor_push_persistent(
+                        kind='main',
+                        status_check_callback=check_status,
+                        log_callback=log_callback
+                    )
+                else:
+                    await scraper.monitor_main_list_persistent(
+                        status_check_callback=check_status,
+                        log_callback=log_callback,
+                        poll_bounds=options['poll_bounds']
+                    )
         finally:
             status = await sync_to_async(ScraperStatus.objects.get)(id=1)
             status.is_running = False
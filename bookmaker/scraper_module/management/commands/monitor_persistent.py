@@ -7,6 +7,31 @@ from asgiref.sync import sync_to_async
 class Command(BaseCommand):
     help = 'Persistently monitors the main LIVE match list (gh7.bet/live/201) and saves updates to the DB.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['dom', 'feed', 'socket', 'push'],
+            default='dom',
+            help="'dom' re-reads the rendered page; 'feed' decodes the site's XHR/JSON event payloads; "
+                 "'socket' applies WebSocket deltas and falls back to DOM polling; "
+                 "'push' saves rows pushed by an in-page MutationObserver (default: dom)"
+        )
+        parser.add_argument(
+            '--resource-profile',
+            choices=['off', 'default', 'strict'],
+            default='default',
+            help="Which requests to abort: 'default' drops images/fonts/media and trackers, "
+                 "'strict' also drops third-party hosts (default: default)"
+        )
+        parser.add_argument(
+            '--poll-bounds',
+            type=float,
+            nargs=2,
+            metavar=('MIN', 'MAX'),
+            help="Seconds between DOM polls adapt within MIN..MAX "
+                 "(default: settings.SCRAPER_POLL_BOUNDS['live'])"
+        )
+
     async def handle_async(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("🚀 Starting persistent LIVE page monitoring..."))
         
@@ -33,15 +58,35 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"Log error: {e}"))
 
         try:
-            async with XStakeScraper() as scraper:
-                if not await scraper.setup_driver():
+            async with XStakeScraper(context_label='live') as scraper:
+                if not await scraper.setup_driver(resource_profile=options['resource_profile']):
                     self.stdout.write(self.style.ERROR("Failed to set up Playwright driver. Exiting."))
                     return
                 
-                await scraper.monitor_live_page_persistent(
-                    status_check_callback=check_status,
-                    log_callback=log_callback
-                )
+                if options['source'] == 'feed':
+                    await scraper.monitor_feed_persistent(
+                        "https://gh7.bet/live/201",
+                        event_type_filter='live',
+                        status_check_callback=check_status,
+                        log_callback=log_callback
+                    )
+                elif options['source'] == 'socket':
+                    await scraper.monitor_live_socket_persistent(
+                        status_check_callback=check_status,
+                        log_callback=log_callback
+                    )
+                elif options['source'] == 'push':
+                    await scraper.monitor_push_persistent(
+                        kind='live',
+                        status_check_callback=check_status,
+                        log_callback=log_callback
+                    )
+                else:
+                    await scraper.monitor_live_page_persistent(
+                        status_check_callback=check_status,
+                        log_callback=log_callback,
+                        poll_bounds=options['poll_bounds']
+                    )
         finally:
             status = await sync_to_async(ScraperStatus.objects.get)(id=1)
             status.is_running = False
@@ -0,0 +1,23 @@
+import asyncio
+from django.core.management.base import BaseCommand
+from scraper_module.browser_host import run_browser_host
+
+
+class Command(BaseCommand):
+    help = ('Runs one shared headless Chromium with a local CDP endpoint. Monitors connect to it '
+            '(SCRAPER_BROWSER_HOST_URL) and each gets its own isolated BrowserContext.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=9222, help='CDP port on 127.0.0.1 (default: 9222)')
+        parser.add_argument('--report-interval', type=int, default=60,
+                            help='Seconds between context/CPU usage reports (default: 60)')
+
+    def handle(self, *args, **options):
+        try:
+            asyncio.run(run_browser_host(
+                port=options['port'],
+                report_interval=options['report_interval'],
+                log=self.stdout.write,
+            ))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("🛑 Browser host stopped."))
@@ -0,0 +1,44 @@
+import asyncio
+from django.core.management.base import BaseCommand
+from scraper_module.scraper import XStakeScraper
+from scraper_module.daemon import ScraperDaemon
+
+
+class Command(BaseCommand):
+    help = ('Runs a long-lived scraper that keeps Chromium and its pages warm and executes '
+            'ScraperJob rows submitted by the scheduled django-q tasks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3, help='Pooled pages for live match checks (default: 3)')
+        parser.add_argument('--poll-interval', type=float, default=0.2,
+                            help='Seconds between job table polls when idle (default: 0.2)')
+        parser.add_argument('--recycle-after', type=int, default=500,
+                            help='Restart the browser after this many jobs (default: 500)')
+        parser.add_argument(
+            '--resource-profile',
+            choices=['off', 'default', 'strict'],
+            default='default',
+            help="Which requests to abort: 'default' drops images/fonts/media and trackers, "
+                 "'strict' also drops third-party hosts (default: default)"
+        )
+
+    async def handle_async(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("🚀 Starting scraper daemon..."))
+
+        async def log_callback(msg):
+            self.stdout.write(msg)
+
+        daemon = ScraperDaemon(
+            XStakeScraper(resource_profile=options['resource_profile'], context_label='daemon'),
+            pages=options['pages'],
+            poll_interval=options['poll_interval'],
+            recycle_after=options['recycle_after'],
+            log_callback=log_callback,
+        )
+        await daemon.run()
+
+    def handle(self, *args, **options):
+        try:
+            asyncio.run(self.handle_async(*args, **options))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("🛑 Scraper daemon stopped."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_module', '0004_scraperjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scraperjob',
+            name='kind',
+            field=models.CharField(choices=[('main_list', 'Main list'), ('live_matches', 'Live matches'), ('detail_pages', 'Detail pages')], max_length=30),
+        ),
+    ]
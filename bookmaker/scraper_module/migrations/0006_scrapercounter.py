@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_module', '0005_scraperjob_detail_pages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScraperCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
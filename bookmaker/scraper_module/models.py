@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import os
 
 
@@ -124,4 +125,79 @@ class CombinedScraperStatus(models.Model):
         return instance
 
     class Meta:
-        verbose_name_plural = "Combined Scraper Status"
\ No newline at end of file
+        verbose_name_plural = "Combined Scraper Status"
+
+class ScraperJob(models.Model):
+    """
+    Command table for the long-lived scraper daemon (run_scraper_daemon).
+    django-q tasks insert a pending job and wait; the daemon claims it, runs it
+    on its warm browser and stores the result.
+    """
+    KIND_MAIN_LIST = 'main_list'
+    KIND_LIVE_MATCHES = 'live_matches'
+    KIND_DETAIL_PAGES = 'detail_pages'
+    KIND_CHOICES = [
+        (KIND_MAIN_LIST, 'Main list'),
+        (KIND_LIVE_MATCHES, 'Live matches'),
+        (KIND_DETAIL_PAGES, 'Detail pages'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+
+
+class ScraperCounter(models.Model):
+    """
+    A named number the scraper processes share: django-q workers, the daemon
+    and fresh in-process scrapers all see the same row, and it survives
+    restarts. updated_at is part of the value (when it was recorded) and
+    doubles as its version: swap() writes only if (value, updated_at) is
+    still what was read.
+    """
+    MAIN_LIST_SEEN = 'main_list_seen'
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.FloatField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} = {self.value:g}"
+
+    @classmethod
+    def get_instance(cls, name, default=0):
+        instance, created = cls.objects.get_or_create(name=name, defaults={'value': default})
+        return instance
+
+    def swap(self, value, updated_at):
+        """Store (value, updated_at) unless another process changed the row since it was read."""
+        swapped = type(self).objects.filter(pk=self.pk, value=self.value, updated_at=self.updated_at).update(
+            value=value, updated_at=updated_at)
+        if swapped:
+            self.value, self.updated_at = value, updated_at
+        return bool(swapped)
@@ -0,0 +1,119 @@
+# scraper_module/page_pool.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+
+class PagePool:
+    """
+    Bounded pool of Playwright pages, one browser context each, so detail
+    scrapes can run in parallel without navigating the same page.
+
+        pool = PagePool(scraper.browser, size=4)
+        await pool.start()
+        async with pool.page() as page:
+            await page.goto(url)
+        print(pool.summary())
+        await pool.close()
+
+    A page is recycled (context closed and reopened) after max_uses checkouts
+    or when the work done with it raised, so a wedged tab or a leaking SPA
+    does not poison later scrapes.
+    """
+
+    def __init__(self, browser, size=3, page_timeout_ms=30000, max_uses=50,
+                 user_agent=DEFAULT_USER_AGENT, viewport=None, blocker=None):
+        self.browser = browser
+        self.blocker = blocker
+        self.size = size
+        self.page_timeout_ms = page_timeout_ms
+        self.max_uses = max_uses
+        self.user_agent = user_agent
+        self.viewport = viewport or {"width": 1920, "height": 1080}
+        self._idle = asyncio.Queue()
+        self._uses = {}
+        self._started_at = None
+        self.completed = 0
+        self.failed = 0
+        self.recycled = 0
+        self.busy_seconds = 0.0
+
+    async def _new_page(self):
+        context = await self.browser.new_context(user_agent=self.user_agent, viewport=self.viewport)
+        if self.blocker:
+            await self.blocker.attach(context)
+        page = await context.new_page()
+        page.set_default_timeout(self.page_timeout_ms)
+        page.set_default_navigation_timeout(self.page_timeout_ms)
+        self._uses[page] = 0
+        return page
+
+    async def _close_page(self, page):
+        self._uses.pop(page, None)
+        try:
+            await page.context.close()
+        except Exception as e:
+            print(f"⚠️ Page pool: failed to close context: {e}")
+
+    async def start(self):
+        pages = await asyncio.gather(*(self._new_page() for _ in range(self.size)))
+        for page in pages:
+            self._idle.put_nowait(page)
+        self._started_at = time.monotonic()
+        print(f"✅ Page pool started with {self.size} page(s)")
+        return self
+
+    async def close(self):
+        while not self._idle.empty():
+            await self._close_page(self._idle.get_nowait())
+        for page in list(self._uses):
+            await self._close_page(page)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a page; it goes back to the pool (or is recycled) on exit."""
+        page = await self._idle.get()
+        started = time.monotonic()
+        ok = False
+        try:
+            yield page
+            ok = True
+        finally:
+            self.busy_seconds += time.monotonic() - started
+            self._uses[page] = self._uses.get(page, 0) + 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+            if not ok or self._uses[page] >= self.max_uses or page.is_closed():
+                self.recycled += 1
+                await self._close_page(page)
+                try:
+                    page = await self._new_page()
+                except Exception as e:
+                    print(f"❌ Page pool: could not replace page, pool shrinks: {e}")
+                    page = None
+            if page is not None:
+                self._idle.put_nowait(page)
+
+    def throughput(self):
+        """Finished checkouts per minute since start()."""
+        if not self._started_at:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return (self.completed / elapsed) * 60 if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"📈 Page pool: {self.completed} done, {self.failed} failed, "
+                f"{self.recycled} recycled | {self.throughput():.1f} matches/min "
+                f"across {self.size} page(s)")
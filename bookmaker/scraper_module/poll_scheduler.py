@@ -0,0 +1,105 @@
+# scraper_module/poll_scheduler.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+# (min, max) seconds between cycles; overridable with settings.SCRAPER_POLL_BOUNDS
+DEFAULT_POLL_BOUNDS = {
+    'main': (2.0, 30.0),
+    'live': (2.0, 20.0),
+}
+
+# The interval each monitor slept before it adapted
+DEFAULT_START_INTERVALS = {
+    'main': 5.0,
+    'live': 10.0,
+}
+
+
+def poll_bounds(name):
+    bounds = getattr(settings, 'SCRAPER_POLL_BOUNDS', None) or {}
+    return tuple(bounds.get(name, DEFAULT_POLL_BOUNDS.get(name, (2.0, 30.0))))
+
+
+class AdaptivePollScheduler:
+    """
+    Interval between two polls of one monitor's page, driven by what the
+    page did lately:
+
+    - change_rate is an exponential moving average of changed rows / rows
+      per cycle (a snapshot diff gives both numbers);
+    - a cycle that changed something shrinks the interval by `speedup`, a
+      quiet one grows it by `backoff` (so an idle page drifts up to max);
+    - a hot page (change_rate >= hot_rate) or one with matches close to
+      kickoff (`urgent`) polls at min_interval straight away.
+
+    The interval always stays within [min_interval, max_interval].
+    """
+
+    def __init__(self, name, min_interval=None, max_interval=None, initial=None,
+                 speedup=0.5, backoff=1.5, alpha=0.3, hot_rate=0.05):
+        default_min, default_max = poll_bounds(name)
+        self.name = name
+        self.min_interval = float(min_interval if min_interval is not None else default_min)
+        self.max_interval = float(max_interval if max_interval is not None else default_max)
+        if self.min_interval <= 0 or self.max_interval < self.min_interval:
+            raise ValueError(f"Invalid poll bounds for {name}: {self.min_interval}..{self.max_interval}")
+        self.speedup = speedup
+        self.backoff = backoff
+        self.alpha = alpha
+        self.hot_rate = hot_rate
+        self.interval = self._clamp(initial if initial is not None else DEFAULT_START_INTERVALS.get(name, 5.0))
+        self.change_rate = 0.0
+        self.last_changed = 0
+        self.last_total = 0
+        self.last_urgent = 0
+        self.cycles = 0
+
+    def _clamp(self, seconds):
+        return min(self.max_interval, max(self.min_interval, float(seconds)))
+
+    def observe(self, changed, total, urgent=0):
+        """Record one cycle (changed rows out of total, urgent rows near kickoff) and return the next interval."""
+        rate = changed / total if total else 0.0
+        self.change_rate = rate if not self.cycles else self.alpha * rate + (1 - self.alpha) * self.change_rate
+        self.cycles += 1
+        self.last_changed, self.last_total, self.last_urgent = changed, total, urgent
+
+        if urgent or self.change_rate >= self.hot_rate:
+            self.interval = self.min_interval
+        elif changed:
+            self.interval = self._clamp(self.interval * self.speedup)
+        else:
+            self.interval = self._clamp(self.interval * self.backoff)
+        return self.interval
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'interval': round(self.interval, 2),
+            'change_rate': round(self.change_rate, 4),
+            'last_changed': self.last_changed,
+            'last_total': self.last_total,
+            'urgent': self.last_urgent,
+            'bounds': (self.min_interval, self.max_interval),
+            'cycles': self.cycles,
+        }
+
+    def format(self):
+        return (f"⏲️ {self.name} poll: every {self.interval:.1f}s | change rate {self.change_rate:.1%}/cycle | "
+                f"last {self.last_changed}/{self.last_total} changed, {self.last_urgent} near kickoff | "
+                f"bounds {self.min_interval:g}-{self.max_interval:g}s")
+
+
+def near_kickoff_count(rows, now=None, before=timedelta(minutes=15), after=timedelta(minutes=5)):
+    """
+    Rows whose match_datetime is at most `before` ahead of now or `after`
+    behind it. Pass the BatchNormalizer's cycle time as now: rows stamped with
+    exactly that time had an unparseable date and are not counted.
+    """
+    now = now or timezone.now()
+    start, end = now - after, now + before
+    return sum(1 for m in rows
+               if (kickoff := m.get('match_datetime')) and kickoff != now and start <= kickoff <= end)
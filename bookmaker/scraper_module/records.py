@@ -0,0 +1,190 @@
+# scraper_module/records.py
+import re
+from dataclasses import dataclass, fields
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+
+MISSING = _Missing()
+
+
+@dataclass(slots=True)
+class ScrapedMatch:
+    """
+    One row of the main / live list. Slotted, so a cycle of a few thousand
+    rows does not carry a hash table per row.
+
+    It keeps the dict protocol the save paths use (m['x'], m.get('x', d),
+    'x' in m, m['x'] = v): a field that the source never filled is MISSING
+    and behaves like an absent key.
+    """
+    home_team: str = ''
+    away_team: str = ''
+    league_name: str = 'Unknown'
+    league_logo: object = MISSING
+    league_order: object = MISSING
+    match_url: object = None
+    raw_date: object = MISSING
+    raw_time: object = MISSING
+    home_logo: object = None
+    away_logo: object = None
+    home_score: object = MISSING
+    away_score: object = MISSING
+    match_period: object = MISSING
+    match_minute: object = MISSING
+    match_status: object = MISSING
+    home_odds: object = None
+    draw_odds: object = None
+    away_odds: object = None
+    markets: object = MISSING
+    match_datetime: object = MISSING
+    scraped_at: object = MISSING
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in _FIELD_SET else MISSING
+        return default if value is MISSING else value
+
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in _FIELD_SET else MISSING
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET and getattr(self, key) is not MISSING
+
+    def as_dict(self):
+        return {name: value for name in FIELD_NAMES if (value := getattr(self, name)) is not MISSING}
+
+
+FIELD_NAMES = tuple(f.name for f in fields(ScrapedMatch))
+_FIELD_SET = frozenset(FIELD_NAMES)
+
+_CLEAN_ODDS = re.compile(r'-?\d+(?:\.\d+)?')
+_ODDS_JUNK = re.compile(r'[^\d.,-]')
+
+
+class BatchNormalizer:
+    """
+    Normalizes a whole extraction cycle at once. Odds strings and
+    (raw_date, raw_time) pairs repeat heavily within a page, so each distinct
+    value is parsed once per cycle, and timezone.now() / the current year are
+    read once per cycle instead of once per row.
+    """
+
+    def __init__(self):
+        self._begin_cycle()
+
+    def _begin_cycle(self):
+        self.now = timezone.now()
+        self.year = datetime.now().year
+        self._odds = {}
+        self._decimals = {}
+        self._dates = {}
+
+    @staticmethod
+    def _record(raw):
+        try:
+            return ScrapedMatch(**raw)
+        except TypeError:
+            # The page handed us a key we do not model; drop it
+            return ScrapedMatch(**{k: v for k, v in raw.items() if k in _FIELD_SET})
+
+    def odds(self, text):
+        """Float odds or None; same rules as XStakeScraper.parse_odds."""
+        if text is None:
+            return None
+        cached = self._odds.get(text, MISSING)
+        if cached is not MISSING:
+            return cached
+        raw = str(text)
+        try:
+            if _CLEAN_ODDS.fullmatch(raw):
+                value = float(raw)
+            else:
+                value = float(_ODDS_JUNK.sub('', raw).replace(',', '.'))
+        except ValueError:
+            value = None
+        self._odds[text] = value
+        return value
+
+    def decimal_odds(self, raw):
+        """Two-place Decimal odds or None (the live save path's format)."""
+        if not raw:
+            return None
+        cached = self._decimals.get(raw, MISSING)
+        if cached is not MISSING:
+            return cached
+        try:
+            value = Decimal(f"{float(str(raw).replace(',', '.')):.2f}")
+        except (ValueError, TypeError, InvalidOperation):
+            print(f"   ⚠️ Warning: Could not convert odd '{raw}' to Decimal. Setting to None.")
+            value = None
+        self._decimals[raw] = value
+        return value
+
+    def match_datetime(self, raw_date, raw_time):
+        key = (raw_date, raw_time)
+        cached = self._dates.get(key)
+        if cached is None:
+            try:
+                day, month = raw_date.split('.')
+                hours, minutes = raw_time.split(':')
+                cached = timezone.make_aware(datetime(self.year, int(month), int(day), int(hours), int(minutes)))
+            except Exception:
+                cached = self.now
+            self._dates[key] = cached
+        return cached
+
+    def main_rows(self, raw_rows):
+        """Raw MAIN_LIST_EXTRACT_JS rows -> ScrapedMatch records for bulk_save_scraped_data."""
+        self._begin_cycle()
+        odds = self.odds
+        records = []
+        for raw in raw_rows:
+            m = self._record(raw)
+            m.home_odds = odds(m.home_odds)
+            m.draw_odds = odds(m.draw_odds)
+            m.away_odds = odds(m.away_odds)
+            m.match_datetime = self.match_datetime(raw.get('raw_date') or '', raw.get('raw_time') or '')
+
+            markets = []
+            for market in raw.get('markets') or ():
+                outcomes = [
+                    {'name': outcome['name'], 'odds': value}
+                    for outcome in market.get('outcomes', ())
+                    if (value := odds(outcome.get('odds')))
+                ]
+                if outcomes:
+                    markets.append({'name': market['name'], 'outcomes': outcomes})
+            m.markets = markets
+            records.append(m)
+        return records
+
+    def live_rows(self, raw_rows):
+        """Raw LIVE_LIST_EXTRACT_JS rows -> ScrapedMatch records for save_live_matches_structured."""
+        self._begin_cycle()
+        decimal_odds = self.decimal_odds
+        records = []
+        for raw in raw_rows:
+            m = self._record(raw)
+            m.home_odds = decimal_odds(m.home_odds)
+            m.draw_odds = decimal_odds(m.draw_odds)
+            m.away_odds = decimal_odds(m.away_odds)
+            m.scraped_at = self.now
+            records.append(m)
+        return records
@@ -0,0 +1,121 @@
+# scraper_module/resource_blocking.py
+from collections import Counter
+from urllib.parse import urlsplit
+
+# We only read DOM text and logo URL strings (from computed styles), so images,
+# fonts and media are never needed. Stylesheets stay allowed in the default
+# profile: the logos are CSS background-images and dropping the CSS would drop
+# the URL strings with it.
+PROFILES = {
+    'off': {
+        'resource_types': set(),
+        'block_trackers': False,
+        'first_party_only': False,
+    },
+    'default': {
+        'resource_types': {'image', 'media', 'font', 'texttrack', 'manifest'},
+        'block_trackers': True,
+        'first_party_only': False,
+    },
+    'strict': {
+        'resource_types': {'image', 'media', 'font', 'texttrack', 'manifest', 'eventsource', 'other'},
+        'block_trackers': True,
+        'first_party_only': True,
+    },
+}
+
+FIRST_PARTY_HOSTS = ('gh7.bet',)
+
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'facebook.com', 'connect.facebook.net', 'hotjar.com', 'mc.yandex.ru',
+    'yandex.ru', 'clarity.ms', 'tiktok.com', 'twitter.com', 'intercom.io', 'livechatinc.com',
+    'jivosite.com', 'onesignal.com', 'sentry.io', 'newrelic.com', 'nr-data.net',
+)
+
+# Aborted requests never report a size, so savings are estimated per type.
+ESTIMATED_BYTES = {
+    'image': 25_000, 'media': 400_000, 'font': 40_000, 'stylesheet': 30_000,
+    'script': 80_000, 'texttrack': 5_000, 'manifest': 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+class ResourceBlocker:
+    """
+    Route-interception profile for a browser context. attach() routes every
+    request of the context through _handle, which aborts what the profile does
+    not need. Counters accumulate per cycle; take_cycle() returns and resets them.
+    """
+
+    def __init__(self, profile='default', first_party_hosts=FIRST_PARTY_HOSTS, extra_blocked_hosts=()):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown resource profile '{profile}'. Choose from: {', '.join(PROFILES)}")
+        self.profile = profile
+        config = PROFILES[profile]
+        self.blocked_types = config['resource_types']
+        self.first_party_only = config['first_party_only']
+        self.blocked_hosts = (TRACKER_HOSTS if config['block_trackers'] else ()) + tuple(extra_blocked_hosts)
+        self.first_party_hosts = tuple(first_party_hosts)
+        self.reset_counters()
+
+    @property
+    def enabled(self):
+        return bool(self.blocked_types or self.blocked_hosts or self.first_party_only)
+
+    def reset_counters(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.blocked_by_type = Counter()
+
+    def should_block(self, url, resource_type):
+        if resource_type in self.blocked_types:
+            return True
+        host = (urlsplit(url).hostname or '').lower()
+        if not host:
+            return False
+        if self.blocked_hosts and _host_matches(host, self.blocked_hosts):
+            return True
+        if self.first_party_only and resource_type != 'document' and not _host_matches(host, self.first_party_hosts):
+            return True
+        return False
+
+    async def _handle(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        if self.should_block(request.url, resource_type):
+            self.blocked += 1
+            self.blocked_by_type[resource_type] += 1
+            self.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            await route.abort('blockedbyclient')
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    async def attach(self, context):
+        if self.enabled:
+            await context.route('**/*', self._handle)
+
+    def take_cycle(self):
+        """Return this cycle's counters and start a new cycle."""
+        stats = {
+            'allowed': self.allowed,
+            'blocked': self.blocked,
+            'bytes_saved': self.bytes_saved,
+            'by_type': dict(self.blocked_by_type),
+        }
+        self.reset_counters()
+        return stats
+
+    def format_cycle(self):
+        stats = self.take_cycle()
+        if not self.enabled:
+            return f"🧱 Blocking off | {stats['allowed']} requests"
+        top = ', '.join(f"{t}={n}" for t, n in sorted(stats['by_type'].items(), key=lambda i: -i[1])[:4])
+        return (f"🧱 Blocked {stats['blocked']}/{stats['blocked'] + stats['allowed']} requests, "
+                f"~{stats['bytes_saved'] / 1024:.0f} KB saved ({top or 'none'})")
@@ -4,23 +4,323 @@ import time
 import re
 import traceback
 from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
 
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import logging
-from tqdm import tqdm
 from django.utils import timezone
 from django.db import transaction
 from asgiref.sync import sync_to_async
 from matches.models import Match, Bookmaker, Odds, Team, Market, Outcome
+from matches.services.bulk import update_rows
+from matches.services.markets import MarketIndex
+from matches.services.pricing import changed_since_priced, price_matches, reprice_matches
+from scraper_module.identity import external_match_id, identity_index, natural_key
+from scraper_module.models import ScraperCounter
+from scraper_module.browser_host import launch_browser, context_usage, format_usage
+from scraper_module.db_writer import DBWriter, StageTimings
+from scraper_module.page_pool import PagePool
+from scraper_module.poll_scheduler import AdaptivePollScheduler, near_kickoff_count
+from scraper_module.records import BatchNormalizer
+from scraper_module.resource_blocking import ResourceBlocker
+from scraper_module.snapshot import (
+    MatchSnapshotCache, MAIN_LIST_FIELDS, LIVE_LIST_FIELDS, main_list_key, live_list_key, format_diff,
+)
 
 logger = logging.getLogger(__name__)
 
+# Per-event extractors shared by the full-page extraction and the
+# MutationObserver push mode. Each is a JS function
+# (event, league, leagueIndex) => row | null.
+MAIN_EVENT_EXTRACT_JS = """(event, league, leagueIndex) => {
+    const cleanBg = (el) => {
+        if (!el) return null;
+        const bg = window.getComputedStyle(el).backgroundImage;
+        if (!bg || bg === 'none') return null;
+        return bg.replace(/^url\\(["']?/, '').replace(/["']?\\)$/, '').trim();
+    };
+
+    let leagueName = "Unknown";
+    let leagueLogo = null;
+    if (league) {
+        const titleEl = league.querySelector('.icon-title__text');
+        if (titleEl) leagueName = titleEl.innerText.trim();
+        leagueLogo = cleanBg(league.querySelector('.icon-title__icon'));
+    }
+
+    const match = {
+        league_name: leagueName,
+        league_logo: leagueLogo,
+        match_url: null,
+        raw_date: "",
+        raw_time: "",
+        home_team: "",
+        away_team: "",
+        home_odds: null,
+        draw_odds: null,
+        away_odds: null,
+        home_logo: null,
+        away_logo: null,
+        markets: []
+    };
+
+    const link = event.querySelector('a.event__link') || event.querySelector('a');
+    if (link) {
+        const href = link.getAttribute('href');
+        if (href) {
+            match.match_url = href.startsWith('http') ? href : 'https://gh7.bet' + (href.startsWith('/') ? href : '/' + href);
+        }
+    }
+
+    const timeEl = event.querySelector('.time__hours');
+    const dateEl = event.querySelector('.time__date');
+    if (timeEl) match.raw_time = timeEl.innerText.trim();
+    if (dateEl) match.raw_date = dateEl.innerText.trim();
+
+    const teamContainers = event.querySelectorAll('.opps__container .icon-title');
+    if (teamContainers.length >= 2) {
+        const homeTextEl = teamContainers[0].querySelector('.icon-title__text');
+        const awayTextEl = teamContainers[1].querySelector('.icon-title__text');
+        if (homeTextEl) match.home_team = homeTextEl.innerText.trim();
+        if (awayTextEl) match.away_team = awayTextEl.innerText.trim();
+        match.home_logo = cleanBg(teamContainers[0].querySelector('.icon-title__icon'));
+        match.away_logo = cleanBg(teamContainers[1].querySelector('.icon-title__icon'));
+    } else {
+        const teams = event.querySelectorAll('.icon-title__text');
+        if (teams.length >= 2) {
+            match.home_team = teams[0].innerText.trim();
+            match.away_team = teams[1].innerText.trim();
+        }
+    }
+
+    const oddsContainer = event.querySelector('.odds');
+    if (oddsContainer) {
+        const buttons = oddsContainer.querySelectorAll('.stake-button');
+        if (buttons.length >= 3) {
+            const h = buttons[0].querySelector('.formated-odd');
+            const d = buttons[1].querySelector('.formated-odd');
+            const a = buttons[2].querySelector('.formated-odd');
+            if (h) match.home_odds = h.innerText.trim();
+            if (d) match.draw_odds = d.innerText.trim();
+            if (a) match.away_odds = a.innerText.trim();
+        }
+    }
+
+    event.querySelectorAll('.accordion-stake').forEach(accordion => {
+        const header = accordion.querySelector('.accordion__header');
+        if (!header) return;
+        const market = {name: header.innerText.trim(), outcomes: []};
+        accordion.querySelectorAll('.stake-button').forEach(button => {
+            const titleEl = button.querySelector('.stake__title');
+            const oddEl = button.querySelector('.formated-odd');
+            if (titleEl && oddEl) {
+                market.outcomes.push({name: titleEl.innerText.trim(), odds: oddEl.innerText.trim()});
+            }
+        });
+        if (market.outcomes.length) match.markets.push(market);
+    });
+
+    return (match.home_team && match.away_team) ? match : null;
+}"""
+
+LIVE_EVENT_EXTRACT_JS = """(event, league, leagueIndex) => {
+    const leagueName = (league && league.querySelector('.icon-title__text')?.innerText.trim()) || "Unknown";
+
+    // --- TEAMS AND LOGOS ---
+    const oppsContainer = event.querySelector('.opps__container');
+    let homeTeam = "", awayTeam = "", homeLogo = null, awayLogo = null;
+
+    const getImgUrl = (el) => {
+        if (!el) return null;
+        const style = window.getComputedStyle(el).backgroundImage;
+        if (!style || style === 'none') return null;
+        let cleanUrl = style.replace(/url\\(['"]?(.*?)['"]?\\)/i, '$1').replace(/['"]/g, '').trim();
+        if (cleanUrl.startsWith('/')) cleanUrl = window.location.origin + cleanUrl;
+        return cleanUrl;
+    };
+
+    if (oppsContainer) {
+        const teamTitles = oppsContainer.querySelectorAll('.icon-title');
+        if (teamTitles.length >= 2) {
+            homeTeam = teamTitles[0].querySelector('.icon-title__text')?.innerText.trim() || "";
+            homeLogo = getImgUrl(teamTitles[0].querySelector('.icon-title__icon'));
+            awayTeam = teamTitles[1].querySelector('.icon-title__text')?.innerText.trim() || "";
+            awayLogo = getImgUrl(teamTitles[1].querySelector('.icon-title__icon'));
+        }
+    }
+
+    // --- MATCH SCORE ---
+    let hScore = null, aScore = null;
+    const scoreColumns = event.querySelectorAll('.opps__scores .scores__column');
+    if (scoreColumns.length > 0) {
+        const mainScoreSpans = scoreColumns[0].querySelectorAll('span');
+        if (mainScoreSpans.length === 2) {
+            const parsedH = parseInt(mainScoreSpans[0].innerText.trim());
+            const parsedA = parseInt(mainScoreSpans[1].innerText.trim());
+            if (!isNaN(parsedH)) hScore = parsedH;
+            if (!isNaN(parsedA)) aScore = parsedA;
+        }
+    }
+
+    // --- STATUS AND MINUTE ---
+    let matchPeriod = "";
+    let matchMinute = "";
+    let matchStatus = "live";
+
+    const statusLeft = event.querySelector('.status.status--left');
+    if (statusLeft) {
+        const periodEl = statusLeft.querySelector('.period');
+        if (periodEl) matchPeriod = periodEl.innerText.trim();
+
+        const spans = statusLeft.querySelectorAll('span');
+        spans.forEach(span => {
+            const text = span.innerText.trim();
+            if (text.includes("'") || /^\\d+$/.test(text)) {
+                matchMinute = text;
+            }
+        });
+    }
+
+    const pLower = matchPeriod.toLowerCase();
+    if (pLower.includes('half time') || pLower === 'ht') {
+        matchStatus = 'halftime';
+    } else if (pLower.includes('finished') || pLower === 'ft' || pLower === 'ended') {
+        matchStatus = 'finished';
+    }
+
+    // --- ODDS ---
+    const getOdd = (btnIndex) => {
+        const buttons = event.querySelectorAll('.odds .stake-button');
+        const btn = buttons[btnIndex];
+        if (!btn || btn.querySelector('.icon-lock')) return null;
+
+        let val = btn.querySelector('.formated-odd')?.innerText.trim();
+        if (!val) return null;
+
+        let numValue = parseFloat(val.replace(',', '.'));
+        return isNaN(numValue) ? null : numValue.toString();
+    };
+
+    if (!homeTeam || !awayTeam) return null;
+    return {
+        league_name: leagueName,
+        league_order: leagueIndex + 1, // SAVING THE ORDER HERE
+        home_team: homeTeam,
+        away_team: awayTeam,
+        home_logo: homeLogo,
+        away_logo: awayLogo,
+        home_score: hScore,
+        away_score: aScore,
+        match_period: matchPeriod,
+        match_minute: matchMinute,
+        match_status: matchStatus,
+        match_url: event.querySelector('a.event__data')?.href || event.querySelector('a')?.href || null,
+        home_odds: getOdd(0),
+        draw_odds: getOdd(1),
+        away_odds: getOdd(2)
+    };
+}"""
+
+LEAGUE_SELECTOR = '.accordion.league-wrap, .league-wrap'
+
+
+def build_list_extract_js(event_extract_js):
+    """
+    Whole-page extraction: walk every league/event once and return plain
+    objects, so a page costs one CDP round trip instead of thousands of
+    query_selector / inner_text calls.
+    """
+    return """() => {
+    const extractEvent = """ + event_extract_js + """;
+    const rows = [];
+    document.querySelectorAll('""" + LEAGUE_SELECTOR + """').forEach((league, leagueIndex) => {
+        league.querySelectorAll('.event').forEach(event => {
+            const row = extractEvent(event, league, leagueIndex);
+            if (row) rows.push(row);
+        });
+    });
+    return rows;
+}"""
+
+
+def build_event_observer_js(event_extract_js, binding_name):
+    """
+    Push mode: install a MutationObserver that collects the .event nodes whose
+    subtree changed and, after a debounce, sends just those rows to Python
+    through the exposed binding. Idempotent - returns false if already installed.
+    """
+    return """(opts) => {
+    if (window.__xstakeObserver) return false;
+    const extractEvent = """ + event_extract_js + """;
+    const leagueSelector = '""" + LEAGUE_SELECTOR + """';
+    const dirty = new Set();
+    let timer = null;
+
+    const flush = () => {
+        timer = null;
+        const leagues = Array.from(document.querySelectorAll(leagueSelector));
+        let batch = [];
+        dirty.forEach(event => {
+            if (!event.isConnected) return;
+            const league = event.closest(leagueSelector);
+            const row = extractEvent(event, league, leagues.indexOf(league));
+            if (row) batch.push(row);
+        });
+        dirty.clear();
+        while (batch.length) {
+            window.""" + binding_name + """(batch.slice(0, opts.maxBatch));
+            batch = batch.slice(opts.maxBatch);
+        }
+    };
+
+    const markDirty = (node) => {
+        const el = node && (node.nodeType === 1 ? node : node.parentElement);
+        if (!el) return;
+        const event = el.closest('.event');
+        if (event) {
+            dirty.add(event);
+        } else if (el.querySelectorAll) {
+            el.querySelectorAll('.event').forEach(e => dirty.add(e));
+        }
+    };
+
+    window.__xstakeObserver = new MutationObserver(records => {
+        records.forEach(record => {
+            markDirty(record.target);
+            record.addedNodes.forEach(markDirty);
+        });
+        if (dirty.size && !timer) timer = setTimeout(flush, opts.debounceMs);
+    });
+    window.__xstakeObserver.observe(document.body, {
+        subtree: true, childList: true, characterData: true, attributes: true, attributeFilter: ['class', 'style']
+    });
+    return true;
+}"""
+
+
+MAIN_LIST_EXTRACT_JS = build_list_extract_js(MAIN_EVENT_EXTRACT_JS)
+LIVE_LIST_EXTRACT_JS = build_list_extract_js(LIVE_EVENT_EXTRACT_JS)
+
+
+
 class XStakeScraper:
-    def __init__(self):
+    def __init__(self, resource_profile='default', context_label='scraper'):
         self.base_url = "https://gh7.bet/line/201"
         self.playwright = None
         self.browser = None
+        self.shared_browser = False
+        self.context_label = context_label
+        self.context = None
         self.page = None
+        self.feed_buffer = []
+        self.resource_blocker = ResourceBlocker(resource_profile)
+        self.last_run_stats = {}
+        self.normalizer = BatchNormalizer()
+        # Monitors persist through one writer thread so cycle N+1 extracts while cycle N is written
+        self.stage_timings = StageTimings()
+        self.db_writer = DBWriter(maxsize=2, timings=self.stage_timings)
+        # One AdaptivePollScheduler per polling monitor ('main', 'live'); see poll_stats()
+        self.poll_schedulers = {}
         print("✅ XStakeScraper initialized with Playwright (async)")
 
     async def __aenter__(self):
@@ -29,24 +329,27 @@ class XStakeScraper:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.cleanup()
 
-    async def setup_driver(self):
+    async def setup_driver(self, resource_profile=None):
+        """
+        Launch Chromium and open the working page. resource_profile ('off',
+        'default', 'strict') overrides the one given to __init__; see
+        scraper_module.resource_blocking.PROFILES.
+        """
+        if resource_profile:
+            self.resource_blocker = ResourceBlocker(resource_profile)
         try:
             self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                    "--window-size=1920,1080"
-                ]
-            )
-            self.page = await self.browser.new_page(
+            # Shared browser host if configured (SCRAPER_BROWSER_HOST_URL), otherwise a private Chromium
+            self.browser, self.shared_browser = await launch_browser(self.playwright)
+            self.context = await self.browser.new_context(
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                            "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
                 viewport={"width": 1920, "height": 1080}
             )
-            print("✅ Playwright browser & page setup successfully")
+            await self.resource_blocker.attach(self.context)
+            self.page = await self.context.new_page()
+            print(f"✅ Playwright {'shared browser context' if self.shared_browser else 'browser & page'} "
+                  f"[{self.context_label}] setup successfully (resource profile: {self.resource_blocker.profile})")
             return True
         except Exception as e:
             print(f"❌ Error setting up Playwright driver: {e}")
@@ -55,6 +358,11 @@ class XStakeScraper:
 
     async def cleanup(self):
         cleanup_errors = []
+        try:
+            # Let the writer finish the cycles it already accepted
+            await self.db_writer.stop()
+        except Exception as e:
+            cleanup_errors.append(f"DB writer stop: {e}")
         try:
             if self.page:
                 await self.page.close()
@@ -62,11 +370,18 @@ class XStakeScraper:
                 print("✅ Page closed")
         except Exception as e:
             cleanup_errors.append(f"Page close: {e}")
+        try:
+            if self.context:
+                await self.context.close()
+                self.context = None
+        except Exception as e:
+            cleanup_errors.append(f"Context close: {e}")
         try:
             if self.browser:
+                # For the shared host this only disconnects; Chromium keeps running
                 await self.browser.close()
                 self.browser = None
-                print("✅ Browser closed")
+                print("✅ Disconnected from browser host" if self.shared_browser else "✅ Browser closed")
         except Exception as e:
             cleanup_errors.append(f"Browser close: {e}")
         try:
@@ -79,6 +394,15 @@ class XStakeScraper:
         if cleanup_errors:
             print(f"⚠️ Cleanup warnings: {', '.join(cleanup_errors)}")
 
+    async def log_resource_usage(self, log):
+        """Log memory / CPU of this scraper's own BrowserContext."""
+        if not self.context:
+            return
+        try:
+            await log(f"   {format_usage(self.context_label, await context_usage(self.context))}")
+        except Exception as e:
+            await log(f"   ⚠️ Could not read context usage: {e}")
+
     def parse_match_datetime(self, date_string, time_string):
         try:
             day, month = date_string.split('.')
@@ -127,7 +451,86 @@ class XStakeScraper:
         except Exception:
             return []
 
-    async def monitor_main_list_persistent(self, status_check_callback=None, log_callback=None):
+    async def extract_main_list(self):
+        """Run MAIN_LIST_EXTRACT_JS once and return (raw rows, seconds spent)."""
+        started = time.perf_counter()
+        rows = await self.page.evaluate(MAIN_LIST_EXTRACT_JS)
+        elapsed = time.perf_counter() - started
+        self.stage_timings.record('extract', elapsed)
+        return rows or [], elapsed
+
+    async def extract_live_list(self):
+        """Run LIVE_LIST_EXTRACT_JS once and return (raw rows, seconds spent)."""
+        started = time.perf_counter()
+        rows = await self.page.evaluate(LIVE_LIST_EXTRACT_JS)
+        elapsed = time.perf_counter() - started
+        self.stage_timings.record('extract', elapsed)
+        return rows or [], elapsed
+
+    async def persist(self, func, *args, on_result=None):
+        """
+        Hand one write to the DB writer thread without waiting for it (only for
+        a free queue slot, which is the backpressure). on_result(result) runs on
+        the event loop once the write is done; a failed write passes None.
+        """
+        future = await self.db_writer.submit(func, *args)
+        if on_result:
+            future.add_done_callback(
+                lambda f: on_result(None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    async def log_pipeline_stats(self, log):
+        await log(f"   {self.stage_timings.format()}")
+        await log(f"   {self.db_writer.summary()}")
+        for scheduler in self.poll_schedulers.values():
+            await log(f"   {scheduler.format()}")
+
+    def poll_scheduler(self, name, poll_bounds=None):
+        """The monitor's AdaptivePollScheduler; poll_bounds=(min, max) seconds overrides the settings."""
+        min_interval, max_interval = poll_bounds or (None, None)
+        self.poll_schedulers[name] = AdaptivePollScheduler(name, min_interval, max_interval)
+        return self.poll_schedulers[name]
+
+    def poll_stats(self):
+        """Current interval and change rate of every polling monitor, by name."""
+        return {name: scheduler.stats() for name, scheduler in self.poll_schedulers.items()}
+
+    def normalize_live_row(self, m):
+        """
+        Convert one structured (feed / socket) live row into the shape
+        save_live_matches_structured expects. DOM list rows go through
+        self.normalizer in batches instead.
+        """
+        for key in ['home_odds', 'draw_odds', 'away_odds']:
+            raw_val = m.get(key)
+            if raw_val:
+                try:
+                    # Convert to float first to strip any weird chars, then to Decimal
+                    clean_float = float(str(raw_val).replace(',', '.'))
+                    m[key] = Decimal(f"{clean_float:.2f}")
+                except (ValueError, TypeError, InvalidOperation):
+                    print(f"   ⚠️ Warning: Could not convert odd '{raw_val}' to Decimal. Setting to None.")
+                    m[key] = None
+            else:
+                m[key] = None
+        m['scraped_at'] = timezone.now()
+        return m
+
+    @staticmethod
+    def live_identifiers(m):
+        """Identifiers the live loop uses to notice a match disappearing from the page."""
+        identifiers = {f"{m['home_team'].strip().lower()}|{m['away_team'].strip().lower()}"}
+        if m.get('match_url'):
+            identifiers.add(m['match_url'])
+        return identifiers
+
+    async def monitor_main_list_persistent(self, status_check_callback=None, log_callback=None, poll_bounds=None):
+        """
+        Re-read the main list until stopped. The pause between cycles adapts
+        to the page (see AdaptivePollScheduler): short while odds move or
+        matches are about to kick off, longer while nothing changes, within
+        poll_bounds=(min, max) seconds (default settings.SCRAPER_POLL_BOUNDS['main']).
+        """
         async def log(msg):
             if log_callback:
                 await log_callback(msg)
@@ -150,205 +553,67 @@ class XStakeScraper:
                 await log("   ⚠️ Timeout waiting for league selector, proceeding anyway...")
 
             heartbeat = 0
-            current_match_identifiers = set()
-            last_cleanup_time = timezone.now()
+            snapshot = MatchSnapshotCache(main_list_key, MAIN_LIST_FIELDS)
+            scheduler = self.poll_scheduler('main', poll_bounds)
 
             while True:
                 if status_check_callback:
                     should_continue = await status_check_callback()
                     if not should_continue:
                         await log("🛑 Stop signal received. Exiting monitor loop.")
-                        await self.cleanup_old_matches(current_match_identifiers)
                         break
 
-                current_match_identifiers.clear()
-
-                # ⬇️ Updated JavaScript evaluation (fixed logo extraction)
-                scraped_data = await self.page.evaluate("""() => {
-                    const matches = [];
-                    const leagues = document.querySelectorAll('.accordion.league-wrap, .league-wrap');
-
-                    leagues.forEach(league => {
-                        let leagueName = "Unknown";
-                        const titleEl = league.querySelector('.icon-title__text');
-                        if (titleEl) leagueName = titleEl.innerText.trim();
-
-                        // League logo
-                        let leagueLogo = null;
-                        const lIcon = league.querySelector('.icon-title__icon');
-                        if (lIcon) {
-                            const bg = window.getComputedStyle(lIcon).backgroundImage;
-                            if (bg && bg !== 'none') {
-                                leagueLogo = bg.replace(/^url\\(["']?/, '').replace(/["']?\\)$/, '');
-                            }
-                        }
-
-                        const events = league.querySelectorAll('.event');
-
-                        events.forEach(event => {
-                            const match = {
-                                league_name: leagueName,
-                                league_logo: leagueLogo,   // store league logo
-                                match_url: null,
-                                raw_date: "",
-                                raw_time: "",
-                                home_team: "",
-                                away_team: "",
-                                home_odds: null,
-                                draw_odds: null,
-                                away_odds: null,
-                                home_logo: null,
-                                away_logo: null,
-                                markets: []
-                            };
-
-                            const link = event.querySelector('a.event__link') || event.querySelector('a');
-                            if (link) {
-                                const href = link.getAttribute('href');
-                                match.match_url = href.startsWith('http') ? href : 'https://gh7.bet' + (href.startsWith('/') ? href : '/' + href);
-                            }
-
-                            const timeEl = event.querySelector('.time__hours');
-                            const dateEl = event.querySelector('.time__date');
-                            if (timeEl) match.raw_time = timeEl.innerText.trim();
-                            if (dateEl) match.raw_date = dateEl.innerText.trim();
-    
-                            const opps = event.querySelectorAll('.opps__container .icon-title__text');
-                            if (opps.length >= 2) {
-                                match.home_team = opps[0].innerText.trim();
-                                match.away_team = opps[1].innerText.trim();
-
-                               
-                            } else {
-                                const teams = event.querySelectorAll('.icon-title__text');
-                                if (teams.length >= 2) {
-                                    match.home_team = teams[0].innerText.trim();
-                                    match.away_team = teams[1].innerText.trim();
-                                }
-                            }
-                            
-                            const teamContainers = event.querySelectorAll('.opps__container .icon-title');
-if (teamContainers.length >= 2) {
-    // Home team
-    const homeContainer = teamContainers[0];
-    const homeTextEl = homeContainer.querySelector('.icon-title__text');
-    if (homeTextEl) match.home_team = homeTextEl.innerText.trim();
-    const homeIconEl = homeContainer.querySelector('.icon-title__icon');
-    if (homeIconEl) {
-        const bg = window.getComputedStyle(homeIconEl).backgroundImage;
-        if (bg && bg !== 'none') {
-            match.home_logo = bg.replace(/^url\(["']?/, '').replace(/["']?\)$/, '').trim();
-        }
-    }
-
-    // Away team
-    const awayContainer = teamContainers[1];
-    const awayTextEl = awayContainer.querySelector('.icon-title__text');
-    if (awayTextEl) match.away_team = awayTextEl.innerText.trim();
-    const awayIconEl = awayContainer.querySelector('.icon-title__icon');
-    if (awayIconEl) {
-        const bg = window.getComputedStyle(awayIconEl).backgroundImage;
-        if (bg && bg !== 'none') {
-            match.away_logo = bg.replace(/^url\(["']?/, '').replace(/["']?\)$/, '').trim();
-        }
-    }
-}
-
-                            const oddsContainer = event.querySelector('.odds');
-                            if (oddsContainer) {
-                                const buttons = oddsContainer.querySelectorAll('.stake-button');
-                                if (buttons.length >= 3) {
-                                    const h = buttons[0].querySelector('.formated-odd');
-                                    const d = buttons[1].querySelector('.formated-odd');
-                                    const a = buttons[2].querySelector('.formated-odd');
-
-                                    if (h) match.home_odds = h.innerText.trim();
-                                    if (d) match.draw_odds = d.innerText.trim();
-                                    if (a) match.away_odds = a.innerText.trim();
-                                }
-                            }
-
-                            if (match.home_team && match.away_team) {
-                                matches.push(match);
-                            }
-                        });
-                    });
-                    return matches;
-                }""")
+                scraped_data, extract_seconds = await self.extract_main_list()
 
                 if scraped_data:
-                    await log(f"\n   📥 Extracted {len(scraped_data)} matches. Processing...")
-
-                    processed_data = []
-                    for m in scraped_data:
-                        # Basic match info
-                       # await log(f"      ⚽ {m['home_team']} vs {m['away_team']} ({m['league_name']})")
-
-                        # ⬇️ New: log logo URLs if they exist
-                        logo_info = []
-                        if m.get('league_logo'):
-                            logo_info.append(f"League: {m['league_logo']}")
-                        if m.get('home_logo'):
-                            logo_info.append(f"Home: {m['home_logo']}")
-                        if m.get('away_logo'):
-                            logo_info.append(f"Away: {m['away_logo']}")
-                        #if logo_info:
-                            #await log(f"         🖼️  Logos: {', '.join(logo_info)}")
-
-                       # await log(
-                       #     f"         🕒 {m['raw_time']} | Odds: 1: {m['home_odds']} | X: {m['draw_odds']} | 2: {m['away_odds']}")
-
-                        # Parse odds, create datetime, etc.
-                        m['home_odds'] = self.parse_odds(m['home_odds'])
-                        m['draw_odds'] = self.parse_odds(m['draw_odds'])
-                        m['away_odds'] = self.parse_odds(m['away_odds'])
-
-                        try:
-                            if m['raw_date'] and m['raw_time']:
-                                day, month = map(int, m['raw_date'].split('.'))
-                                hour, minute = map(int, m['raw_time'].split(':'))
-                                year = datetime.now().year
-                                dt = datetime(year, month, day, hour, minute)
-                                m['match_datetime'] = timezone.make_aware(dt)
-                            else:
-                                m['match_datetime'] = timezone.now()
-                        except:
-                            m['match_datetime'] = timezone.now()
-
-                        match_identifier = f"{m['home_team']}_{m['away_team']}_{m['match_datetime'].strftime('%Y%m%d')}"
-                        current_match_identifiers.add(match_identifier)
-
-                        processed_data.append(m)
-
-                    saved_count = await bulk_save_scraped_data(processed_data)
-                    await log(f"   💾 Saved/Updated {saved_count} matches to DB.")
-
-                    now = timezone.now()
-                    time_since_last_cleanup = (now - last_cleanup_time).total_seconds()
-
-                    if time_since_last_cleanup > 1800:
-                        await self.cleanup_old_matches(current_match_identifiers, log)
-                        last_cleanup_time = now
-                    elif len(scraped_data) > 0 and len(processed_data) > 0:
-                        await self.check_and_cleanup_matches(processed_data, log)
+                    await log(f"\n   📥 Extracted {len(scraped_data)} matches in {extract_seconds:.2f}s. Processing...")
+                    await log(f"   {self.resource_blocker.format_cycle()}")
+
+                    with self.stage_timings.stage('normalize'):
+                        processed_data = self.normalizer.main_rows(scraped_data)
+
+                    # Only new / changed matches reach the DB; a stable page costs no writes.
+                    diff = snapshot.diff(processed_data)
+                    to_save = diff.new + diff.changed
+                    # A resync reports every row as new; it says nothing about the page, so keep the pace
+                    if not snapshot.resynced:
+                        scheduler.observe(len(to_save), len(processed_data),
+                                          urgent=near_kickoff_count(processed_data, now=self.normalizer.now))
+                    await log(f"   🔎 {format_diff(diff)} | next poll in {scheduler.interval:.1f}s")
+                    if to_save:
+                        def saved(saved_count, rows=to_save):
+                            if not saved_count:
+                                snapshot.forget(rows)
+                            asyncio.ensure_future(log(f"   💾 Saved/Updated {saved_count or 0} matches to DB."))
+
+                        await self.persist(bulk_save_scraped_data, to_save, on_result=saved)
+
+                    # A full page every cycle: stamp it and sweep what is gone (queued after the save)
+                    await self.sweep_stale_matches(processed_data, log, wait=False)
 
                 else:
+                    scheduler.observe(0, 0)
                     await log("   ⚠️ No matches found on page.")
 
                 heartbeat += 1
                 if heartbeat >= 6:
                     await log("   💓 Monitor active...")
+                    await self.log_resource_usage(log)
+                    await self.log_pipeline_stats(log)
                     heartbeat = 0
 
-                await asyncio.sleep(5)
+                await asyncio.sleep(scheduler.interval)
 
         except Exception as e:
             await log(f"   ❌ Error monitoring main list: {e}")
 
-    async def monitor_live_page_persistent(self, status_check_callback=None, log_callback=None):
-        # Internal imports for maximum stability
-        from decimal import Decimal, InvalidOperation
-
+    async def monitor_live_page_persistent(self, status_check_callback=None, log_callback=None, poll_bounds=None):
+        """
+        Re-read the live list until stopped, saving changed rows and finishing
+        matches that left the page. The pause between cycles follows the
+        page's change rate within poll_bounds=(min, max) seconds (default
+        settings.SCRAPER_POLL_BOUNDS['live']).
+        """
         async def log(msg):
             if log_callback:
                 await log_callback(msg)
@@ -367,188 +632,69 @@ if (teamContainers.length >= 2) {
 
             @sync_to_async
             def get_db_live_identifiers():
-                identifiers = set()
-                active_matches = Match.objects.filter(status='live').values_list('match_url', 'home_team__name',
+                """identifier -> pk of every live match, so disappeared ones finish by pk."""
+                identifiers = {}
+                active_matches = Match.objects.filter(status='live').values_list('id', 'match_url', 'home_team__name',
                                                                                  'away_team__name')
-                for match_url, home_name, away_name in active_matches:
+                for match_id, match_url, home_name, away_name in active_matches:
                     if match_url:
-                        identifiers.add(match_url)
+                        identifiers[match_url] = match_id
                     else:
-                        identifiers.add(f"{home_name.strip().lower()}|{away_name.strip().lower()}")
+                        identifiers[f"{home_name.strip().lower()}|{away_name.strip().lower()}"] = match_id
                 return identifiers
 
+            live_snapshot = MatchSnapshotCache(live_list_key, LIVE_LIST_FIELDS)
+            scheduler = self.poll_scheduler('live', poll_bounds)
+            cycle = 0
             while True:
                 if status_check_callback and not await status_check_callback():
                     break
 
+                cycle += 1
+                if cycle % 6 == 0:
+                    await self.log_resource_usage(log)
+                    await self.log_pipeline_stats(log)
+
                 try:
                     db_live_identifiers = await get_db_live_identifiers()
                     current_identifiers = set()
 
-                    scraped_data = await self.page.evaluate("""() => {
-                                            const extractedMatches = [];
-                                            const leagues = document.querySelectorAll('.accordion.league-wrap, .league-wrap');
-
-                                            // ADDED leagueIndex to track the exact order on the page
-                                            leagues.forEach((league, leagueIndex) => {
-                                                const leagueName = league.querySelector('.icon-title__text')?.innerText.trim() || "Unknown";
-                                                const events = league.querySelectorAll('.event');
-
-                                                events.forEach(event => {
-                                                    // --- TEAMS AND LOGOS ---
-                                                    const oppsContainer = event.querySelector('.opps__container');
-                                                    let homeTeam = "", awayTeam = "", homeLogo = null, awayLogo = null;
-
-                                                    const getImgUrl = (el) => {
-                                                        if (!el) return null;
-                                                        const style = window.getComputedStyle(el).backgroundImage;
-                                                        if (!style || style === 'none') return null;
-                                                        let cleanUrl = style.replace(/url\\(['"]?(.*?)['"]?\\)/i, '$1').replace(/['"]/g, '').trim();
-                                                        if (cleanUrl.startsWith('/')) cleanUrl = window.location.origin + cleanUrl;
-                                                        return cleanUrl;
-                                                    };
-
-                                                    if (oppsContainer) {
-                                                        const teamTitles = oppsContainer.querySelectorAll('.icon-title');
-                                                        if (teamTitles.length >= 2) {
-                                                            homeTeam = teamTitles[0].querySelector('.icon-title__text')?.innerText.trim() || "";
-                                                            homeLogo = getImgUrl(teamTitles[0].querySelector('.icon-title__icon'));
-                                                            awayTeam = teamTitles[1].querySelector('.icon-title__text')?.innerText.trim() || "";
-                                                            awayLogo = getImgUrl(teamTitles[1].querySelector('.icon-title__icon'));
-                                                        }
-                                                    }
-
-                                                    // --- MATCH SCORE ---
-                                                    let hScore = null, aScore = null;
-                                                    const scoreColumns = event.querySelectorAll('.opps__scores .scores__column');
-                                                    if (scoreColumns.length > 0) {
-                                                        const mainScoreSpans = scoreColumns[0].querySelectorAll('span');
-                                                        if (mainScoreSpans.length === 2) {
-                                                            const parsedH = parseInt(mainScoreSpans[0].innerText.trim());
-                                                            const parsedA = parseInt(mainScoreSpans[1].innerText.trim());
-                                                            if (!isNaN(parsedH)) hScore = parsedH;
-                                                            if (!isNaN(parsedA)) aScore = parsedA;
-                                                        }
-                                                    }
-
-                                                    // --- STATUS AND MINUTE ---
-                                                    let matchPeriod = "";
-                                                    let matchMinute = "";
-                                                    let matchStatus = "live";
-
-                                                    const statusLeft = event.querySelector('.status.status--left');
-                                                    if (statusLeft) {
-                                                        const periodEl = statusLeft.querySelector('.period');
-                                                        if (periodEl) matchPeriod = periodEl.innerText.trim();
-
-                                                        const spans = statusLeft.querySelectorAll('span');
-                                                        spans.forEach(span => {
-                                                            const text = span.innerText.trim();
-                                                            if (text.includes("'") || /^\\d+$/.test(text)) {
-                                                                matchMinute = text;
-                                                            }
-                                                        });
-                                                    }
-
-                                                    const pLower = matchPeriod.toLowerCase();
-                                                    if (pLower.includes('half time') || pLower === 'ht') {
-                                                        matchStatus = 'halftime';
-                                                    } else if (pLower.includes('finished') || pLower === 'ft' || pLower === 'ended') {
-                                                        matchStatus = 'finished';
-                                                    }
-
-                                                    // --- ODDS ---
-                                                    const getOdd = (btnIndex) => {
-                                                        const buttons = event.querySelectorAll('.odds .stake-button');
-                                                        const btn = buttons[btnIndex];
-                                                        if (!btn || btn.querySelector('.icon-lock')) return null;
-
-                                                        let val = btn.querySelector('.formated-odd')?.innerText.trim();
-                                                        if (!val) return null;
-
-                                                        let numValue = parseFloat(val.replace(',', '.')); 
-                                                        return isNaN(numValue) ? null : numValue.toString();
-                                                    };
-
-                                                    if (homeTeam && awayTeam) {
-                                                        extractedMatches.push({
-                                                            league_name: leagueName,
-                                                            league_order: leagueIndex + 1, // SAVING THE ORDER HERE
-                                                            home_team: homeTeam,
-                                                            away_team: awayTeam,
-                                                            home_logo: homeLogo,
-                                                            away_logo: awayLogo,
-                                                            home_score: hScore,
-                                                            away_score: aScore,
-                                                            match_period: matchPeriod,
-                                                            match_minute: matchMinute,
-                                                            match_status: matchStatus,
-                                                            match_url: event.querySelector('a.event__data')?.href || event.querySelector('a')?.href || null,
-                                                            home_odds: getOdd(0),
-                                                            draw_odds: getOdd(1),
-                                                            away_odds: getOdd(2)
-                                                        });
-                                                    }
-                                                });
-                                            });
-                                            return extractedMatches;
-                                        }""")
+                    scraped_data, _ = await self.extract_live_list()
 
                     # --- STEP 2: PROCESS & DEEP LOG ---
                     if scraped_data:
-                        processed_data = []
                         await log(f"\n--- 🛰️ Scraped {len(scraped_data)} matches. Data details: ---")
+                        await log(f"   {self.resource_blocker.format_cycle()}")
+
+                        with self.stage_timings.stage('normalize'):
+                            processed_data = self.normalizer.live_rows(scraped_data)
+                        for m in processed_data:
+                            current_identifiers |= self.live_identifiers(m)
 
-                        for m in scraped_data:
-                            # Print EVERYTHING for debugging
-                           # await log(f"📍 Match: {m['home_team']} vs {m['away_team']}")
-                           # await log(f"   📊 Score: {m['home_score']}-{m['away_score']} | League: {m['league_name']}")
-                           # await log(f"   📈 Odds: H:{m['home_odds']} D:{m['draw_odds']} A:{m['away_odds']}")
-                           # await log(f"   🖼️ Logos: Home({m['home_logo']}) Away({m['away_logo']})")
-
-                            # Identifier logic
-                            home_clean = m['home_team'].strip().lower()
-                            away_clean = m['away_team'].strip().lower()
-                            current_identifiers.add(f"{home_clean}|{away_clean}")
-                            if m.get('match_url'): current_identifiers.add(m['match_url'])
-
-                            # CRITICAL: Double-Sanitize for Decimal
-                            for key in ['home_odds', 'draw_odds', 'away_odds']:
-                                raw_val = m.get(key)
-                                if raw_val:
-                                    try:
-                                        # Convert to float first to strip any weird chars, then to Decimal
-                                        clean_float = float(str(raw_val).replace(',', '.'))
-                                        m[key] = Decimal(f"{clean_float:.2f}")
-                                    except (ValueError, TypeError, InvalidOperation):
-                                        await log(
-                                            f"   ⚠️ Warning: Could not convert odd '{raw_val}' to Decimal. Setting to None.")
-                                        m[key] = None
-                                else:
-                                    m[key] = None
-
-                            m['scraped_at'] = timezone.now()
-                            processed_data.append(m)
-
-                        # --- STEP 3: DB SAVE WITH ERROR CATCHING ---
-                        if hasattr(self, 'save_live_matches_structured'):
-                            try:
-                                # If the error happens HERE, the next line will catch it
-                                await self.save_live_matches_structured(processed_data)
-                            except Exception as e:
-                                await log(f"❌ DATABASE SAVE FAILED: {e}")
-                                # This helps see if it's a specific match causing the crash
-                                for p_match in processed_data:
-                                    if p_match['home_team'] == "Vardar":
-                                        await log(f"🔍 DEBUG VARDAR DATA: {p_match}")
+                        diff = live_snapshot.diff(processed_data)
+                        if not live_snapshot.resynced:
+                            scheduler.observe(len(diff.new) + len(diff.changed) + len(diff.disappeared),
+                                              len(processed_data))
+                        await log(f"   🔎 {format_diff(diff)} | next poll in {scheduler.interval:.1f}s")
+                        processed_data = diff.new + diff.changed
+
+                        # --- STEP 3: DB SAVE ON THE WRITER THREAD (next cycle extracts meanwhile) ---
+                        if processed_data:
+                            def saved(saved_count, rows=processed_data):
+                                if not saved_count:
+                                    live_snapshot.forget(rows)
+                                    asyncio.ensure_future(log(f"❌ DATABASE SAVE FAILED for {len(rows)} row(s)"))
+
+                            await self.persist(save_live_matches_batched, processed_data, on_result=saved)
 
                         # --- STEP 4: CLEANUP ---
-                        disappeared = db_live_identifiers - current_identifiers
-                        for identifier in disappeared:
-                            if hasattr(self, 'mark_match_as_finished_by_identifier'):
-                                await self.mark_match_as_finished_by_identifier(identifier, log)
+                        disappeared = db_live_identifiers.keys() - current_identifiers
+                        await self.finish_disappeared_live_matches(
+                            [db_live_identifiers[identifier] for identifier in disappeared], log)
+                    else:
+                        scheduler.observe(0, 0)
 
-                    await asyncio.sleep(10)
+                    await asyncio.sleep(scheduler.interval)
 
                 except Exception as e:
                     await log(f"❌ Iteration Error: {e}")
@@ -559,72 +705,306 @@ if (teamContainers.length >= 2) {
             await log(f"❌ Critical Scraper Error: {e}")
             await log(traceback.format_exc())
 
-    async def mark_match_as_finished_by_identifier(self, identifier, log_callback=None):
+    async def monitor_live_socket_persistent(self, status_check_callback=None, log_callback=None,
+                                             flush_interval=0.25, stale_after=15.0, dom_interval=10.0,
+                                             reconcile_interval=60.0):
+        """
+        Live monitor driven by the page's own WebSocket feed. Frames are decoded by
+        LiveSocketConsumer and only the events that changed are saved, every
+        flush_interval seconds. The live list is also extracted every
+        reconcile_interval seconds (every dom_interval while no socket is open or
+        it has been silent for stale_after seconds): its changed rows are saved,
+        matches that left it are finished, and socket events that came without a
+        league or 'start' take the league of the same match in it.
+        """
+        from scraper_module.websocket_discovery import LiveSocketConsumer
+
         async def log(msg):
             if log_callback:
                 await log_callback(msg)
             else:
                 print(msg)
 
+        async def save(rows, on_failure=None):
+            """Queue rows on the DB writer, like the other monitors."""
+            def saved(saved_count):
+                if not saved_count:
+                    if on_failure:
+                        on_failure(rows)
+                    asyncio.ensure_future(log(f"❌ DATABASE SAVE FAILED for {len(rows)} row(s)"))
+
+            await self.persist(save_live_matches_batched, rows, on_result=saved)
+
+        def dom_row(m):
+            """The same match in the last DOM extraction, by event id then team pair."""
+            return dom_rows.get(str(m.get('match_id') or '')) or dom_rows.get(live_list_key(m))
+
+        url = "https://gh7.bet/live/201"
+        await log("🚀 Starting live WebSocket monitor...")
+
         try:
-            from asgiref.sync import sync_to_async
-            from matches.models import Match, Bet, ExpressBetSelection
-            from django.db import transaction
+            if not self.page:
+                await self.setup_driver()
 
-            @sync_to_async
-            def update_match_finished(identifier):
-                with transaction.atomic():
-                    if identifier.startswith('http'):
-                        match_query = Match.objects.filter(match_url=identifier, status='live')
-                    else:
-                        parts = identifier.split('|')
-                        if len(parts) == 2:
-                            match_query = Match.objects.filter(
-                                home_team__name__iexact=parts[0],
-                                away_team__name__iexact=parts[1],
-                                status='live'
-                            )
-                        else:
-                            return {'updated': 0, 'bets_count': 0}
+            consumer = LiveSocketConsumer(log=print)
+            consumer.attach(self.page)
+            await self.page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
-                    # Use iterator to handle potential corrupt matches one by one
-                    matches = []
-                    queryset = match_query.select_for_update().iterator()
-                    while True:
-                        try:
-                            match = next(queryset)
-                            matches.append(match)
-                        except StopIteration:
-                            break
-                        except Exception as e:
-                            print(f"⚠️ Skipping corrupt match (identifier: {identifier}): {e}")
-                            continue
+            snapshot = MatchSnapshotCache(live_list_key, LIVE_LIST_FIELDS)
+            dom_rows = {}
+            unresolved_gone = set()
+            socket_mode = False
+            last_dom_poll = 0.0
+            while True:
+                if status_check_callback and not await status_check_callback():
+                    await log("🛑 Stop signal received. Exiting live WebSocket monitor.")
+                    break
 
-                    if not matches:
-                        return {'updated': 0, 'bets_count': 0}
+                try:
+                    healthy = consumer.is_healthy(stale_after)
+                    if healthy and not socket_mode:
+                        await log(f"   🌐 Socket feed active ({len(consumer.open_sockets)} socket(s)), "
+                                  f"DOM reconcile every {reconcile_interval:.0f}s")
+                        socket_mode = True
+                    elif not healthy and socket_mode:
+                        await log("   🔌 Socket feed lost/stale, falling back to DOM polling")
+                        socket_mode = False
+
+                    if time.monotonic() - last_dom_poll >= (reconcile_interval if healthy else dom_interval):
+                        last_dom_poll = time.monotonic()
+                        scraped_data, extract_seconds = await self.extract_live_list()
+                        with self.stage_timings.stage('normalize'):
+                            processed_data = self.normalizer.live_rows(scraped_data)
+                        diff = snapshot.diff(processed_data)
+                        await log(f"   🛰️ DOM poll: {len(processed_data)} matches in {extract_seconds:.2f}s | "
+                                  f"{format_diff(diff)}")
+
+                        to_save = diff.new + diff.changed
+                        if to_save:
+                            await save(to_save, on_failure=snapshot.forget)
+
+                        dom_rows = {}
+                        for m in processed_data:
+                            dom_rows[live_list_key(m)] = m
+                            if m.get('match_url'):
+                                dom_rows[external_match_id(m)] = m
+
+                        # The snapshot has already dropped them: keep the keys until they resolve
+                        gone = (unresolved_gone | set(diff.disappeared)) - snapshot.fingerprints.keys()
+                        unresolved_gone = await self.finish_gone_live_rows(gone, log)
+
+                    changed = consumer.drain() if healthy else None
+                    if changed:
+                        leagues = {}
+                        no_league, no_start = set(), set()
+                        for event in changed:
+                            event = dict(event, type=event.get('type') or 'live')
+                            if not event.get('league'):
+                                no_league.add(str(event.get('id') or ''))
+                            if not event.get('start'):
+                                no_start.add(str(event.get('id') or ''))
+                            leagues.setdefault(event.get('league') or 'Live', []).append(event)
+                        processed_data = await self.process_live_structured_data(
+                            [{'league': name, 'events': events} for name, events in leagues.items()],
+                            log, event_type_filter=None, verbose=False)
+
+                        rows = []
+                        for m in processed_data:
+                            if not m.get('home_team') or not m.get('away_team'):
+                                continue
+                            event_id = str(m.get('match_id') or '')
+                            known = dom_row(m)
+                            if known:
+                                m.setdefault('league_order', known.get('league_order', 999))
+                                m['match_url'] = m.get('match_url') or known.get('match_url')
+                            if event_id in no_league or event_id in no_start:
+                                # No 'Live' league or kickoff = now: wait for the DOM to list it
+                                if not known:
+                                    continue
+                                if event_id in no_league:
+                                    m['league_name'] = known['league_name']
+                                if event_id in no_start:
+                                    if known.get('match_datetime'):
+                                        m['match_datetime'] = known['match_datetime']
+                                    else:
+                                        # The live list shows no kickoff: the stored match keeps its own
+                                        del m['match_datetime']
+                            rows.append(self.normalize_live_row(m))
+                        if rows:
+                            await save(rows)
+                            await log(f"   ⚡ Queued {len(rows)} socket update(s)")
+
+                    await asyncio.sleep(flush_interval)
 
-                    total_bets_settled = 0
-                    for match in matches:
-                        match.status = 'finished'
-                        match.save()
-                        try:
-                            match.settle_bets()
-                        except Exception as e:
-                            print(f"⚠️ Error settling bets for match {match.id}: {e}")
+                except Exception as e:
+                    await log(f"❌ Iteration Error: {e}")
+                    await log(traceback.format_exc())
+                    await asyncio.sleep(5)
+
+            consumer.detach(self.page)
+
+        except Exception as e:
+            await log(f"❌ Critical Scraper Error: {e}")
+            await log(traceback.format_exc())
+
+    async def monitor_push_persistent(self, kind='live', status_check_callback=None, log_callback=None,
+                                      debounce_ms=250, max_batch=200, reconcile_interval=60.0):
+        """
+        Event-driven monitor: a MutationObserver in the page pushes only the
+        .event rows whose DOM changed, so Python does no fixed-interval polling.
+        A full extraction runs every reconcile_interval seconds (and whenever
+        the page had to be reloaded) to reinstall the observer and catch
+        matches that disappeared.
+
+        kind is 'live' (gh7.bet/live/201) or 'main' (gh7.bet/line/201).
+        """
+        async def log(msg):
+            if log_callback:
+                await log_callback(msg)
+            else:
+                print(msg)
+
+        if kind == 'live':
+            url = "https://gh7.bet/live/201"
+            event_js, key_func, fields = LIVE_EVENT_EXTRACT_JS, live_list_key, LIVE_LIST_FIELDS
+        else:
+            url = "https://gh7.bet/line/201"
+            event_js, key_func, fields = MAIN_EVENT_EXTRACT_JS, main_list_key, MAIN_LIST_FIELDS
+        observer_js = build_event_observer_js(event_js, '__xstakePushEvents')
+        queue = asyncio.Queue()
+
+        def normalize(rows):
+            return self.normalizer.live_rows(rows) if kind == 'live' else self.normalizer.main_rows(rows)
+
+        async def save(rows):
+            """Queue rows on the DB writer; they are re-sent next time if the write fails."""
+            def saved(saved_count):
+                if not saved_count:
+                    snapshot.forget(rows)
+
+            await self.persist(save_live_matches_batched if kind == 'live' else bulk_save_scraped_data, rows,
+                               on_result=saved)
+
+        await log(f"🚀 Starting push monitor ({kind}): {url}")
+
+        try:
+            if not self.page:
+                await self.setup_driver()
+
+            await self.page.expose_binding('__xstakePushEvents', lambda source, batch: queue.put_nowait(batch))
+            await self.page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            try:
+                await self.page.wait_for_selector(LEAGUE_SELECTOR, timeout=15000)
+            except PlaywrightTimeoutError:
+                await log("   ⚠️ Timeout waiting for league selector, proceeding anyway...")
 
-                        total_bets_settled += match.bets.exclude(status='pending').count()
-                        total_bets_settled += ExpressBetSelection.objects.filter(match=match).exclude(status='pending').count()
+            snapshot = MatchSnapshotCache(key_func, fields)
+            unresolved_gone = set()
+            last_reconcile = 0.0
+            pushed_rows = 0
+            push_batches = 0
 
-                    return {'updated': len(matches), 'bets_count': total_bets_settled}
+            while True:
+                if status_check_callback and not await status_check_callback():
+                    await log("🛑 Stop signal received. Exiting push monitor.")
+                    break
+
+                try:
+                    if time.monotonic() - last_reconcile >= reconcile_interval:
+                        last_reconcile = time.monotonic()
+                        if await self.page.evaluate(observer_js, {'debounceMs': debounce_ms, 'maxBatch': max_batch}):
+                            await log("   👁️ MutationObserver installed")
+
+                        scraped_data, extract_seconds = await (
+                            self.extract_live_list() if kind == 'live' else self.extract_main_list())
+                        processed_data = normalize(scraped_data)
+                        diff = snapshot.diff(processed_data)
+                        await log(f"   🔄 Reconcile: {len(processed_data)} matches in {extract_seconds:.2f}s | "
+                                  f"{format_diff(diff)} | pushed since last: {pushed_rows} rows / {push_batches} batches")
+                        pushed_rows = push_batches = 0
+                        await log(f"   {self.resource_blocker.format_cycle()}")
+
+                        to_save = diff.new + diff.changed
+                        if to_save:
+                            await save(to_save)
+
+                        if kind == 'main':
+                            await self.sweep_stale_matches(processed_data, log, wait=False)
+                        else:
+                            # The snapshot has already dropped them: keep the keys until they resolve
+                            gone = (unresolved_gone | set(diff.disappeared)) - snapshot.fingerprints.keys()
+                            unresolved_gone = await self.finish_gone_live_rows(gone, log)
+
+                    # Wait for the next pushed batch, then drain whatever else arrived meanwhile
+                    timeout = max(0.0, reconcile_interval - (time.monotonic() - last_reconcile))
+                    try:
+                        batch = await asyncio.wait_for(queue.get(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        continue
+                    batches = [batch]
+                    while not queue.empty():
+                        batches.append(queue.get_nowait())
+
+                    rows = normalize([m for batch in batches for m in batch])
+                    push_batches += len(batches)
+                    pushed_rows += len(rows)
+                    to_save = snapshot.update(rows)
+                    if to_save:
+                        await save(to_save)
+                        await log(f"   ⚡ Pushed {len(rows)} row(s), queued {len(to_save)} change(s)")
+
+                except Exception as e:
+                    await log(f"❌ Iteration Error: {e}")
+                    await log(traceback.format_exc())
+                    # Force a reconcile: the page may have navigated and lost the observer
+                    last_reconcile = 0.0
+                    await asyncio.sleep(5)
+
+        except Exception as e:
+            await log(f"❌ Critical Scraper Error: {e}")
+            await log(traceback.format_exc())
+
+    async def finish_gone_live_rows(self, gone, log):
+        """
+        Finish the live matches behind live_list_key identifiers that left the
+        page. Identity lookups may (re)warm the index, so they run on the DB
+        writer, after the cycle's saves. Returns the identifiers that could not
+        be resolved, for the next reconcile to retry.
+        """
+        if not gone:
+            return set()
+        try:
+            match_ids = await self.db_writer.write(live_match_ids, sorted(gone))
+        except Exception as e:
+            await log(f"   ⚠️ Could not resolve {len(gone)} disappeared match(es): {e}")
+            return gone
+        await self.finish_disappeared_live_matches(match_ids, log)
+        return set()
+
+    async def finish_disappeared_live_matches(self, match_ids, log_callback=None):
+        """
+        Finish live matches that dropped off the live page, by primary key and
+        in one UPDATE on the DB writer (after the cycle's save). Settlement is
+        queued to the django-q workers, so a burst of full-time whistles costs
+        the scrape loop nothing but the queue slot.
+        """
+        async def log(msg):
+            if log_callback:
+                await log_callback(msg)
+            else:
+                print(msg)
 
-            result = await update_match_finished(identifier)
-            if result['updated'] > 0:
-                await log(f"   -> 🏁 Finished {result['updated']} match(es) | 💰 Settled {result['bets_count']} bet(s)")
-            return result
+        def finished(match_ids):
+            if match_ids:
+                asyncio.ensure_future(log(f"   -> 🏁 Finished {len(match_ids)} match(es) | 💰 settlement queued"))
 
+        if not match_ids:
+            return None
+        try:
+            return await self.persist(finish_live_matches, match_ids, on_result=finished)
         except Exception as e:
-            await log(f"      ❌ Failed to mark match as finished: {e}")
-            return {'updated': 0, 'bets_count': 0}
+            await log(f"      ❌ Failed to mark matches as finished: {e}")
+            return None
 
     async def cleanup_old_live_matches(self, current_identifiers, log=None):
         async def log_msg(msg):
@@ -649,7 +1029,12 @@ if (teamContainers.length >= 2) {
         except Exception as e:
             await log_msg(f"   ❌ Error in live match check/cleanup: {e}")
 
-    async def process_live_structured_data(self, leagues_data, log_callback):
+    async def process_live_structured_data(self, leagues_data, log_callback, event_type_filter='live', verbose=True):
+        """
+        Parse the bookmaker's structured league/event payload into match dicts.
+        event_type_filter=None keeps every event type (used for the line feed);
+        verbose=False skips the per-league / per-match log lines.
+        """
         processed_matches = []
         if not leagues_data or not isinstance(leagues_data, list):
             return processed_matches
@@ -661,11 +1046,12 @@ if (teamContainers.length >= 2) {
             events = league.get('events', [])
             if not events:
                 continue
-            await log_callback(f"   📋 League: {league_name} ({len(events)} matches)")
+            if verbose:
+                await log_callback(f"   📋 League: {league_name} ({len(events)} matches)")
             for event in events:
                 try:
                     event_type = event.get('type', '')
-                    if event_type != 'live':
+                    if event_type_filter and event_type != event_type_filter:
                         continue
                     match_data = {
                         'match_id': event.get('id', ''),
@@ -677,7 +1063,10 @@ if (teamContainers.length >= 2) {
                         'away_team_id': event.get('opp_2_id', ''),
                         'home_team_icon': event.get('opp_1_icon', ''),
                         'away_team_icon': event.get('opp_2_icon', ''),
-                        'status': 'live',
+                        'home_logo': event.get('opp_1_icon') or None,
+                        'away_logo': event.get('opp_2_icon') or None,
+                        'match_url': None,
+                        'status': 'live' if event_type == 'live' else 'upcoming',
                         'type': event_type,
                         'sr_id': event.get('sr_id', ''),
                         'count_odds': event.get('count_odds', 0)
@@ -701,6 +1090,7 @@ if (teamContainers.length >= 2) {
                             match_data['score'] = f"{match_data['home_score']}-{match_data['away_score']}"
                         if stats.get('period') == 0 or stats.get('pNow') == 'Finished':
                             match_data['status'] = 'finished'
+                    match_data['match_status'] = match_data['status']
                     odds_data = event.get('odds', [])
                     if odds_data:
                         for odds_market in odds_data:
@@ -729,148 +1119,141 @@ if (teamContainers.length >= 2) {
                                             match_data['odds_1x'] = od_values[0]
                                             match_data['odds_12'] = od_values[1]
                                             match_data['odds_x2'] = od_values[2]
-                    score_display = f" ({match_data.get('score', '?-?')})" if match_data.get('score') else ""
-                    status_display = f" [{match_data['status'].upper()}]"
-                    await log_callback(
-                        f"      ⚽ {match_data['home_team']} vs {match_data['away_team']}{score_display}{status_display}")
-                    if match_data.get('home_odds') and match_data.get('away_odds'):
+                    if verbose:
+                        score_display = f" ({match_data.get('score', '?-?')})" if match_data.get('score') else ""
+                        status_display = f" [{match_data['status'].upper()}]"
                         await log_callback(
-                            f"         📊 Odds: 1: {match_data['home_odds']} | X: {match_data.get('draw_odds', 'N/A')} | 2: {match_data['away_odds']}")
+                            f"      ⚽ {match_data['home_team']} vs {match_data['away_team']}{score_display}{status_display}")
+                        if match_data.get('home_odds') and match_data.get('away_odds'):
+                            await log_callback(
+                                f"         📊 Odds: 1: {match_data['home_odds']} | X: {match_data.get('draw_odds', 'N/A')} | 2: {match_data['away_odds']}")
                     processed_matches.append(match_data)
                 except Exception as e:
                     await log_callback(f"         ⚠️ Error processing event: {e}")
                     continue
         return processed_matches
 
-    async def save_live_matches_structured(self, matches_data):
-        from asgiref.sync import sync_to_async
-        from django.utils import timezone
-
-        @sync_to_async
-        def _process_matches_synchronously(data_list):
-            from django.db import transaction, IntegrityError
-            from matches.models import Match, Team, Odds, Bookmaker
+    @staticmethod
+    def find_feed_leagues(payload, depth=0):
+        """
+        Locate the league list ([{'league': ..., 'events': [...]}, ...]) inside a
+        decoded JSON response. Returns [] when the payload is not an event feed.
+        """
+        if depth > 3:
+            return []
+        if isinstance(payload, list):
+            if payload and all(isinstance(item, dict) and 'events' in item for item in payload):
+                return payload
+            return []
+        if isinstance(payload, dict):
+            if 'events' in payload and isinstance(payload.get('events'), list):
+                return [payload]
+            for value in payload.values():
+                leagues = XStakeScraper.find_feed_leagues(value, depth + 1)
+                if leagues:
+                    return leagues
+        return []
+
+    async def _on_feed_response(self, response):
+        """Playwright 'response' handler: buffer every XHR/fetch JSON body that carries events."""
+        try:
+            if response.request.resource_type not in ('xhr', 'fetch'):
+                return
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            leagues = self.find_feed_leagues(await response.json())
+            if leagues:
+                self.feed_buffer.append(leagues)
+        except Exception:
+            # Bodies of redirected / aborted responses are not readable; skip them.
+            pass
 
-            saved_count = 0
-            bookmaker, _ = Bookmaker.objects.get_or_create(
-                name="GStake",
-                defaults={'website': 'https://gh7.bet'}
-            )
+    async def monitor_feed_persistent(self, url, event_type_filter='live', status_check_callback=None,
+                                      log_callback=None, interval=1.0):
+        """
+        Feed-source monitor: instead of re-reading the rendered DOM, capture the
+        site's own XHR/JSON event payloads, decode them with
+        process_live_structured_data and queue the events that changed on the
+        DB writer, like the other monitors (save_live_matches_batched for live,
+        bulk_save_scraped_data for line).
+        """
+        async def log(msg):
+            if log_callback:
+                await log_callback(msg)
+            else:
+                print(msg)
 
-            for match_data in data_list:
-                try:
-                    with transaction.atomic():
-                        # --- ROBUST TEAM HANDLING ---
-                        # We use a try/except block to handle race conditions where
-                        # two matches try to create the same new team at once.
-                        try:
-                            home_team, _ = Team.objects.get_or_create(
-                                name=match_data['home_team'],
-                                defaults={'logo_url': match_data['home_logo']}
-                            )
-                        except IntegrityError:
-                            home_team = Team.objects.get(name=match_data['home_team'])
+        await log(f"📡 Starting feed monitor for {url} (type={event_type_filter or 'all'})")
+        try:
+            if not self.page:
+                await self.setup_driver()
 
-                        try:
-                            away_team, _ = Team.objects.get_or_create(
-                                name=match_data['away_team'],
-                                defaults={'logo_url': match_data['away_logo']}
-                            )
-                        except IntegrityError:
-                            away_team = Team.objects.get(name=match_data['away_team'])
+            self.feed_buffer = []
+            self.page.on("response", self._on_feed_response)
+            await self.page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
-                        match_url = match_data.get('match_url')
-                        # Check for existing matches in any active state
-                        match_query = Match.objects.filter(status__in=['live', 'halftime', 'upcoming'])
+            if event_type_filter == 'live':
+                save, snapshot = save_live_matches_batched, MatchSnapshotCache(live_list_key, LIVE_LIST_FIELDS)
+            else:
+                save, snapshot = bulk_save_scraped_data, MatchSnapshotCache(main_list_key, MAIN_LIST_FIELDS)
+            heartbeat = 0
+            while True:
+                if status_check_callback and not await status_check_callback():
+                    await log("🛑 Stop signal received. Exiting feed monitor.")
+                    break
 
-                        if match_url:
-                            match = match_query.filter(match_url=match_url).first()
-                        else:
-                            match = match_query.filter(home_team=home_team, away_team=away_team).first()
-
-                        if match:
-                            # --- EXISTING MATCH UPDATE ---
-                            if match.status in ['live', 'upcoming', 'halftime']:
-                                match.status = match_data.get('match_status', 'live')
-
-                            new_h_score = match_data.get('home_score')
-                            new_a_score = match_data.get('away_score')
-
-                            # Safe overwrite: Only update score if scraper found valid numbers
-                            if new_h_score is not None:
-                                match.home_score = new_h_score
-                            if new_a_score is not None:
-                                match.away_score = new_a_score
-
-                            # Update league ordering and live clock details
-                            match.league_order = match_data.get('league_order', 999)
-                            if 'match_minute' in match_data:
-                                match.match_minute = match_data['match_minute']
-                            if 'match_period' in match_data:
-                                match.match_period = match_data['match_period']
-
-                            match.home_odds = match_data.get('home_odds')
-                            match.draw_odds = match_data.get('draw_odds')
-                            match.away_odds = match_data.get('away_odds')
-                            match.scraped_at = timezone.now()
-
-                            if 'half_time_home_score' in match_data:
-                                match.half_time_home_score = match_data['half_time_home_score']
-                                match.half_time_away_score = match_data['half_time_away_score']
-
-                            match.save()
-                            saved_count += 1
-                        else:
-                            # --- NEW MATCH CREATION ---
-                            match = Match.objects.create(
-                                home_team=home_team,
-                                away_team=away_team,
-                                match_date=match_data.get('match_datetime', timezone.now()),
-                                league=match_data.get('league_name', 'Unknown'),
-                                league_order=match_data.get('league_order', 999),
-                                status=match_data.get('match_status', 'live'),
-                                match_url=match_url,
-                                home_score=match_data.get('home_score'),
-                                away_score=match_data.get('away_score'),
-                                match_minute=match_data.get('match_minute', ''),
-                                match_period=match_data.get('match_period', ''),
-                                home_odds=match_data.get('home_odds'),
-                                draw_odds=match_data.get('draw_odds'),
-                                away_odds=match_data.get('away_odds'),
-                                scraped_at=timezone.now()
-                            )
-                            if 'half_time_home_score' in match_data:
-                                match.half_time_home_score = match_data['half_time_home_score']
-                                match.half_time_away_score = match_data['half_time_away_score']
-                                match.save()
-                            saved_count += 1
+                if self.feed_buffer:
+                    batches, self.feed_buffer = self.feed_buffer, []
+                    started = time.perf_counter()
+
+                    # Several payloads can arrive per cycle; keep only the latest copy of each event.
+                    latest = {}
+                    for leagues in batches:
+                        for m in await self.process_live_structured_data(
+                                leagues, log, event_type_filter=event_type_filter, verbose=False):
+                            key = m.get('match_id') or f"{m['home_team']}|{m['away_team']}"
+                            latest[key] = m
+
+                    processed_data = [self.normalize_live_row(m) for m in latest.values()
+                                      if m.get('home_team') and m.get('away_team')]
+                    summary = (f"   📡 Feed: {len(batches)} payload(s), {len(processed_data)} events decoded in "
+                               f"{time.perf_counter() - started:.3f}s")
+
+                    # Payloads repeat events that did not change; only new / changed ones reach the DB
+                    to_save = snapshot.update(processed_data)
+                    if to_save:
+                        def saved(saved_count, rows=to_save, summary=summary):
+                            if not saved_count:
+                                snapshot.forget(rows)
+                            asyncio.ensure_future(log(f"{summary}, saved {saved_count or 0}"))
+
+                        await self.persist(save, to_save, on_result=saved)
+                    elif processed_data:
+                        await log(f"{summary}, no changes")
 
-                        # --- ODDS SAVING ---
-                        if match_data.get('home_odds') and match_data.get('away_odds'):
-                            Odds.objects.update_or_create(
-                                match=match,
-                                bookmaker=bookmaker,
-                                defaults={
-                                    'home_odds': match_data.get('home_odds'),
-                                    'draw_odds': match_data.get('draw_odds') or 3.0,
-                                    'away_odds': match_data.get('away_odds'),
-                                }
-                            )
-                            if match.home_odds and match.away_odds:
-                                try:
-                                    match.calculate_derived_odds()
-                                except Exception as calc_error:
-                                    print(
-                                        f"Warning: Failed derived odds for {match.home_team} vs {match.away_team}: {calc_error}")
+                heartbeat += 1
+                if heartbeat >= 60:
+                    await log("   💓 Feed monitor active...")
+                    heartbeat = 0
 
-                except Exception as e:
-                    print(
-                        f"Error saving live match {match_data.get('home_team')} vs {match_data.get('away_team')}: {e}")
-                    continue
-            return saved_count
+                await asyncio.sleep(interval)
 
+        except Exception as e:
+            await log(f"   ❌ Error in feed monitor: {e}")
+            await log(traceback.format_exc())
+        finally:
+            if self.page:
+                self.page.remove_listener("response", self._on_feed_response)
+
+    async def save_live_matches_structured(self, matches_data, batched=True):
+        """
+        Persist one live-list cycle. The batched path (default) writes the whole
+        cycle in one transaction with bulk statements; batched=False keeps the
+        per-match transactions of save_live_matches_per_row.
+        """
+        save = save_live_matches_batched if batched else save_live_matches_per_row
         try:
-            return await _process_matches_synchronously(matches_data)
+            return await sync_to_async(save)(matches_data)
         except Exception as e:
             print(f"Error in save_live_matches_structured: {e}")
             return 0
@@ -928,23 +1311,29 @@ if (teamContainers.length >= 2) {
         except Exception as e:
             await log(f"   ❌ Error in update_finished_matches: {e}")
 
-    async def scrape_match_detail_page(self, match_url):
+    async def scrape_match_detail_page(self, match_url, page=None):
+        """
+        {market name: [{'name': outcome name, 'odds': Decimal}, ...]} of a match
+        page ({} when it could not be read). Navigation errors are raised: the
+        page may be wedged, and a PagePool only recycles a page that failed.
+        """
+        page = page or self.page
+        print(f"🔍 Visiting: {match_url}")
+        await page.goto(match_url, wait_until="domcontentloaded", timeout=30000)
         try:
-            print(f"🔍 Visiting: {match_url}")
-            await self.page.goto(match_url, wait_until="domcontentloaded", timeout=30000)
             await asyncio.sleep(2)
             score_text = ""
             try:
-                score_el = await self.page.query_selector('.score') or await self.page.query_selector('.match-score')
+                score_el = await page.query_selector('.score') or await page.query_selector('.match-score')
                 if score_el:
                     score_text = (await score_el.inner_text()).strip()
             except:
                 pass
             print(f"   📊 Score: {score_text if score_text else 'Not started/No score'}")
             markets_data = {}
-            market_containers = await self.page.query_selector_all('.accordion-stake')
+            market_containers = await page.query_selector_all('.accordion-stake')
             if not market_containers:
-                market_containers = await self.page.query_selector_all('.market-group')
+                market_containers = await page.query_selector_all('.market-group')
             for container in market_containers:
                 try:
                     title_el = await container.query_selector('.accordion__header') or await container.query_selector('.market-title')
@@ -959,8 +1348,9 @@ if (teamContainers.length >= 2) {
                         odd_el = await btn.query_selector('.formated-odd')
                         if name_el and odd_el:
                             outcome_name = (await name_el.inner_text()).strip()
-                            odd_val = (await odd_el.inner_text()).strip()
-                            markets_data[market_name].append(f"{outcome_name}: {odd_val}")
+                            odds = parse_detail_odds(await odd_el.inner_text())
+                            if outcome_name and odds:
+                                markets_data[market_name].append({'name': outcome_name, 'odds': odds})
                 except Exception:
                     continue
             return markets_data
@@ -968,46 +1358,106 @@ if (teamContainers.length >= 2) {
             print(f"   ❌ Error scraping detail page: {e}")
             return {}
 
-    async def update_specific_matches(self, matches_queryset):
+    async def crawl_match_details(self, match_ids, concurrency=3, pool=None):
+        """
+        Visit the detail pages of match_ids (in that order, most urgent first;
+        see DetailCrawlQueue) on pooled pages and store their markets. As with
+        update_live_matches, pass a started PagePool to reuse warm pages.
+        """
+        reuse_driver = pool is not None
         try:
-            print(f"🚀 Starting Detail Update for {len(matches_queryset)} matches...")
-            matches_list = []
-            async for m in matches_queryset:
-                matches_list.append(m)
-            for match in tqdm(matches_list, desc="Recalculating Derived Odds", unit="match"):
-                await calculate_and_save_derived_odds(match)
-            print("✅ Detail update complete (derived odds recalculated).")
+            print(f"🚀 Starting Detail Crawl for {len(match_ids)} matches...")
+            if not reuse_driver and not await self.setup_driver():
+                return False
+            urls = await get_match_urls(match_ids)
+
+            own_pool = None
+            if pool is None:
+                pool = own_pool = await PagePool(self.browser, size=concurrency, blocker=self.resource_blocker).start()
+            crawled, changes = [], {'inserted': 0, 'updated': 0, 'deleted': 0}
+            try:
+                async def crawl(match_id, match_url):
+                    async with pool.page() as page:
+                        markets_data = await self.scrape_match_detail_page(match_url, page=page)
+                    for key, count in (await save_detail_markets(match_id, markets_data)).items():
+                        changes[key] += count
+                    crawled.append(match_id)
+
+                results = await asyncio.gather(*(crawl(pk, urls[pk]) for pk in match_ids if pk in urls),
+                                               return_exceptions=True)
+                for error in (r for r in results if isinstance(r, Exception)):
+                    print(f"   ⚠️ Detail crawl failed: {error}")
+                print(pool.summary())
+            finally:
+                if own_pool:
+                    await own_pool.close()
+            repriced = await reprice_crawled_matches(crawled) if crawled else 0
+            self.last_run_stats = {'planned': len(match_ids), 'crawled': len(crawled), **changes,
+                                   'repriced': repriced}
+            print(f"✅ Detail crawl complete: {len(crawled)} page(s) | outcomes +{changes['inserted']} "
+                  f"~{changes['updated']} -{changes['deleted']} | {repriced} repriced")
             return True
         except Exception as e:
-            print(f"💥 Detail update error: {e}")
+            print(f"💥 Detail crawl error: {e}")
             return False
         finally:
-            pass
-
-    async def update_live_matches(self, matches_queryset):
+            if not reuse_driver:
+                await self.cleanup()
+
+    async def update_live_matches(self, matches_queryset, concurrency=3, pool=None):
+        """
+        Check every live match on its own pooled page. Pass a started PagePool
+        to reuse warm pages (the scraper daemon does); then the browser is left
+        running afterwards. Ids of the matches seen finishing are left in
+        self.last_run_stats['finished'] so the kickoff scheduler can retire them.
+        """
+        reuse_driver = pool is not None
         try:
             print("🚀 Starting Live Match Monitoring...")
-            if not await self.setup_driver():
+            if not reuse_driver and not await self.setup_driver():
                 return False
             matches_list = []
             async for m in matches_queryset:
-                matches_list.append(m)
-            for match in matches_list:
-                if not match.match_url:
-                    continue
-                print(f"🔴 Checking Live: {match.home_team} vs {match.away_team}")
-                await self.scrape_match_status_score(match)
+                if m.match_url:
+                    matches_list.append(m)
+
+            own_pool = None
+            if pool is None:
+                pool = own_pool = await PagePool(self.browser, size=concurrency, blocker=self.resource_blocker).start()
+            finished = []
+            try:
+                async def check(match):
+                    async with pool.page() as page:
+                        print(f"🔴 Checking Live: {match.home_team} vs {match.away_team}")
+                        if await self.scrape_match_status_score(match, page=page) == Match.STATUS_FINISHED:
+                            finished.append(match.id)
+
+                results = await asyncio.gather(*(check(match) for match in matches_list), return_exceptions=True)
+                for error in (r for r in results if isinstance(r, Exception)):
+                    print(f"   ⚠️ Live check failed: {error}")
+                print(pool.summary())
+            finally:
+                if own_pool:
+                    await own_pool.close()
+            self.last_run_stats = {'matches': len(matches_list), 'finished': finished}
             print("✅ Live monitoring complete.")
             return True
         except Exception as e:
             print(f"💥 Live monitoring error: {e}")
             return False
         finally:
-            await self.cleanup()
-
-    async def scrape_match_status_score(self, match):
+            if not reuse_driver:
+                await self.cleanup()
+
+    async def scrape_match_status_score(self, match, page=None):
+        """
+        Read the score / finished state off the match page and save it; returns
+        the status it saved (or None). Navigation errors are raised, as in
+        scrape_match_detail_page, so a pooled page that failed is recycled.
+        """
+        page = page or self.page
+        await page.goto(match.match_url, wait_until="domcontentloaded", timeout=30000)
         try:
-            await self.page.goto(match.match_url, wait_until="domcontentloaded", timeout=30000)
             await asyncio.sleep(3)
             home_score = None
             away_score = None
@@ -1019,7 +1469,7 @@ if (teamContainers.length >= 2) {
             score_text = ""
             for selector in score_selectors:
                 try:
-                    el = await self.page.query_selector(selector)
+                    el = await page.query_selector(selector)
                     if el:
                         score_text = (await el.inner_text()).strip()
                         if score_text and (':' in score_text or '-' in score_text):
@@ -1038,7 +1488,7 @@ if (teamContainers.length >= 2) {
                             away_score = a_s
                     except ValueError:
                         pass
-            content_text = await self.page.content()
+            content_text = await page.content()
             content_lower = content_text.lower()
             finished_keywords = ["full time", "finished", "ft", "ended", "final result"]
             if any(k in content_lower for k in finished_keywords):
@@ -1048,269 +1498,552 @@ if (teamContainers.length >= 2) {
             if home_score is not None and away_score is not None:
                 await update_match_score_status(match, home_score, away_score, status)
                 print(f"   📝 Updated: {home_score} - {away_score} ({status or 'Live'})")
+                return status
             elif status == Match.STATUS_FINISHED:
                 await update_match_status(match, status)
                 print(f"   🏁 Match Finished (Score not found/changed)")
+                return status
         except Exception as e:
             print(f"   ⚠️ Failed to update score: {e}")
+        return None
 
     async def scrape_matches(self, reuse_driver=False):
-        return await self.scrape_main_list_only()
-
-    async def scrape_main_list_only(self):
+        return await self.scrape_main_list_only(reuse_driver=reuse_driver)
+
+    async def scrape_main_list_only(self, reuse_driver=False):
+        """
+        One pass over the main list. With reuse_driver=True the browser and the
+        already loaded page are kept (the scraper daemon's warm path): no launch,
+        no navigation unless the page is elsewhere, no cleanup afterwards.
+        Counts of the last run are left in self.last_run_stats.
+        """
         try:
             print("🚀 Starting Main List Scrape (Bulk Mode)...")
-            if not await self.setup_driver():
+            if not (reuse_driver and self.page) and not await self.setup_driver():
                 return False
-            await self.page.goto(self.base_url, wait_until="domcontentloaded", timeout=60000)
-            print("✅ Page loaded")
-            await self.wait_for_selector_safe(".accordion.league-wrap", timeout=10000)
-            league_containers = await self.query_all(".accordion.league-wrap")
-            if not league_containers:
-                league_containers = await self.query_all(".league-wrap")
-            if not league_containers:
+            if not (reuse_driver and self.page.url.startswith(self.base_url)):
+                await self.page.goto(self.base_url, wait_until="domcontentloaded", timeout=60000)
+                print("✅ Page loaded")
+            if not await self.wait_for_selector_safe(".accordion.league-wrap, .league-wrap", timeout=10000):
                 print("❌ No league containers found.")
                 return False
-            scraped_data = []
             print("🔍 Parsing page content...")
-            for league_container in league_containers:
-                try:
-                    league_name = "Unknown League"
-                    try:
-                        title_el = await league_container.query_selector('.icon-title__text')
-                        if title_el:
-                            league_name = (await title_el.inner_text()).strip() or league_name
-                    except Exception:
-                        pass
-                    match_containers = await league_container.query_selector_all('.event')
-                    for match_container in match_containers:
-                        try:
-                            match_data = {
-                                'league_name': league_name,
-                                'match_url': None,
-                                'match_datetime': timezone.now(),
-                                'home_team': None,
-                                'away_team': None,
-                                'home_logo': None,
-                                'away_logo': None,
-                                'home_odds': None,
-                                'draw_odds': None,
-                                'away_odds': None,
-                                'markets': []
-                            }
-                            try:
-                                link_el = await match_container.query_selector('a.event__link')
-                                if not link_el:
-                                    link_el = await match_container.query_selector('a')
-                                if link_el:
-                                    href = await link_el.get_attribute('href')
-                                    if href:
-                                        match_data['match_url'] = href if href.startswith('http') else f"https://gh7.bet/{href.lstrip('/')}"
-                            except Exception:
-                                pass
-                            try:
-                                time_el = await match_container.query_selector('.time__hours')
-                                date_el = await match_container.query_selector('.time__date')
-                                match_time = (await time_el.inner_text()).strip() if time_el else ""
-                                match_date_str = (await date_el.inner_text()).strip() if date_el else ""
-                                if match_time and match_date_str:
-                                    match_data['match_datetime'] = self.parse_match_datetime(match_date_str, match_time)
-                            except Exception:
-                                pass
-                            try:
-                                team_containers = await match_container.query_selector_all('.opps__container .icon-title')
-                                if len(team_containers) >= 2:
-                                    ht_el = await team_containers[0].query_selector('.icon-title__text')
-                                    match_data['home_team'] = (await ht_el.inner_text()).strip() if ht_el else ""
-                                    hl_el = await team_containers[0].query_selector('.icon-title__icon')
-                                    if hl_el:
-                                        match_data['home_logo'] = await self.extract_logo_url(hl_el)
-                                    at_el = await team_containers[1].query_selector('.icon-title__text')
-                                    match_data['away_team'] = (await at_el.inner_text()).strip() if at_el else ""
-                                    al_el = await team_containers[1].query_selector('.icon-title__icon')
-                                    if al_el:
-                                        match_data['away_logo'] = await self.extract_logo_url(al_el)
-                                else:
-                                    team_elements = await match_container.query_selector_all('.icon-title__text')
-                                    if len(team_elements) >= 3:
-                                        match_data['home_team'] = (await team_elements[1].inner_text()).strip()
-                                        match_data['away_team'] = (await team_elements[2].inner_text()).strip()
-                            except Exception:
-                                continue
-                            if not match_data['home_team'] or not match_data['away_team']:
-                                continue
-                            try:
-                                main_odds_container = await match_container.query_selector('.odds')
-                                if main_odds_container:
-                                    stake_buttons = await main_odds_container.query_selector_all('.stake-button')
-                                    if len(stake_buttons) >= 3:
-                                        h_text = await stake_buttons[0].query_selector('.formated-odd')
-                                        d_text = await stake_buttons[1].query_selector('.formated-odd')
-                                        a_text = await stake_buttons[2].query_selector('.formated-odd')
-                                        match_data['home_odds'] = self.parse_odds((await h_text.inner_text()) if h_text else "")
-                                        match_data['draw_odds'] = self.parse_odds((await d_text.inner_text()) if d_text else "")
-                                        match_data['away_odds'] = self.parse_odds((await a_text.inner_text()) if a_text else "")
-                            except Exception:
-                                pass
-                            accordions = await match_container.query_selector_all('.accordion-stake')
-                            for accordion in accordions:
-                                header = await accordion.query_selector('.accordion__header')
-                                if not header:
-                                    continue
-                                market_name = (await header.inner_text()).strip()
-                                market_data = {'name': market_name, 'outcomes': []}
-                                stake_buttons = await accordion.query_selector_all('.stake-button')
-                                for button in stake_buttons:
-                                    title_el = await button.query_selector('.stake__title')
-                                    odd_el = await button.query_selector('.formated-odd')
-                                    if title_el and odd_el:
-                                        outcome_name = (await title_el.inner_text()).strip()
-                                        odd_value_text = (await odd_el.inner_text()).strip()
-                                        odd_value = self.parse_odds(odd_value_text)
-                                        if odd_value:
-                                            market_data['outcomes'].append({'name': outcome_name, 'odds': odd_value})
-                                if market_data['outcomes']:
-                                    match_data['markets'].append(market_data)
-                            scraped_data.append(match_data)
-                            print(f"⚽ Found: {match_data['home_team']} vs {match_data['away_team']}")
-                        except Exception as e:
-                            print(f"⚠️ Error parsing match: {e}")
-                            continue
-                except Exception as e:
-                    print(f"⚠️ Error parsing league: {e}")
-                    continue
+            scraped_data, extract_seconds = await self.extract_main_list()
+            scraped_data = self.normalizer.main_rows(scraped_data)
+            markets_count = sum(len(m['markets']) for m in scraped_data)
+            print(f"⏱️ Extracted {len(scraped_data)} matches ({markets_count} markets) in {extract_seconds:.2f}s")
             print(f"💾 Saving {len(scraped_data)} matches to database...")
-            await bulk_save_scraped_data(scraped_data)
+            saved_count = await bulk_save_scraped_data(scraped_data)
+            stale_count = await self.sweep_stale_matches(scraped_data) if saved_count else 0
+            self.last_run_stats = {
+                'matches': len(scraped_data),
+                'markets': markets_count,
+                'saved': saved_count,
+                'stale': stale_count,
+                'extract_seconds': round(extract_seconds, 3),
+            }
             print(f"✅ Main list scrape complete.")
             return True
         except Exception as e:
             print(f"💥 Main list scrape error: {e}")
+            if reuse_driver and self.page:
+                # Force a fresh navigation next time; the page may be wedged
+                try:
+                    await self.page.goto("about:blank")
+                except Exception:
+                    pass
             return False
         finally:
-            await self.cleanup()
-
-    async def cleanup_old_matches(self, current_match_identifiers, log_callback=None):
+            if not reuse_driver:
+                await self.cleanup()
+
+    async def sweep_stale_matches(self, processed_data, log_callback=None, wait=True):
+        """
+        Mark-and-sweep after a full main-list cycle: stamp a new generation on
+        every listed match, then flag upcoming matches still on an older one
+        as stale. sweep_main_list skips the sweep when the page came back much
+        shorter than the last swept one, which is a half-loaded page rather
+        than fifty cancellations; that count is kept in the DB, so a fresh
+        scraper (scrape_main_list_only) is guarded too.
+        Runs on the DB writer after any save queued before it; with wait=False
+        the monitor moves on and the outcome is logged when it lands.
+        """
         async def log(msg):
             if log_callback:
                 await log_callback(msg)
             else:
                 print(msg)
-        try:
-            from django.db import transaction
-            from matches.models import Match
-            from django.utils import timezone
-            await log("   🧹 Checking for old matches to clean up...")
-            upcoming_matches = Match.objects.filter(
-                status='upcoming',
-                match_date__gte=timezone.now()
-            ).select_related('home_team', 'away_team')
-            matches_to_remove = []
-            for match in upcoming_matches:
-                match_identifier = f"{match.home_team.name}_{match.away_team.name}_{match.match_date.strftime('%Y%m%d')}"
-                if match_identifier not in current_match_identifiers:
-                    matches_to_remove.append(match.id)
-            if matches_to_remove:
-                await log(f"   🗑️  Found {len(matches_to_remove)} old matches to remove")
-                batch_size = 50
-                for i in range(0, len(matches_to_remove), batch_size):
-                    batch = matches_to_remove[i:i + batch_size]
-                    with transaction.atomic():
-                        deleted_count, _ = Match.objects.filter(id__in=batch).delete()
-                        await log(f"      Removed batch of {deleted_count} old matches")
-                await log(f"   ✅ Total removed: {len(matches_to_remove)} old matches")
-            else:
-                await log("   ✅ No old matches to remove")
-            return len(matches_to_remove)
-        except Exception as e:
-            await log(f"   ❌ Error cleaning up old matches: {e}")
+
+        seen = len(processed_data)
+        keys = {main_list_key(m) for m in processed_data}
+        if not keys:
             return 0
 
-    async def check_and_cleanup_matches(self, current_matches_data, log_callback=None):
-        from asgiref.sync import sync_to_async
+        def report(result):
+            if result is None:
+                return "   ⚠️ Error sweeping stale matches (see DB writer log)"
+            marked, swept = result
+            if swept is None:
+                return (f"   ⚠️ {seen} matches listed, short of the last swept cycle (or none to compare with); "
+                        f"stamped {marked}, sweep skipped")
+            if swept:
+                return f"   🧹 Generation sweep: {marked} listed, {swept} gone from the site marked stale"
+            return None
 
-        async def log(msg):
-            if log_callback:
-                await log_callback(msg)
-            else:
-                print(msg)
-
-        @sync_to_async
-        def cleanup_sync(matches_data):
-            from django.db import transaction
-            from matches.models import Match
-            from django.utils import timezone
-            from datetime import timedelta
-            try:
-                if not matches_data:
-                    return 0
-                db_matches = Match.objects.filter(
-                    status='upcoming',
-                    match_date__gte=timezone.now() - timedelta(days=1)
-                ).select_related('home_team', 'away_team')
-                current_identifiers = set()
-                for match_data in matches_data:
-                    identifier = f"{match_data['home_team']}_{match_data['away_team']}_{match_data['match_datetime'].strftime('%Y%m%d')}"
-                    current_identifiers.add(identifier)
-                matches_to_remove = []
-                for match in db_matches:
-                    db_identifier = f"{match.home_team.name}_{match.away_team.name}_{match.match_date.strftime('%Y%m%d')}"
-                    if db_identifier not in current_identifiers:
-                        time_until_match = (match.match_date - timezone.now()).total_seconds()
-                        if time_until_match > 3600:
-                            matches_to_remove.append(match.id)
-                if matches_to_remove:
-                    with transaction.atomic():
-                        deleted_count, _ = Match.objects.filter(id__in=matches_to_remove).delete()
-                        return deleted_count
-                return 0
-            except Exception as e:
-                print(f"Error in cleanup_sync: {e}")
-                return 0
+        def reported(result):
+            message = report(result)
+            if message:
+                asyncio.ensure_future(log(message))
 
         try:
-            await log("   🔍 Checking for missing matches to clean up...")
-            deleted_count = await cleanup_sync(current_matches_data)
-            if deleted_count > 0:
-                await log(f"   ✅ Removed {deleted_count} missing matches")
-            else:
-                await log("   ✅ No missing matches to remove")
+            if not wait:
+                await self.persist(sweep_main_list, keys, None, on_result=reported)
+                return None
+            result = await self.db_writer.write(sweep_main_list, keys, None)
+            message = report(result)
+            if message:
+                await log(message)
+            if result is None:
+                return 0
+            return result[1] or 0
         except Exception as e:
-            await log(f"   ⚠️ Error checking for missing matches: {e}")
+            await log(f"   ⚠️ Error sweeping stale matches: {e}")
+            return 0
 
 
 # ------------------------
 # DB wrappers (sync_to_async)
 # ------------------------
 
+def resolve_team_ids(matches_data):
+    """
+    Map every home/away team name in matches_data to a Team pk through the
+    identity index. Only teams never seen before cost a read (fetching the ids
+    bulk_create could not return); changed logos go out in one bulk_update.
+    """
+    identity_index.ensure_warm()
+
+    wanted = {}
+    for m in matches_data:
+        for side in ('home', 'away'):
+            name = m[f'{side}_team']
+            site_id, logo = wanted.get(name, (None, None))
+            wanted[name] = (m.get(f'{side}_team_id') or site_id, m.get(f'{side}_logo') or logo)
+
+    team_ids, missing, logo_updates = {}, [], []
+    for name, (site_id, logo) in wanted.items():
+        entry = identity_index.team(name, site_id)
+        if entry is None:
+            missing.append(name)
+            continue
+        pk, known_logo = entry
+        team_ids[name] = pk
+        if logo and logo != known_logo:
+            logo_updates.append(Team(pk=pk, name=name, logo_url=logo))
+
+    if missing:
+        Team.objects.bulk_create([Team(name=name, logo_url=wanted[name][1]) for name in missing],
+                                 ignore_conflicts=True)
+        for pk, name, logo_url in Team.objects.filter(name__in=missing).values_list('id', 'name', 'logo_url'):
+            identity_index.record_team(pk, name, logo_url, wanted[name][0])
+            team_ids[name] = pk
+            logo = wanted[name][1]
+            if logo and logo != logo_url:
+                logo_updates.append(Team(pk=pk, name=name, logo_url=logo))
+
+    if logo_updates:
+        Team.objects.bulk_update(logo_updates, ['logo_url'])
+        for team in logo_updates:
+            identity_index.record_team(team.pk, team.name, team.logo_url)
+
+    return team_ids
+
+
+def resolve_match_ids(pairs, match_urls=(), statuses=('live', 'halftime', 'upcoming')):
+    """
+    Fill identity-index misses for the given (home pk, away pk) pairs and
+    match URLs with one query, e.g. matches another process created after the
+    index was warmed. A steady-state cycle has no misses and issues no query.
+    """
+    missing_pairs = [p for p in pairs if identity_index.match(*p, statuses=statuses) is None]
+    missing_urls = [u for u in match_urls if u and identity_index.match(match_url=u, statuses=statuses) is None]
+    if not missing_pairs and not missing_urls:
+        return
+
+    from django.db.models import Q
+    query = Q()
+    if missing_pairs:
+        query |= Q(home_team_id__in={h for h, _ in missing_pairs}, away_team_id__in={a for _, a in missing_pairs})
+    if missing_urls:
+        query |= Q(match_url__in=missing_urls)
+    found = Match.objects.filter(query, status__in=statuses).values_list(
+        'id', 'home_team_id', 'away_team_id', 'match_url', 'status', 'match_date')
+    # Read before the caller's transaction writes any match, and looked up right after: recorded at once
+    for row in found:
+        identity_index.record_match(*row, on_commit=False)
+
+# Fields the live list owns; everything else on Match is left alone by the batched save
+LIVE_UPDATE_FIELDS = [
+    'status', 'home_score', 'away_score', 'league_order', 'match_minute', 'match_period',
+    'home_odds', 'draw_odds', 'away_odds', 'half_time_home_score', 'half_time_away_score',
+    'scraped_at', 'updated_at',
+]
+DERIVED_ODDS_FIELDS = [f.name for f in Match._meta.concrete_fields if f.name.startswith('odds_')] + [
+    'pricing_fingerprint']
+# A live row without a half-time score must not blank one already stored, and the upsert must not
+# bring a finished / stale match with the same natural key back to live: status is set afterwards,
+# only on active rows (see promote_upserted_status)
+LIVE_UPSERT_FIELDS = [f for f in LIVE_UPDATE_FIELDS if f != 'status' and not f.startswith('half_time_')] + [
+    'match_url']
+NATURAL_KEY_FIELDS = ['source', 'external_id', 'kickoff_date']
+ODDS_FIELDS = ['home_odds', 'draw_odds', 'away_odds']
+
+
+def upsert_matches(matches, update_fields):
+    """
+    bulk_create(update_conflicts=True) on the natural key. Rows scraped
+    without a match_url (the structured feeds carry none) are upserted
+    without it, so they do not blank a URL the DOM scraper stored: the
+    detail crawl, kickoff scheduler and live checker all need it.
+    """
+    with_url = [match for match in matches if match.match_url]
+    without_url = [match for match in matches if not match.match_url]
+    for batch, fields in ((with_url, update_fields),
+                          (without_url, [field for field in update_fields if field != 'match_url'])):
+        if batch:
+            Match.objects.bulk_create(batch, update_conflicts=True, unique_fields=NATURAL_KEY_FIELDS,
+                                      update_fields=fields)
+
+
+def load_stored_fields(matches, fields):
+    """
+    Copy stored fields onto upserted instances (one query). A bulk_create
+    instance carries what was scraped, not what the conflict row keeps: its
+    status (left out of the upsert) and its derived odds, which pricing
+    would otherwise refill - and overwrite - group by group.
+    """
+    if not matches:
+        return
+    stored = Match.objects.filter(pk__in=[match.pk for match in matches]).values_list('id', *fields)
+    by_pk = {match.pk: match for match in matches}
+    for pk, *values in stored:
+        for field, value in zip(fields, values):
+            setattr(by_pk[pk], field, value)
+
+
+def promote_upserted_status(rows, active, now):
+    """
+    Give upserted live rows their scraped status, only where the stored one
+    is still active (one UPDATE per status value). Instances already carry
+    the stored status (load_stored_fields) and are updated to match.
+    """
+    by_status = {}
+    for match, match_data in rows:
+        status = match_data.get('match_status', 'live')
+        if match.status in active and match.status != status:
+            by_status.setdefault(status, []).append(match)
+    for status, matches in by_status.items():
+        Match.objects.filter(pk__in=[match.pk for match in matches], status__in=active).update(
+            status=status, updated_at=now)
+        for match in matches:
+            match.status = status
+
+
+def upsert_odds_and_price(rows, bookmaker):
+    """
+    For (match, match_data) pairs whose row carries 1X2 odds, upsert the
+    bookmaker's Odds row without reading it first and compute derived odds on
+    the match in memory. Matches whose 1X2 odds and markets are the same as
+    at their last pricing (Match.pricing_fingerprint) are not priced again.
+    Returns the matches whose derived fields still need writing.
+    """
+    to_price, all_odds = [], []
+    for match, match_data in rows:
+        if not (match_data.get('home_odds') and match_data.get('away_odds')):
+            continue
+        odds = Odds(match=match, bookmaker=bookmaker,
+                    home_odds=match_data.get('home_odds'),
+                    draw_odds=match_data.get('draw_odds') or 3.0,
+                    away_odds=match_data.get('away_odds'))
+        if match.home_odds and match.away_odds:
+            to_price.append((match, odds))
+        all_odds.append(odds)
+
+    # The whole cycle is priced at once (matches.services.pricing)
+    derived = []
+    try:
+        to_price, skipped = changed_since_priced(to_price)
+        derived = price_matches(to_price)
+        if skipped or derived:
+            print(f"   🧮 Derived odds: {len(derived)} priced, {skipped} unchanged (skipped)")
+    except Exception as calc_error:
+        print(f"Warning: Failed derived odds for {len(to_price)} matches: {calc_error}")
+    with_grid = [odds for odds in all_odds if odds.correct_score_grid is not None]
+    without_grid = [odds for odds in all_odds if odds.correct_score_grid is None]
+
+    # Rows that could not be priced keep the grid they already have
+    for batch, fields in ((with_grid, ODDS_FIELDS + ['correct_score_grid']), (without_grid, ODDS_FIELDS)):
+        if batch:
+            Odds.objects.bulk_create(batch, update_conflicts=True,
+                                     unique_fields=['match', 'bookmaker'], update_fields=fields)
+    return derived
+
+
+def save_live_matches_per_row(data_list):
+    """Row-by-row live save: one transaction, match read and saves per live match."""
+    saved_count = 0
+    bookmaker, _ = Bookmaker.objects.get_or_create(
+        name="GStake",
+        defaults={'website': 'https://gh7.bet'}
+    )
+
+    # --- IDENTITY RESOLUTION ---
+    # Teams and active matches come from the process-local identity index;
+    # bulk_create(ignore_conflicts) inside resolve_team_ids covers the race
+    # where two monitors create the same new team at once.
+    team_ids = resolve_team_ids(data_list)
+    pairs = {(team_ids.get(m['home_team']), team_ids.get(m['away_team'])) for m in data_list}
+    resolve_match_ids({pair for pair in pairs if None not in pair},
+                      match_urls={m.get('match_url') for m in data_list})
+
+    for match_data in data_list:
+        try:
+            with transaction.atomic():
+                home_team_id = team_ids[match_data['home_team']]
+                away_team_id = team_ids[match_data['away_team']]
+
+                match_url = match_data.get('match_url')
+                # Check for existing matches in any active state
+                match_id = identity_index.match(home_team_id, away_team_id, match_url=match_url)
+                match = Match.objects.filter(
+                    pk=match_id, status__in=['live', 'halftime', 'upcoming']
+                ).first() if match_id else None
+
+                if match:
+                    # --- EXISTING MATCH UPDATE ---
+                    if match.status in ['live', 'upcoming', 'halftime']:
+                        match.status = match_data.get('match_status', 'live')
+
+                    new_h_score = match_data.get('home_score')
+                    new_a_score = match_data.get('away_score')
+
+                    # Safe overwrite: Only update score if scraper found valid numbers
+                    if new_h_score is not None:
+                        match.home_score = new_h_score
+                    if new_a_score is not None:
+                        match.away_score = new_a_score
+
+                    # Update league ordering and live clock details
+                    match.league_order = match_data.get('league_order', 999)
+                    if 'match_minute' in match_data:
+                        match.match_minute = match_data['match_minute']
+                    if 'match_period' in match_data:
+                        match.match_period = match_data['match_period']
+
+                    match.home_odds = match_data.get('home_odds')
+                    match.draw_odds = match_data.get('draw_odds')
+                    match.away_odds = match_data.get('away_odds')
+                    match.scraped_at = timezone.now()
+
+                    if 'half_time_home_score' in match_data:
+                        match.half_time_home_score = match_data['half_time_home_score']
+                        match.half_time_away_score = match_data['half_time_away_score']
+
+                    match.save()
+                    saved_count += 1
+                else:
+                    # --- NEW MATCH CREATION ---
+                    match = Match.objects.create(
+                        external_id=external_match_id(match_data),
+                        home_team_id=home_team_id,
+                        away_team_id=away_team_id,
+                        match_date=match_data.get('match_datetime', timezone.now()),
+                        league=match_data.get('league_name', 'Unknown'),
+                        league_order=match_data.get('league_order', 999),
+                        status=match_data.get('match_status', 'live'),
+                        match_url=match_url,
+                        home_score=match_data.get('home_score'),
+                        away_score=match_data.get('away_score'),
+                        match_minute=match_data.get('match_minute', ''),
+                        match_period=match_data.get('match_period', ''),
+                        home_odds=match_data.get('home_odds'),
+                        draw_odds=match_data.get('draw_odds'),
+                        away_odds=match_data.get('away_odds'),
+                        scraped_at=timezone.now()
+                    )
+                    if 'half_time_home_score' in match_data:
+                        match.half_time_home_score = match_data['half_time_home_score']
+                        match.half_time_away_score = match_data['half_time_away_score']
+                        match.save()
+                    saved_count += 1
+
+                # --- ODDS SAVING ---
+                if match_data.get('home_odds') and match_data.get('away_odds'):
+                    Odds.objects.update_or_create(
+                        match=match,
+                        bookmaker=bookmaker,
+                        defaults={
+                            'home_odds': match_data.get('home_odds'),
+                            'draw_odds': match_data.get('draw_odds') or 3.0,
+                            'away_odds': match_data.get('away_odds'),
+                        }
+                    )
+                    if match.home_odds and match.away_odds:
+                        try:
+                            match.calculate_derived_odds()
+                        except Exception as calc_error:
+                            print(
+                                f"Warning: Failed derived odds for {match.home_team} vs {match.away_team}: {calc_error}")
+
+        except Exception as e:
+            print(
+                f"Error saving live match {match_data.get('home_team')} vs {match_data.get('away_team')}: {e}")
+            continue
+    return saved_count
+
+
+def save_live_matches_batched(data_list):
+    """
+    Batched live save: one transaction per cycle. Teams and matches resolve
+    through the identity index, known matches load with one in_bulk, new ones
+    are upserted on the natural key, Odds are upserted without being read, and
+    derived odds are computed in memory and written by the same update_rows
+    statement as the live fields.
+    """
+    if not data_list:
+        return 0
+
+    now = timezone.now()
+    active = ['live', 'halftime', 'upcoming']
+
+    with identity_index.dropped_on_rollback(), transaction.atomic():
+        bookmaker, _ = Bookmaker.objects.get_or_create(
+            name="GStake",
+            defaults={'website': 'https://gh7.bet'}
+        )
+
+        # --- IDENTITY RESOLUTION ---
+        team_ids = resolve_team_ids(data_list)
+        pairs = {(team_ids.get(m['home_team']), team_ids.get(m['away_team'])) for m in data_list}
+        resolve_match_ids({pair for pair in pairs if None not in pair},
+                          match_urls={m.get('match_url') for m in data_list})
+
+        # The same match may show up twice in one cycle; the last row wins
+        rows = {}
+        for match_data in data_list:
+            home_team_id = team_ids.get(match_data['home_team'])
+            away_team_id = team_ids.get(match_data['away_team'])
+            if not home_team_id or not away_team_id:
+                continue
+            match_id = identity_index.match(home_team_id, away_team_id, match_url=match_data.get('match_url'))
+            rows[match_id or (home_team_id, away_team_id)] = (match_data, home_team_id, away_team_id, match_id)
+
+        existing = Match.objects.filter(status__in=active).in_bulk(
+            [match_id for _, _, _, match_id in rows.values() if match_id])
+
+        # --- MATCHES ---
+        to_update, to_create = [], []
+        for match_data, home_team_id, away_team_id, match_id in rows.values():
+            match = existing.get(match_id)
+            if match:
+                match.status = match_data.get('match_status', 'live')
+                if match_data.get('home_score') is not None:
+                    match.home_score = match_data['home_score']
+                if match_data.get('away_score') is not None:
+                    match.away_score = match_data['away_score']
+                match.league_order = match_data.get('league_order', 999)
+                if 'match_minute' in match_data:
+                    match.match_minute = match_data['match_minute']
+                if 'match_period' in match_data:
+                    match.match_period = match_data['match_period']
+                match.home_odds = match_data.get('home_odds')
+                match.draw_odds = match_data.get('draw_odds')
+                match.away_odds = match_data.get('away_odds')
+                match.scraped_at = now
+                match.updated_at = now
+                to_update.append((match, match_data))
+            else:
+                external_id, day = natural_key(match_data)
+                match = Match(
+                    external_id=external_id,
+                    kickoff_date=day,
+                    home_team_id=home_team_id,
+                    away_team_id=away_team_id,
+                    match_date=match_data.get('match_datetime', now),
+                    league=match_data.get('league_name', 'Unknown'),
+                    league_order=match_data.get('league_order', 999),
+                    status=match_data.get('match_status', 'live'),
+                    match_url=match_data.get('match_url'),
+                    home_score=match_data.get('home_score'),
+                    away_score=match_data.get('away_score'),
+                    match_minute=match_data.get('match_minute', ''),
+                    match_period=match_data.get('match_period', ''),
+                    home_odds=match_data.get('home_odds'),
+                    draw_odds=match_data.get('draw_odds'),
+                    away_odds=match_data.get('away_odds'),
+                    scraped_at=now,
+                )
+                to_create.append((match, match_data))
+            if 'half_time_home_score' in match_data:
+                match.half_time_home_score = match_data['half_time_home_score']
+                match.half_time_away_score = match_data['half_time_away_score']
+
+        if to_create:
+            # Upsert on the natural key: a match the index missed (created by another process,
+            # or listed on the main page under the same event id) is updated, not duplicated.
+            # bulk_create sends no post_save, so the index is fed below.
+            unique = {}
+            for match, match_data in to_create:
+                unique[(match.external_id, match.kickoff_date)] = (match, match_data)
+            to_create = list(unique.values())
+            upsert_matches([match for match, _ in to_create], LIVE_UPSERT_FIELDS)
+            # Keys the index missed may be stored matches, finished ones included, that already carry
+            # derived odds
+            load_stored_fields([match for match, _ in to_create], ['status'] + DERIVED_ODDS_FIELDS)
+            promote_upserted_status(to_create, active, now)
+
+        # --- ODDS + DERIVED ODDS (derived fields are written below) ---
+        derived = upsert_odds_and_price(to_update + to_create, bookmaker)
+
+        # --- WRITE ---
+        # Repriced matches take their derived fields along in the same statement
+        priced = {match.pk for match in derived}
+        created = {match.pk for match, _ in to_create}
+        update_rows(Match, [match for match, _ in to_update if match.pk in priced],
+                    LIVE_UPDATE_FIELDS + DERIVED_ODDS_FIELDS)
+        update_rows(Match, [match for match, _ in to_update if match.pk not in priced], LIVE_UPDATE_FIELDS)
+        update_rows(Match, [match for match in derived if match.pk in created], DERIVED_ODDS_FIELDS)
+
+        # Recorded once the transaction commits
+        for match, _ in to_update + to_create:
+            identity_index.record_match(match.pk, match.home_team_id, match.away_team_id,
+                                        match.match_url, match.status, match.match_date)
+
+    return len(to_update) + len(to_create)
+
+
 @sync_to_async
 def bulk_update_live_data(scraped_data):
     from matches.models import Match, Team
 
-    team_names = set()
-    for m in scraped_data:
-        team_names.add(m['home_team'])
-        team_names.add(m['away_team'])
-
-    teams = {t.name: t for t in Team.objects.filter(name__in=team_names)}
+    # Team ids (and logo updates) come from the identity index
+    team_ids = resolve_team_ids(scraped_data)
+    pairs = {(team_ids.get(m['home_team']), team_ids.get(m['away_team'])) for m in scraped_data}
+    pairs = {pair for pair in pairs if None not in pair}
+    resolve_match_ids(pairs, statuses=(Match.STATUS_LIVE,))
 
     for m_data in scraped_data:
-        home_team = teams.get(m_data['home_team'])
-        away_team = teams.get(m_data['away_team'])
+        home_id = team_ids.get(m_data['home_team'])
+        away_id = team_ids.get(m_data['away_team'])
 
-        if not home_team or not away_team:
+        if not home_id or not away_id:
             continue
 
-        # --- UPDATE LOGOS FOR LIVE TEAMS IF MISSING ---
-        if m_data.get('home_logo') and home_team.logo_url != m_data.get('home_logo'):
-            home_team.logo_url = m_data.get('home_logo')
-            home_team.save()
-
-        if m_data.get('away_logo') and away_team.logo_url != m_data.get('away_logo'):
-            away_team.logo_url = m_data.get('away_logo')
-            away_team.save()
-
         try:
-            match = Match.objects.get(home_team=home_team, away_team=away_team, status=Match.STATUS_LIVE)
+            match_id = identity_index.match(home_id, away_id, statuses=(Match.STATUS_LIVE,))
+            if match_id is None:
+                continue
+            match = Match.objects.get(pk=match_id, status=Match.STATUS_LIVE)
             match.home_score = m_data.get('home_score')
             match.away_score = m_data.get('away_score')
 
@@ -1331,166 +2064,304 @@ def bulk_update_live_data(scraped_data):
             print(f"Error updating match {m_data['home_team']} vs {m_data['away_team']}: {e}")
 
 
+# What a main-list row may change on a match that already exists (status stays as it is)
+MAIN_UPSERT_FIELDS = ['home_odds', 'draw_odds', 'away_odds', 'match_url', 'league_logo_url', 'scraped_at', 'updated_at']
+
+
 @sync_to_async
 def bulk_save_scraped_data(matches_data):
     try:
         from django.db import transaction
-        from matches.models import Match, Team, Odds, Bookmaker
+        from matches.models import Match, Bookmaker
         from django.utils import timezone
         from datetime import timedelta
 
         if not matches_data:
             return 0
 
-        saved_count = 0
-
         # 1. ONE TRANSACTION TO RULE THEM ALL
         # This prevents the database from locking up the rest of your website
-        with transaction.atomic():
+        with identity_index.dropped_on_rollback(), transaction.atomic():
             bookmaker, _ = Bookmaker.objects.get_or_create(
                 name="GStake",
                 defaults={'website': 'https://gh7.bet'}
             )
 
-            # 2. BULK FETCH AND CREATE TEAMS
-            # Extract all unique team names from the scraped data
-            team_names = set()
-            for m in matches_data:
-                team_names.add(m['home_team'])
-                team_names.add(m['away_team'])
-
-            # Fetch all existing teams in one single query
-            existing_teams = {t.name: t for t in Team.objects.filter(name__in=team_names)}
-
-            # Find and create missing teams in bulk
-            missing_teams = [Team(name=name) for name in team_names if name not in existing_teams]
-            if missing_teams:
-                Team.objects.bulk_create(missing_teams, ignore_conflicts=True)
-                # Re-fetch to guarantee we have their database IDs
-                existing_teams = {t.name: t for t in Team.objects.filter(name__in=team_names)}
-
-            # Optional: Bulk update team logos if they changed
-            teams_to_update = []
-            for m in matches_data:
-                h_team = existing_teams.get(m['home_team'])
-                a_team = existing_teams.get(m['away_team'])
+            # 2. RESOLVE TEAMS THROUGH THE IDENTITY INDEX
+            # Known teams cost no query; new ones are bulk-created, changed logos bulk-updated
+            team_ids = resolve_team_ids(matches_data)
+
+            # 3. BUILD ONE ROW PER NATURAL KEY
+            # Matches that already kicked off are only refreshed while still upcoming
+            # (within the last 24h); new ones are only created for the future.
+            now = timezone.now()
+            started = [m for m in matches_data if m['match_datetime'] <= now]
+            started_pairs = {(team_ids.get(m['home_team']), team_ids.get(m['away_team'])) for m in started}
+            started_pairs = {pair for pair in started_pairs if None not in pair}
+            if started_pairs:
+                resolve_match_ids(started_pairs, statuses=('upcoming',))
+
+            rows = {}
+            for match_data in matches_data:
+                home_id = team_ids.get(match_data['home_team'])
+                away_id = team_ids.get(match_data['away_team'])
 
-                if h_team and m.get('home_logo') and h_team.logo_url != m.get('home_logo'):
-                    h_team.logo_url = m.get('home_logo')
-                    teams_to_update.append(h_team)
+                if not home_id or not away_id:
+                    continue
 
-                if a_team and m.get('away_logo') and a_team.logo_url != m.get('away_logo'):
-                    a_team.logo_url = m.get('away_logo')
-                    teams_to_update.append(a_team)
+                match_date = match_data['match_datetime']
+                if match_date <= now:
+                    match_id = identity_index.match(home_id, away_id, statuses=('upcoming',))
+                    if not match_id or identity_index.match_date(match_id) < now - timedelta(hours=24):
+                        continue
 
-            if teams_to_update:
-                Team.objects.bulk_update(set(teams_to_update), ['logo_url'])
+                external_id, day = natural_key(match_data)
+                rows[(external_id, day)] = (Match(
+                    external_id=external_id,
+                    kickoff_date=day,
+                    home_team_id=home_id,
+                    away_team_id=away_id,
+                    match_date=match_date,
+                    league=match_data.get('league_name', 'Unknown'),
+                    league_logo_url=match_data.get('league_logo'),
+                    match_url=match_data.get('match_url'),
+                    home_odds=match_data.get('home_odds'),
+                    draw_odds=match_data.get('draw_odds'),
+                    away_odds=match_data.get('away_odds'),
+                    scraped_at=now,
+                    status='upcoming'
+                ), match_data)
+
+            if not rows:
+                return 0
 
-            # 3. PROCESS MATCHES
-            matches_to_update = []
+            # 4. ONE UPSERT FOR THE MATCHES, ONE OR TWO FOR THEIR ODDS
+            matches = list(rows.values())
+            upsert_matches([match for match, _ in matches], MAIN_UPSERT_FIELDS)
+            # Priced like the live path's in_bulk rows, and indexed, from what is stored: an existing row
+            # keeps its derived odds and its status
+            load_stored_fields([match for match, _ in matches], ['status'] + DERIVED_ODDS_FIELDS)
+            derived = upsert_odds_and_price(matches, bookmaker)
+            update_rows(Match, derived, DERIVED_ODDS_FIELDS)
 
-            # Fetch existing upcoming matches in a dictionary to avoid N+1 queries
-            time_threshold_low = timezone.now() - timedelta(hours=24)
-            time_threshold_high = timezone.now() + timedelta(days=14)
+            # bulk_create sends no post_save; recorded once the transaction commits
+            for match, _ in matches:
+                identity_index.record_match(match.pk, match.home_team_id, match.away_team_id,
+                                            match.match_url, match.status, match.match_date)
 
-            db_matches = Match.objects.filter(
-                status='upcoming',
-                match_date__range=(time_threshold_low, time_threshold_high)
-            ).select_related('home_team', 'away_team')
+        return len(rows)
 
-            # Create a lookup key: "HomeTeam_AwayTeam"
-            match_map = {f"{m.home_team.name}_{m.away_team.name}": m for m in db_matches}
+    except Exception as e:
+        print(f"Error in bulk_save_scraped_data: {e}")
+        return 0
 
-            for match_data in matches_data:
-                h_team = existing_teams.get(match_data['home_team'])
-                a_team = existing_teams.get(match_data['away_team'])
+def live_match_ids(identifiers):
+    """
+    Live match pks behind live_list_key ("home|away") or match_url identifiers,
+    straight from the identity index; identifiers it does not know are skipped.
+    Synchronous (ensure_warm() may query): call it on the DB writer.
+    """
+    identity_index.ensure_warm()
+    match_ids = []
+    for identifier in identifiers:
+        if identifier.startswith('http'):
+            match_id = identity_index.match(match_url=identifier, statuses=(Match.STATUS_LIVE,))
+        else:
+            home_name, _, away_name = identifier.partition('|')
+            home, away = identity_index.team(home_name), identity_index.team(away_name)
+            match_id = identity_index.match(home[0], away[0], statuses=(Match.STATUS_LIVE,)) if home and away else None
+        if match_id:
+            match_ids.append(match_id)
+    return match_ids
 
-                if not h_team or not a_team:
-                    continue
 
-                match_key = f"{h_team.name}_{a_team.name}"
-                existing_match = match_map.get(match_key)
-
-                match_date = match_data['match_datetime']
+@sync_to_async
+def finish_live_matches(match_ids):
+    """
+    Flip the given matches from live to finished in one UPDATE and queue their
+    settlement (matches.tasks.settle_matches_task). Returns the finished pks.
+    """
+    from django.db.models import F
+    from django.db.models.functions import Coalesce
+    from django_q.tasks import async_task
+
+    with transaction.atomic():
+        finished = list(Match.objects.filter(pk__in=match_ids, status=Match.STATUS_LIVE).values_list('id', flat=True))
+        if finished:
+            # .update() skips Match.save(), which is what keeps total_goals in step with the score;
+            # like save(), a missing score leaves the stored total as it is
+            Match.objects.filter(pk__in=finished).update(
+                status=Match.STATUS_FINISHED,
+                total_goals=Coalesce(F('home_score') + F('away_score'), F('total_goals')),
+                updated_at=timezone.now())
+    for match_id in finished:
+        identity_index.forget_match(match_id)
+    if finished:
+        async_task('matches.tasks.settle_matches_task', finished)
+    return finished
+
+
+def new_scrape_generation():
+    """Milliseconds since the epoch: increases across cycles, processes and restarts."""
+    return time.time_ns() // 1_000_000
 
-                if existing_match:
-                    # PREPARE FOR BULK UPDATE
-                    existing_match.home_odds = match_data.get('home_odds')
-                    existing_match.draw_odds = match_data.get('draw_odds')
-                    existing_match.away_odds = match_data.get('away_odds')
-                    existing_match.match_url = match_data.get('match_url', existing_match.match_url)
-                    existing_match.scraped_at = timezone.now()
 
-                    if match_data.get('league_logo') and existing_match.league_logo_url != match_data.get(
-                            'league_logo'):
-                        existing_match.league_logo_url = match_data.get('league_logo')
+@sync_to_async
+def sweep_main_list(seen_keys, sweep=True, grace=timedelta(hours=1), min_share=0.5,
+                    baseline_ttl=timedelta(hours=1)):
+    """
+    Indexed UPDATEs whatever the table size. The mark stamps the new
+    generation on the listed (external_id, kickoff_date) keys and brings
+    back stale matches that reappeared; the sweep flags upcoming matches
+    from older generations as stale. Matches kicking off within grace are
+    left alone (they leave the line list to go live), and nothing is
+    deleted, so bets on a vanished match stay as they are. Only GStake
+    matches are touched: the list says nothing about other sources.
+
+    sweep=None guards the sweep with the listed count of the last swept
+    cycle (ScraperCounter MAIN_LIST_SEEN): it runs only when this list has
+    at least min_share of it. Without a count younger than baseline_ttl
+    (first run, or a list that has stayed short that long) nothing is swept
+    and this count becomes the one to compare with.
+    Returns (marked, swept); swept is None when the sweep was skipped.
+    """
+    from django.db.models import Q
+
+    generation = new_scrape_generation()
+    # Exactly the listed (external_id, day) pairs: one term per kickoff day, not the ids x days product
+    ids_by_day = {}
+    for external_id, day in seen_keys:
+        ids_by_day.setdefault(day, set()).add(external_id)
+    listed = Q()
+    for day, external_ids in ids_by_day.items():
+        listed |= Q(kickoff_date=day, external_id__in=external_ids)
+
+    now = timezone.now()
+    with transaction.atomic():
+        if sweep is None:
+            last_seen = ScraperCounter.get_instance(ScraperCounter.MAIN_LIST_SEEN)
+            baseline = last_seen.value if last_seen.updated_at > now - baseline_ttl else 0
+            sweep = bool(baseline) and len(seen_keys) >= baseline * min_share
+            # Only a swept (or the first) cycle sets the baseline: a short page must not lower it
+            if sweep or not baseline:
+                last_seen.swap(len(seen_keys), now)
+
+        listed_matches = Match.objects.filter(listed, source=Match.SOURCE_GSTAKE)
+        marked = listed_matches.filter(status=Match.STATUS_UPCOMING).update(scrape_generation=generation)
+        # .update() skips auto_now: status changes set updated_at so KickoffScheduler.sync() sees them
+        marked += listed_matches.filter(status=Match.STATUS_STALE).update(
+            scrape_generation=generation, status=Match.STATUS_UPCOMING, updated_at=now)
+        swept = None
+        if sweep:
+            swept = Match.objects.filter(
+                source=Match.SOURCE_GSTAKE,
+                status=Match.STATUS_UPCOMING,
+                scrape_generation__lt=generation,
+                match_date__gt=now + grace,
+            ).update(status=Match.STATUS_STALE, updated_at=now)
+    return marked, swept
+
+
+def parse_detail_odds(text):
+    """'1,85' -> Decimal('1.85'); None unless the text is a price above 1."""
+    try:
+        odds = Decimal(str(text).strip().replace(',', '.')).quantize(Decimal('0.01'))
+        return odds if odds > 1 else None
+    except InvalidOperation:
+        return None
 
-                    # Calculate derived odds in memory before saving
-                    if existing_match.home_odds and existing_match.away_odds:
-                        try:
-                            existing_match.calculate_derived_odds()
-                        except Exception:
-                            pass
 
-                    matches_to_update.append(existing_match)
-                    saved_count += 1
+@sync_to_async
+def save_detail_markets(match_id, markets_data):
+    """
+    Store one crawled detail page (scrape_match_detail_page's result) as the
+    match's Market / Outcome rows, touching only what changed: the stored
+    rows are read once and diffed by (market, outcome) name, then new
+    outcomes are inserted, moved prices updated through one executemany and
+    vanished outcomes / markets deleted, each in bulk. A change bumps
+    markets_version, which puts the match's pricing fingerprint out of date:
+    crawl_match_details then prices the whole crawl in one reprice_matches()
+    batch.
+    Returns {'inserted': n, 'updated': n, 'deleted': n}.
+    """
+    scraped = {}
+    for market_name, outcomes in markets_data.items():
+        prices = {outcome['name'][:100]: outcome['odds'] for outcome in outcomes}
+        if prices:
+            scraped[market_name[:100]] = prices
+
+    inserts, updates, deletes, current = [], [], [], []
+    with transaction.atomic():
+        match = Match.objects.select_for_update().get(pk=match_id)
+        # A page that listed nothing (closed book, failed load) keeps the last prices
+        if scraped:
+            inserts, updates, deletes, current = diff_detail_markets(match, scraped)
+
+        match.details_crawled_at = timezone.now()
+        if inserts or updates or deletes:
+            match.markets_version += 1  # the pricing fingerprint of the match is now out of date
+        match.save(update_fields=['details_crawled_at', 'markets_version', 'updated_at'])
+    return {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deletes)}
+
+
+def diff_detail_markets(match, scraped):
+    """
+    Apply {market: {outcome: odds}} to the match's stored rows. Returns the
+    (inserts, updates, deletes) it ran and the markets the match now has, as
+    [(market, [(outcome, odds), ...]), ...] in primary-key order.
+    """
+    markets = {market.name: market for market in match.markets.all()}
+    stored, deletes = {}, []
+    for outcome in Outcome.objects.filter(market__match=match):
+        key = (outcome.market_id, outcome.name)
+        if key in stored:
+            deletes.append(outcome.pk)  # Outcome names are not unique per market; extra copies go
+        else:
+            stored[key] = outcome
+
+    new_markets = [Market(match=match, name=name) for name in scraped if name not in markets]
+    for market in Market.objects.bulk_create(new_markets):
+        markets[market.name] = market
+
+    inserts, updates, seen = [], [], set()
+    for market_name, prices in scraped.items():
+        market = markets[market_name]
+        for name, odds in prices.items():
+            seen.add((market.pk, name))
+            outcome = stored.get((market.pk, name))
+            if outcome is None:
+                inserts.append(Outcome(market=market, name=name, odds=odds))
+            elif outcome.odds != odds:
+                outcome.odds = odds
+                updates.append(outcome)
+    deletes += [outcome.pk for key, outcome in stored.items() if key not in seen]
+
+    Outcome.objects.bulk_create(inserts)
+    update_rows(Outcome, updates, ['odds'])
+    if deletes:
+        Outcome.objects.filter(pk__in=deletes).delete()
+    gone = [market.pk for name, market in markets.items() if name not in scraped]
+    if gone:
+        Market.objects.filter(pk__in=gone).delete()
+
+    kept = {}
+    for outcome in sorted([o for key, o in stored.items() if key in seen] + inserts, key=lambda o: o.pk):
+        kept.setdefault(outcome.market_id, []).append((outcome.name, outcome.odds))
+    current = [(market.name, kept.get(market.pk, []))
+               for market in sorted(markets.values(), key=lambda m: m.pk) if market.name in scraped]
+    return inserts, updates, deletes, current
 
-                    # Update Odds model (Keeping this simple as bulk_upsert on related models gets complex)
-                    if match_data.get('home_odds') and match_data.get('away_odds'):
-                        Odds.objects.update_or_create(
-                            match=existing_match,
-                            bookmaker=bookmaker,
-                            defaults={
-                                'home_odds': match_data.get('home_odds'),
-                                'draw_odds': match_data.get('draw_odds', 3.0),
-                                'away_odds': match_data.get('away_odds'),
-                            }
-                        )
 
-                else:
-                    # STANDARD CREATE
-                    if match_date > timezone.now():
-                        new_match = Match.objects.create(
-                            home_team=h_team,
-                            away_team=a_team,
-                            match_date=match_date,
-                            league=match_data.get('league_name', 'Unknown'),
-                            league_logo_url=match_data.get('league_logo'),
-                            match_url=match_data.get('match_url'),
-                            home_odds=match_data.get('home_odds'),
-                            draw_odds=match_data.get('draw_odds'),
-                            away_odds=match_data.get('away_odds'),
-                            scraped_at=timezone.now(),
-                            status='upcoming'
-                        )
-                        saved_count += 1
+@sync_to_async
+def reprice_crawled_matches(match_ids):
+    """Batch-price crawled matches; reprice_matches skips those whose markets and 1X2 did not change."""
+    return len(reprice_matches(list(Match.objects.filter(pk__in=match_ids))))
 
-                        if match_data.get('home_odds') and match_data.get('away_odds'):
-                            Odds.objects.create(
-                                match=new_match,
-                                bookmaker=bookmaker,
-                                home_odds=match_data.get('home_odds'),
-                                draw_odds=match_data.get('draw_odds', 3.0),
-                                away_odds=match_data.get('away_odds')
-                            )
-                            try:
-                                new_match.calculate_derived_odds()
-                                new_match.save()  # Save the derived odds
-                            except Exception:
-                                pass
-
-            # 4. EXECUTE BULK UPDATE
-            if matches_to_update:
-                Match.objects.bulk_update(
-                    matches_to_update,
-                    ['home_odds', 'draw_odds', 'away_odds', 'match_url', 'scraped_at', 'league_logo_url']
-                )
 
-        return saved_count
+@sync_to_async
+def get_match_urls(match_ids):
+    return dict(Match.objects.filter(pk__in=match_ids, match_url__isnull=False).values_list('id', 'match_url'))
 
-    except Exception as e:
-        print(f"Error in bulk_save_scraped_data: {e}")
-        return 0
 
 @sync_to_async
 def calculate_and_save_derived_odds(match_obj):
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from matches.models import Match, Team
+from .identity import identity_index
+
+# Keep the scraper's identity index current for saves done anywhere in this
+# process. bulk_create / bulk_update / queryset.update() send no signals; the
+# save paths record those themselves.
+
+
+@receiver(post_save, sender=Team)
+def index_saved_team(sender, instance, **kwargs):
+    if identity_index.warmed_at is not None:
+        identity_index.record_team(instance.pk, instance.name, instance.logo_url)
+
+
+@receiver(post_delete, sender=Team)
+def unindex_deleted_team(sender, instance, **kwargs):
+    identity_index.forget_team(instance.pk)
+
+
+@receiver(post_save, sender=Match)
+def index_saved_match(sender, instance, **kwargs):
+    if identity_index.warmed_at is not None:
+        identity_index.record_match(instance.pk, instance.home_team_id, instance.away_team_id,
+                                    instance.match_url, instance.status, instance.match_date)
+
+
+@receiver(post_delete, sender=Match)
+def unindex_deleted_match(sender, instance, **kwargs):
+    identity_index.forget_match(instance.pk)
@@ -0,0 +1,113 @@
+# scraper_module/snapshot.py
+import time
+from collections import namedtuple
+
+from scraper_module.identity import natural_key
+
+# Fields that matter for the DB. Anything else in a scraped row (raw strings,
+# scraped_at, ...) changes every cycle and must not count as a change.
+MAIN_LIST_FIELDS = (
+    'league_name', 'league_logo', 'match_url', 'match_datetime',
+    'home_logo', 'away_logo', 'home_odds', 'draw_odds', 'away_odds', 'markets',
+)
+
+LIVE_LIST_FIELDS = (
+    'league_name', 'league_order', 'match_url', 'home_logo', 'away_logo',
+    'home_score', 'away_score', 'match_period', 'match_minute', 'match_status',
+    'home_odds', 'draw_odds', 'away_odds',
+)
+
+SnapshotDiff = namedtuple('SnapshotDiff', ['new', 'changed', 'unchanged', 'disappeared'])
+
+
+def _freeze(value):
+    """Make nested lists/dicts (e.g. markets) hashable and comparable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def main_list_key(m):
+    """Same (external_id, kickoff_date) pair the main list upserts Match on."""
+    return natural_key(m)
+
+
+def live_list_key(m):
+    return f"{m['home_team'].strip().lower()}|{m['away_team'].strip().lower()}"
+
+
+class MatchSnapshotCache:
+    """
+    Per-process fingerprint cache for one monitor. diff() compares a cycle
+    against the previous one so only new / changed rows go to the database.
+
+    Every full_sync_interval seconds the cache resets itself, so one cycle
+    writes everything again. That refreshes scraped_at and repairs any row a
+    failed write left behind.
+    """
+
+    def __init__(self, key_func, fields, full_sync_interval=300):
+        self.key_func = key_func
+        self.fields = fields
+        self.full_sync_interval = full_sync_interval
+        self.fingerprints = {}
+        self.last_full_sync = 0.0
+        # True when the last diff() started from an empty cache, i.e. every row came back as new
+        self.resynced = False
+
+    def fingerprint(self, m):
+        return tuple(_freeze(m.get(field)) for field in self.fields)
+
+    def diff(self, rows):
+        if time.monotonic() - self.last_full_sync >= self.full_sync_interval:
+            self.fingerprints = {}
+            self.last_full_sync = time.monotonic()
+
+        previous = self.fingerprints
+        self.resynced = not previous
+        current = {}
+        new, changed, unchanged = [], [], 0
+        for m in rows:
+            key = self.key_func(m)
+            fp = self.fingerprint(m)
+            current[key] = fp
+            old_fp = previous.get(key)
+            if old_fp is None:
+                new.append(m)
+            elif old_fp != fp:
+                changed.append(m)
+            else:
+                unchanged += 1
+
+        disappeared = [key for key in previous if key not in current]
+        self.fingerprints = current
+        return SnapshotDiff(new, changed, unchanged, disappeared)
+
+    def update(self, rows):
+        """
+        Partial diff for pushed batches: returns only the rows that are new or
+        changed. Keys not in the batch are left alone (no disappearance logic).
+        """
+        pending = []
+        for m in rows:
+            key = self.key_func(m)
+            fp = self.fingerprint(m)
+            if self.fingerprints.get(key) != fp:
+                self.fingerprints[key] = fp
+                pending.append(m)
+        return pending
+
+    def forget(self, rows):
+        """Drop rows whose write failed so the next cycle sends them again."""
+        for m in rows:
+            self.fingerprints.pop(self.key_func(m), None)
+
+    def reset(self):
+        self.fingerprints = {}
+
+
+def format_diff(diff):
+    return (f"Δ new={len(diff.new)} changed={len(diff.changed)} "
+            f"unchanged={diff.unchanged} gone={len(diff.disappeared)}")
@@ -179,7 +179,7 @@ def run_scraper_async():
         asyncio.set_event_loop(loop)
 
         # Create scraper instance
-        scraper_instance = XStakeScraper()
+        scraper_instance = XStakeScraper(context_label='main-list')
 
         # Define status check callback
         async def status_check_callback():
@@ -311,7 +311,7 @@ def run_live_scraper():
         asyncio.set_event_loop(loop)
 
         # Create scraper instance
-        live_scraper_instance = XStakeScraper()
+        live_scraper_instance = XStakeScraper(context_label='live')
 
         # Define status check callback
         async def live_status_check_callback():
@@ -1,3 +1,373 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from matches.models import Match, Team
+from .crawl_queue import TokenBucket
+from .identity import identity_index
+from .kickoff_scheduler import KickoffScheduler
+from .models import ScraperCounter
+from .scraper import bulk_save_scraped_data, finish_live_matches, save_live_matches_batched, sweep_main_list
+
+
+def main_row(home, away, **extra):
+    row = {
+        'home_team': home,
+        'away_team': away,
+        'match_datetime': timezone.now() + timedelta(days=1),
+        'league_name': 'Test League',
+        'match_url': f"https://example.com/event/{abs(hash((home, away))) % 10 ** 8}",
+        'home_odds': 1.9,
+        'draw_odds': 3.4,
+        'away_odds': 4.2,
+    }
+    row.update(extra)
+    return row
+
+
+class IdentityIndexRollbackTests(TransactionTestCase):
+    """The identity index is process-wide; a rolled-back save must not leave pks in it."""
+
+    def setUp(self):
+        identity_index.invalidate()
+        identity_index.warm()
+
+    def tearDown(self):
+        identity_index.invalidate()
+
+    def test_rolled_back_cycle_leaves_no_team_in_index(self):
+        # The second row fails after the teams of the cycle were bulk-created
+        saved = bulk_save_scraped_data.func([
+            main_row('Rollback Home', 'Rollback Away'),
+            main_row('Other Home', 'Other Away', match_datetime=None),
+        ])
+
+        self.assertEqual(saved, 0)
+        self.assertFalse(Team.objects.exists())
+        identity_index.ensure_warm()
+        self.assertIsNone(identity_index.team('Rollback Home'))
+
+    def test_cycle_after_rollback_saves(self):
+        bulk_save_scraped_data.func([
+            main_row('Rollback Home', 'Rollback Away'),
+            main_row('Other Home', 'Other Away', match_datetime=None),
+        ])
+
+        saved = bulk_save_scraped_data.func([main_row('Rollback Home', 'Rollback Away')])
+
+        self.assertEqual(saved, 1)
+        match = Match.objects.get()
+        self.assertEqual(match.home_team.name, 'Rollback Home')
+        self.assertEqual(identity_index.team('Rollback Home')[0], match.home_team_id)
+
+
+class LiveSaveRollbackTests(TransactionTestCase):
+    """Matches upserted by a live cycle enter the index only when the cycle commits."""
+
+    def setUp(self):
+        identity_index.invalidate()
+        identity_index.warm()
+
+    def tearDown(self):
+        identity_index.invalidate()
+
+    def live_rows(self):
+        return [{
+            'home_team': 'Live Home', 'away_team': 'Live Away', 'match_url': 'https://example.com/live/1',
+            'match_datetime': timezone.now(), 'league_name': 'Test League', 'match_status': 'live',
+            'home_score': 0, 'away_score': 0, 'home_odds': 2.1, 'draw_odds': 3.2, 'away_odds': 3.5,
+        }]
+
+    def test_rolled_back_live_cycle_leaves_no_match_in_index(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.assertEqual(save_live_matches_batched(self.live_rows()), 1)
+                raise RuntimeError('later step of the cycle failed')
+
+        self.assertFalse(Match.objects.exists())
+        self.assertIsNone(identity_index.match(match_url='https://example.com/live/1'))
+
+    def test_committed_live_cycle_is_indexed(self):
+        save_live_matches_batched(self.live_rows())
+
+        match = Match.objects.get()
+        self.assertEqual(identity_index.match(match_url='https://example.com/live/1'), match.pk)
+
+
+class UpsertStatusTests(TransactionTestCase):
+    """An upsert on the natural key neither revives a finished match nor indexes a status it did not store."""
+
+    def setUp(self):
+        identity_index.invalidate()
+
+    def tearDown(self):
+        identity_index.invalidate()
+
+    def stored_match(self, status, kickoff, external_id='4242'):
+        return Match.objects.create(
+            home_team=Team.objects.create(name='Upsert Home'), away_team=Team.objects.create(name='Upsert Away'),
+            match_date=kickoff, league='Test League', status=status, external_id=external_id,
+            kickoff_date=timezone.localdate(kickoff), match_url='https://example.com/event/4242')
+
+    def test_live_row_does_not_revive_finished_match(self):
+        kickoff = timezone.now()
+        finished = self.stored_match(Match.STATUS_FINISHED, kickoff)
+
+        save_live_matches_batched([{
+            'home_team': 'Upsert Home', 'away_team': 'Upsert Away', 'match_url': 'https://example.com/event/4242',
+            'match_datetime': kickoff, 'league_name': 'Test League', 'match_status': 'live',
+            'home_score': 0, 'away_score': 0, 'home_odds': 2.1, 'draw_odds': 3.2, 'away_odds': 3.5,
+        }])
+
+        finished.refresh_from_db()
+        self.assertEqual(finished.status, Match.STATUS_FINISHED)
+        self.assertIsNone(identity_index.match(match_url='https://example.com/event/4242'))
+
+    def test_live_row_promotes_upcoming_match(self):
+        kickoff = timezone.now()
+        upcoming = self.stored_match(Match.STATUS_UPCOMING, kickoff)
+        identity_index.warm()
+        identity_index.invalidate()  # the index misses it: the upsert finds it
+
+        save_live_matches_batched([{
+            'home_team': 'Upsert Home', 'away_team': 'Upsert Away', 'match_url': 'https://example.com/event/4242',
+            'match_datetime': kickoff, 'league_name': 'Test League', 'match_status': 'live',
+            'home_odds': 2.1, 'draw_odds': 3.2, 'away_odds': 3.5,
+        }])
+
+        upcoming.refresh_from_db()
+        self.assertEqual(upcoming.status, Match.STATUS_LIVE)
+        self.assertEqual(identity_index.match(match_url='https://example.com/event/4242',
+                                              statuses=(Match.STATUS_LIVE,)), upcoming.pk)
+
+    def test_main_list_indexes_stored_status(self):
+        kickoff = timezone.now() + timedelta(days=1)
+        stale = self.stored_match(Match.STATUS_STALE, kickoff)
+
+        bulk_save_scraped_data.func([main_row('Upsert Home', 'Upsert Away', match_datetime=kickoff,
+                                              match_url='https://example.com/event/4242')])
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Match.STATUS_STALE)
+        self.assertIsNone(identity_index.match(match_url='https://example.com/event/4242',
+                                               statuses=(Match.STATUS_UPCOMING,)))
+
+
+class FinishLiveMatchesTests(TransactionTestCase):
+    def live_match(self, name, **scores):
+        return Match.objects.create(
+            home_team=Team.objects.create(name=f'{name} Home'), away_team=Team.objects.create(name=f'{name} Away'),
+            match_date=timezone.now(), league='Test League', status=Match.STATUS_LIVE, **scores)
+
+    def test_total_goals_follow_the_score_and_survive_a_missing_one(self):
+        scored = self.live_match('Scored', home_score=2, away_score=1)
+        unscored = self.live_match('Unscored', home_score=1)
+        Match.objects.filter(pk=unscored.pk).update(total_goals=1)
+
+        with mock.patch('django_q.tasks.async_task') as async_task:
+            finished = finish_live_matches.func([scored.pk, unscored.pk])
+
+        self.assertEqual(sorted(finished), sorted([scored.pk, unscored.pk]))
+        async_task.assert_called_once_with('matches.tasks.settle_matches_task', finished)
+        self.assertEqual(dict(Match.objects.filter(status=Match.STATUS_FINISHED).values_list('id', 'total_goals')),
+                         {scored.pk: 3, unscored.pk: 1})
+
+
+class FeedRowUpsertTests(TransactionTestCase):
+    """Structured feed rows carry no match_url; upserting them keeps the one the DOM scraper stored."""
+
+    def setUp(self):
+        identity_index.invalidate()
+
+    def tearDown(self):
+        identity_index.invalidate()
+
+    def test_feed_row_keeps_stored_match_url(self):
+        kickoff = timezone.now() + timedelta(days=1)
+        url = 'https://example.com/event/4242'
+        bulk_save_scraped_data.func([main_row('Url Home', 'Url Away', match_url=url, match_datetime=kickoff)])
+
+        saved = bulk_save_scraped_data.func([main_row('Url Home', 'Url Away', match_url=None, match_id=4242,
+                                                      match_datetime=kickoff, home_odds=2.05)])
+
+        self.assertEqual(saved, 1)
+        match = Match.objects.get()
+        self.assertEqual(match.match_url, url)
+        self.assertEqual(match.home_odds, Decimal('2.05'))
+
+
+class MainListPricingTests(TransactionTestCase):
+    """A main-list price change reprices a match from its stored derived odds, as the live path does."""
+
+    def setUp(self):
+        identity_index.invalidate()
+
+    def tearDown(self):
+        identity_index.invalidate()
+
+    def test_price_change_keeps_guarded_groups(self):
+        kickoff = timezone.now() + timedelta(days=1)
+        bulk_save_scraped_data.func([main_row('Priced Home', 'Priced Away', match_datetime=kickoff)])
+        # A scraped Total market set these; the model must not replace them
+        Match.objects.update(odds_over_2_5=Decimal('1.77'), odds_under_2_5=Decimal('2.03'))
+
+        bulk_save_scraped_data.func([main_row('Priced Home', 'Priced Away', match_datetime=kickoff,
+                                              home_odds=2.4, away_odds=3.1)])
+
+        match = Match.objects.get()
+        self.assertEqual((match.odds_over_2_5, match.odds_under_2_5), (Decimal('1.77'), Decimal('2.03')))
+        self.assertIsNotNone(match.odds_1x)
+
+
+class SweepMainListTests(TransactionTestCase):
+    def make_match(self, external_id, day, status, source=Match.SOURCE_GSTAKE):
+        home, _ = Team.objects.get_or_create(name=f"{external_id} Home")
+        away, _ = Team.objects.get_or_create(name=f"{external_id} Away")
+        kickoff = timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=18)
+        return Match.objects.create(home_team=home, away_team=away, match_date=kickoff, league='Test League',
+                                    external_id=external_id, kickoff_date=day, status=status, scrape_generation=1,
+                                    source=source)
+
+    def listed_page(self, count, day):
+        for i in range(count):
+            self.make_match(f"m{i}", day, Match.STATUS_UPCOMING)
+        return {(f"m{i}", day) for i in range(count)}
+
+    def test_guarded_sweep_needs_a_previous_count(self):
+        day = timezone.localdate() + timedelta(days=2)
+        keys = self.listed_page(4, day)
+        unlisted = self.make_match('unlisted', day, Match.STATUS_UPCOMING)
+
+        marked, swept = sweep_main_list.func(keys, None)
+
+        self.assertEqual((marked, swept), (4, None))
+        unlisted.refresh_from_db()
+        self.assertEqual(unlisted.status, Match.STATUS_UPCOMING)
+        self.assertEqual(ScraperCounter.get_instance(ScraperCounter.MAIN_LIST_SEEN).value, 4)
+
+    def test_short_pages_do_not_lower_the_baseline(self):
+        day = timezone.localdate() + timedelta(days=2)
+        keys = self.listed_page(10, day)
+        ScraperCounter.objects.create(name=ScraperCounter.MAIN_LIST_SEEN, value=10)
+        partial = set(sorted(keys)[:4])
+
+        # Two half-loaded pages in a row: neither sweeps, the second compares with 10, not 4
+        self.assertEqual(sweep_main_list.func(partial, None), (4, None))
+        self.assertEqual(sweep_main_list.func(partial, None), (4, None))
+        self.assertFalse(Match.objects.filter(status=Match.STATUS_STALE).exists())
+        self.assertEqual(ScraperCounter.get_instance(ScraperCounter.MAIN_LIST_SEEN).value, 10)
+
+        # A full page sweeps again
+        self.assertEqual(sweep_main_list.func(keys - {('m9', day)}, None), (9, 1))
+
+    def test_sweep_leaves_other_sources_alone(self):
+        day = timezone.localdate() + timedelta(days=2)
+        other = self.make_match('other', day, Match.STATUS_UPCOMING, source='othersource')
+
+        sweep_main_list.func(self.listed_page(2, day))
+
+        other.refresh_from_db()
+        self.assertEqual(other.status, Match.STATUS_UPCOMING)
+
+    def test_mark_touches_only_listed_pairs(self):
+        today = timezone.localdate() + timedelta(days=2)
+        tomorrow = today + timedelta(days=1)
+        listed_a = self.make_match('a', today, Match.STATUS_STALE)
+        listed_b = self.make_match('b', tomorrow, Match.STATUS_UPCOMING)
+        # Same ids on the other days: not listed, so neither revived nor stamped
+        other_a = self.make_match('a', tomorrow, Match.STATUS_STALE)
+        other_b = self.make_match('b', today, Match.STATUS_UPCOMING)
+        before = timezone.now()
+
+        marked, swept = sweep_main_list.func({('a', today), ('b', tomorrow)})
+
+        self.assertEqual((marked, swept), (2, 1))
+        for match in (listed_a, listed_b, other_a, other_b):
+            match.refresh_from_db()
+        self.assertEqual(listed_a.status, Match.STATUS_UPCOMING)
+        self.assertGreaterEqual(listed_a.updated_at, before)
+        self.assertEqual(listed_b.status, Match.STATUS_UPCOMING)
+        self.assertEqual(other_a.status, Match.STATUS_STALE)
+        self.assertEqual(other_b.status, Match.STATUS_STALE)
+        self.assertGreaterEqual(other_b.updated_at, before)
+
+
+class TokenBucketTests(TransactionTestCase):
+    """The crawl budget is one ScraperCounter row, whatever process holds the TokenBucket."""
+
+    def test_buckets_share_one_budget(self):
+        worker_a, worker_b = TokenBucket(rate=20), TokenBucket(rate=20)
+
+        self.assertEqual(worker_a.take(30), 30)
+        # A second worker (or a recycled one) finds the budget spent, not a fresh one
+        self.assertLessEqual(worker_b.take(30), 10)
+        self.assertLessEqual(TokenBucket(rate=20).take(30), 1)
+
+    def test_refill_and_give_back(self):
+        bucket = TokenBucket(rate=60, capacity=10)
+        self.assertEqual(bucket.take(10), 10)
+        bucket.give_back(4)
+        self.assertEqual(TokenBucket(rate=60, capacity=10).take(10), 4)
+
+        # One minute later `rate` tokens have come back, capped at capacity
+        ScraperCounter.objects.filter(name='crawl_budget').update(
+            updated_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(bucket.take(100), 10)
+
+
+class KickoffSchedulerTests(TransactionTestCase):
+    def make_match(self, name, kickoff, status=Match.STATUS_UPCOMING):
+        return Match.objects.create(
+            home_team=Team.objects.create(name=f"{name} Home"), away_team=Team.objects.create(name=f"{name} Away"),
+            match_date=kickoff, league='Test League', status=status, match_url=f"https://example.com/event/{name}")
+
+    def test_heap_moves_matches_to_tracking_at_kickoff(self):
+        now = timezone.now()
+        later = self.make_match('later', now + timedelta(hours=2))
+        due = self.make_match('due', now + timedelta(seconds=30))
+        live = self.make_match('live', now - timedelta(minutes=20), Match.STATUS_LIVE)
+        scheduler = KickoffScheduler()
+        scheduler.load()
+
+        self.assertEqual(scheduler.tracked_ids(), sorted([due.pk, live.pk]))
+        self.assertEqual(scheduler.next_kickoff(), later.match_date)
+        self.assertEqual(scheduler.advance(now + timedelta(hours=1)), [])
+        self.assertEqual(scheduler.advance(now + timedelta(hours=2)), [later.pk])
+        self.assertEqual(scheduler.tracked_ids(), sorted([later.pk, due.pk, live.pk]))
+
+        scheduler.retire([live.pk])
+        self.assertEqual(scheduler.tracked_ids(), sorted([later.pk, due.pk]))
+
+    def test_sync_reads_rows_changed_since_the_watermark(self):
+        now = timezone.now()
+        moved = self.make_match('moved', now + timedelta(hours=2))
+        finished = self.make_match('finished', now - timedelta(minutes=80), Match.STATUS_LIVE)
+        self.make_match('quiet', now + timedelta(hours=8))
+        scheduler = KickoffScheduler(overlap=timedelta(0))
+        scheduler.load()
+
+        moved.match_date = now + timedelta(hours=5)
+        moved.save()  # auto_now moves updated_at past the watermark
+        Match.objects.filter(pk=finished.pk).update(status=Match.STATUS_FINISHED, updated_at=timezone.now())
+
+        self.assertEqual(scheduler.sync(), 2)
+        self.assertEqual(scheduler.tracked_ids(), [])
+        # The old heap entry of the rescheduled match is skipped, the new one is due at the new kickoff
+        self.assertEqual(scheduler.advance(now + timedelta(hours=4)), [])
+        self.assertEqual(scheduler.advance(now + timedelta(hours=5)), [moved.pk])
+        self.assertEqual(scheduler.sync(), 0)
+
+    def test_current_ids_match_the_scheduler(self):
+        now = timezone.now()
+        self.make_match('later', now + timedelta(hours=2))
+        self.make_match('due', now + timedelta(seconds=30))
+        self.make_match('live', now - timedelta(minutes=20), Match.STATUS_LIVE)
+        scheduler = KickoffScheduler()
+        scheduler.sync()
+        scheduler.advance()
+
+        self.assertEqual(KickoffScheduler().current_ids(), scheduler.tracked_ids())
@@ -1,6 +1,14 @@
 import asyncio
+import json
+import re
+import time
 from playwright.async_api import async_playwright, WebSocket
 
+# socket.io / engine.io packets look like '42["event", {...}]'; SignalR frames are
+# JSON records separated by \x1e. Both wrap plain JSON that we can decode.
+_PACKET_PREFIX = re.compile(r'^\d+')
+_RECORD_SEPARATOR = '\x1e'
+
 async def discover_websockets(url: str):
     """
     Navigates to a URL and attempts to discover WebSocket endpoints.
@@ -37,6 +45,124 @@ async def discover_websockets(url: str):
     
     return list(discovered_ws_urls)
 
+def decode_ws_frame(payload):
+    """
+    Decode one WebSocket frame into a list of JSON values.
+    Handles raw JSON, socket.io numeric prefixes and SignalR record separators;
+    returns [] for pings, binary blobs and anything that is not JSON.
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        try:
+            payload = payload.decode('utf-8')
+        except UnicodeDecodeError:
+            return []
+    if not isinstance(payload, str):
+        return []
+
+    decoded = []
+    for record in payload.split(_RECORD_SEPARATOR):
+        record = _PACKET_PREFIX.sub('', record.strip(), count=1)
+        if not record or record[0] not in '[{':
+            continue
+        try:
+            decoded.append(json.loads(record))
+        except ValueError:
+            continue
+    return decoded
+
+
+def iter_event_updates(value, depth=0):
+    """
+    Walk a decoded frame and yield every dict that looks like an event update:
+    it has an 'id' plus at least one of the fields the live feed carries.
+    """
+    if depth > 6:
+        return
+    if isinstance(value, dict):
+        if 'id' in value and any(k in value for k in ('stats', 'odds', 'opp_1', 'opp_2')):
+            yield value
+            return
+        for child in value.values():
+            yield from iter_event_updates(child, depth + 1)
+    elif isinstance(value, list):
+        for child in value:
+            yield from iter_event_updates(child, depth + 1)
+
+
+class LiveSocketConsumer:
+    """
+    Attaches to every WebSocket a page opens, decodes the frames and keeps a
+    merged per-event state. Incremental updates (score, odds, period) are merged
+    into the last known event so consumers always get a complete event back.
+    """
+
+    def __init__(self, log=None):
+        self.log = log or print
+        self.events = {}
+        self.changed_ids = set()
+        self.open_sockets = set()
+        self.last_frame_at = 0.0
+        self.frames_received = 0
+        self.updates_applied = 0
+
+    def attach(self, page):
+        """Listen for sockets on this page. Call before page.goto so no socket is missed."""
+        page.on("websocket", self._on_websocket)
+
+    def detach(self, page):
+        page.remove_listener("websocket", self._on_websocket)
+
+    def _on_websocket(self, ws: WebSocket):
+        self.log(f"🌐 WebSocket opened: {ws.url}")
+        self.open_sockets.add(ws.url)
+        ws.on("framereceived", self._on_frame)
+        ws.on("close", lambda _ws=None: self._on_close(ws.url))
+
+    def _on_close(self, url):
+        self.open_sockets.discard(url)
+        self.log(f"🔌 WebSocket closed: {url}")
+
+    def _on_frame(self, payload):
+        self.frames_received += 1
+        self.last_frame_at = time.monotonic()
+        for value in decode_ws_frame(payload):
+            for update in iter_event_updates(value):
+                self.apply_update(update)
+
+    def apply_update(self, update):
+        event_id = update['id']
+        state = self.events.setdefault(event_id, {})
+        for key, value in update.items():
+            if key == 'stats' and isinstance(value, dict):
+                stats = state.setdefault('stats', {})
+                for stat_key, stat_value in value.items():
+                    if stat_key == 'score' and isinstance(stat_value, dict):
+                        stats.setdefault('score', {}).update(stat_value)
+                    else:
+                        stats[stat_key] = stat_value
+            elif key == 'odds' and isinstance(value, list):
+                # Markets are keyed by (name, period); a delta only carries the markets that moved.
+                markets = {(m.get('col_n'), m.get('period', 0)): m for m in state.get('odds', []) if isinstance(m, dict)}
+                for market in value:
+                    if isinstance(market, dict):
+                        markets[(market.get('col_n'), market.get('period', 0))] = market
+                state['odds'] = list(markets.values())
+            else:
+                state[key] = value
+        self.changed_ids.add(event_id)
+        self.updates_applied += 1
+
+    def drain(self):
+        """Return the full merged state of every event that changed since the last drain."""
+        changed = [self.events[event_id] for event_id in self.changed_ids if event_id in self.events]
+        self.changed_ids = set()
+        return changed
+
+    def is_healthy(self, stale_after=15.0):
+        """True while at least one socket is open and frames arrived within stale_after seconds."""
+        return bool(self.open_sockets) and (time.monotonic() - self.last_frame_at) < stale_after
+
+
 if __name__ == "__main__":
     # Replace with the actual URL you want to investigate
     target_url = "https://gh7.bet/line/201" 